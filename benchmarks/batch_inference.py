@@ -0,0 +1,57 @@
+"""
+对比DOMInspector逐张识别与batch()批量识别的吞吐量(张/秒)。
+
+默认使用随机初始化的 yolov8n.yaml 与合成截图，只对比YOLO检测；传入 --ocr 时同时计入OCR识别。
+
+用法：
+    python benchmarks/batch_inference.py
+    python benchmarks/batch_inference.py --model bilibili_best.pt --images 8 --rounds 5 --ocr
+"""
+import argparse
+import json
+import sys
+import time
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from frame_decode import synthetic_frame
+from utils.dom_inspector import DOMInspector
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DOMInspector逐张识别与批量识别的吞吐量对比')
+    parser.add_argument('--model', default='yolov8n.yaml', help='YOLO模型路径，默认使用随机初始化的yolov8n')
+    parser.add_argument('--images', type=int, default=8, help='每轮识别的截图数量')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--ocr', action='store_true', help='是否计入OCR识别')
+    args = parser.parse_args()
+
+    frames = [synthetic_frame(seed=seed)[0] for seed in range(args.images)]
+    dom_inspector = DOMInspector(yolo_model=args.model)
+    dom_inspector.inspect_batch(frames[:1], use_ocr=args.ocr)
+
+    single, batched = [], []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            dom_inspector.inspect(frame, use_ocr=args.ocr)
+        single.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        dom_inspector.inspect_batch(frames, use_ocr=args.ocr)
+        batched.append(time.perf_counter() - start)
+
+    result = {
+        'model': args.model,
+        'images': args.images,
+        'ocr': args.ocr,
+        'single_images_per_second': round(args.images / min(single), 3),
+        'batch_images_per_second': round(args.images / min(batched), 3),
+    }
+    result['speedup'] = round(result['batch_images_per_second'] / result['single_images_per_second'], 3)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
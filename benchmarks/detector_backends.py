@@ -0,0 +1,181 @@
+"""
+对比YOLO在不同推理后端上的准确率与延迟：ultralytics(PyTorch)、ONNX Runtime、OpenVINO，以及ONNX INT8量化模型。
+
+- 传入 --dataset 时使用LabelGenerator生成的数据集(images、labels目录)，准确率以标注为基准；
+  否则使用合成截图，准确率以ultralytics(PyTorch)的检测结果为基准，衡量导出与量化带来的偏差。
+- 准确率为IoU ≥ 0.5 且类别一致时的精确率、召回率、F1以及匹配框的平均IoU；延迟为单张截图的端到端耗时(含前后处理)。
+- 未安装的后端(onnxruntime、openvino)会被跳过。
+
+用法：
+    python benchmarks/detector_backends.py --model bilibili_best.pt --dataset datasets/bilibili --int8
+    python benchmarks/detector_backends.py --model yolov8n.pt --images 20 --output benchmarks/detector_backends.md
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from os import path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from frame_decode import synthetic_frame
+from utils.onnx_detector import ONNXDetector, export_onnx
+
+IOU_THRESHOLD = 0.5
+
+
+def load_dataset(dataset_dir: str, size: int) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """
+    读取LabelGenerator数据集中的截图与YOLO格式的标注，标注转换为 (类别, x1, y1, x2, y2) 数组。
+    """
+    images, labels = [], []
+    for image_path in sorted(glob.glob(path.join(dataset_dir, 'images', '**', '*.png'), recursive=True))[:size]:
+        label_path = image_path.replace(f'{os.sep}images{os.sep}', f'{os.sep}labels{os.sep}')[:-4] + '.txt'
+        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if image is None or not path.exists(label_path):
+            continue
+        height, width = image.shape[:2]
+        rows = np.loadtxt(label_path, ndmin=2).reshape(-1, 5)
+        cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+        labels.append(np.stack([rows[:, 0], cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1))
+        images.append(image)
+    return images, labels
+
+
+def as_array(detections: list[dict]) -> np.ndarray:
+    return np.array([[item['class'], item['box']['x1'], item['box']['y1'], item['box']['x2'], item['box']['y2'],
+                      item['confidence']] for item in detections]).reshape(-1, 6)
+
+
+def ultralytics_predictor(model_path: str, conf: float):
+    from ultralytics import YOLO
+    model = YOLO(model_path)
+
+    def predict(image: np.ndarray) -> np.ndarray:
+        boxes = model(image, conf=conf, verbose=False)[0].boxes
+        return np.concatenate([boxes.cls.cpu().numpy()[:, None], boxes.xyxy.cpu().numpy(),
+                               boxes.conf.cpu().numpy()[:, None]], axis=1).reshape(-1, 6)
+    return predict
+
+
+def onnx_predictor(model_path: str, backend: str, conf: float):
+    detector = ONNXDetector(model_path, backend=backend, conf=conf)
+    return lambda image: as_array(detector(image)[0])
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-7)
+
+
+def match(predictions: np.ndarray, references: np.ndarray) -> tuple[int, list[float]]:
+    """
+    按置信度从高到低贪心匹配，返回匹配成功的数量与匹配框的IoU。
+    """
+    if not len(predictions) or not len(references):
+        return 0, []
+    predictions = predictions[predictions[:, 5].argsort()[::-1]]
+    ious = box_iou(predictions[:, 1:5], references[:, 1:5])
+    ious[predictions[:, None, 0] != references[None, :, 0]] = 0
+    matched, matched_ious = set(), []
+    for row in ious:
+        for index in row.argsort()[::-1]:
+            if row[index] < IOU_THRESHOLD:
+                break
+            if index not in matched:
+                matched.add(index)
+                matched_ious.append(float(row[index]))
+                break
+    return len(matched), matched_ious
+
+
+def evaluate(predict, images: list[np.ndarray], references: list[np.ndarray], rounds: int) -> dict:
+    predict(images[0])
+    latencies, predictions = [], []
+    for _ in range(rounds):
+        predictions = []
+        for image in images:
+            start = time.perf_counter()
+            predictions.append(predict(image))
+            latencies.append(time.perf_counter() - start)
+
+    true_positive, predicted, expected, ious = 0, 0, 0, []
+    for prediction, reference in zip(predictions, references):
+        count, matched_ious = match(prediction, reference)
+        true_positive += count
+        predicted += len(prediction)
+        expected += len(reference)
+        ious += matched_ious
+    precision = true_positive / predicted if predicted else float(not expected)
+    recall = true_positive / expected if expected else float(not predicted)
+    p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+    return {'latency_p50_ms': round(float(p50), 2), 'latency_p95_ms': round(float(p95), 2),
+            'precision': round(precision, 4), 'recall': round(recall, 4),
+            'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+            'mean_iou': round(float(np.mean(ious)), 4) if ious else 0.0, 'detections': predicted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='YOLO推理后端的准确率与延迟对比')
+    parser.add_argument('--model', default='yolov8n.pt', help='YOLO .pt 模型路径')
+    parser.add_argument('--dataset', default=None, help='LabelGenerator生成的数据集目录，默认使用合成截图')
+    parser.add_argument('--images', type=int, default=10, help='参与对比的截图数量')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--conf', type=float, default=ONNXDetector.DEFAULT_CONF, help='置信度阈值')
+    parser.add_argument('--int8', action='store_true', help='同时对比INT8量化模型')
+    parser.add_argument('--output', default=None, help='Markdown报告的保存路径，默认只打印')
+    args = parser.parse_args()
+
+    if args.dataset:
+        images, labels = load_dataset(args.dataset, args.images)
+        if not images:
+            raise FileNotFoundError(f'数据集中没有找到截图与标注：{args.dataset}')
+    else:
+        images, labels = [synthetic_frame(seed=seed)[0] for seed in range(args.images)], None
+
+    backends = {'ultralytics': ultralytics_predictor(args.model, args.conf)}
+    available = [backend for backend in ONNXDetector.BACKENDS if importlib.util.find_spec(backend)]
+    onnx_models = {'fp32': export_onnx(args.model)} if available else {}
+    if available and args.int8:
+        with tempfile.TemporaryDirectory() as calibration_dir:
+            if not args.dataset:
+                for index, image in enumerate(images):
+                    cv2.imwrite(path.join(calibration_dir, f'{index}.png'), image)
+            onnx_models['int8'] = export_onnx(args.model, int8=True, dataset_dir=args.dataset or calibration_dir,
+                                              force=True)
+    for backend in available:
+        for precision, model_path in onnx_models.items():
+            backends[f'{backend}-{precision}'] = onnx_predictor(model_path, backend, args.conf)
+
+    references = labels if labels is not None else [backends['ultralytics'](image) for image in images]
+    report = {name: evaluate(predict, images, references, args.rounds) for name, predict in backends.items()}
+
+    baseline = '标注' if labels is not None else 'ultralytics检测结果'
+    lines = [f'模型：{args.model}，截图：{len(images)} 张，准确率基准：{baseline}，IoU阈值：{IOU_THRESHOLD}', '',
+             '| 后端 | p50延迟(ms) | p95延迟(ms) | 精确率 | 召回率 | F1 | 平均IoU | 检测数 |',
+             '| --- | --- | --- | --- | --- | --- | --- | --- |']
+    for name, result in report.items():
+        lines.append(f'| {name} | {result["latency_p50_ms"]} | {result["latency_p95_ms"]} | {result["precision"]} | '
+                     f'{result["recall"]} | {result["f1"]} | {result["mean_iou"]} | {result["detections"]} |')
+    print('\n'.join(lines))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fw:
+            fw.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
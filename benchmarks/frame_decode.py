@@ -0,0 +1,130 @@
+"""
+对比截图进入DOMInspector前的处理耗时与峰值内存。
+
+- old：PNG截图，cv2.imdecode与PIL.Image.open各解码一次，YOLO使用PIL图像，OCR裁剪使用np.array复制。
+- new：截图只解码一次，YOLO与OCR共用同一个图像数组，OCR裁剪为数组视图；同时对比浏览器端PNG与JPEG编码的耗时。
+
+每种方式在独立的子进程中运行，峰值内存取子进程的最大常驻内存(ru_maxrss)。
+
+用法：
+    python benchmarks/frame_decode.py
+    python benchmarks/frame_decode.py --model bilibili_best.pt --rounds 20
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from os import path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+
+def synthetic_frame(width: int = 1920, height: int = 1080, boxes: int = 60, seed: int = 0) -> tuple:
+    """
+    生成一张类似网页的合成截图以及其中的元素坐标。
+    """
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 245, dtype=np.uint8)
+    coords = []
+    for index in range(boxes):
+        x1, y1 = int(rng.integers(0, width - 300)), int(rng.integers(0, height - 60))
+        x2, y2 = x1 + int(rng.integers(60, 300)), y1 + int(rng.integers(24, 60))
+        color = tuple(int(c) for c in rng.integers(0, 200, 3))
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 1)
+        cv2.putText(frame, f'item {index}', (x1 + 4, y2 - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 1)
+        coords.append({'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
+    return frame, coords
+
+
+def run_old(png: bytes, coords: list, model) -> None:
+    from PIL import Image
+    image_cv = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), flags=cv2.IMREAD_COLOR)
+    image_object = Image.open(BytesIO(png))
+    if model:
+        model(image_object, verbose=False)
+    else:
+        # 与ultralytics处理PIL图像的方式一致：转换为RGB数组后再翻转为BGR
+        np.ascontiguousarray(np.asarray(image_object.convert('RGB'))[..., ::-1])
+    image_object.close()
+    [np.array(image_cv[box['y1']: box['y2'], box['x1']: box['x2']]) for box in coords]
+
+
+def run_new(png: bytes, coords: list, model) -> None:
+    from utils.dom_inspector import DOMInspector
+    image_cv = DOMInspector.decode(png)
+    if model:
+        model(image_cv, verbose=False)
+    [image_cv[box['y1']: box['y2'], box['x1']: box['x2']] for box in coords]
+
+
+def measure(mode: str, rounds: int, model_path: str = None) -> dict:
+    frame, coords = synthetic_frame()
+    png = cv2.imencode('.png', frame)[1].tobytes()
+    model = None
+    if model_path:
+        from utils.model_registry import ModelRegistry
+        model = ModelRegistry().get_yolo(model_path)
+
+    runner = run_old if mode == 'old' else run_new
+    runner(png, coords, model)
+    timings = []
+    tracemalloc.start()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        runner(png, coords, model)
+        timings.append((time.perf_counter() - start) * 1000)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    encode_format = '.png' if mode == 'old' else '.jpg'
+    encode_timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        cv2.imencode(encode_format, frame, [cv2.IMWRITE_JPEG_QUALITY, 90] if encode_format == '.jpg' else [])
+        encode_timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'mode': mode,
+        'rounds': rounds,
+        'latency_ms_median': round(statistics.median(timings), 3),
+        'latency_ms_p95': round(sorted(timings)[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        'encode_ms_median': round(statistics.median(encode_timings), 3),
+        'traced_peak_mb': round(traced_peak / 1024 ** 2, 2),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='截图解码耗时与峰值内存对比')
+    parser.add_argument('--mode', choices=['old', 'new'], help='只运行一种方式并输出JSON，默认两种方式各在子进程中运行')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--model', default=None, help='YOLO模型路径，传入时计入YOLO推理耗时')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.rounds, args.model)))
+        return
+
+    results = []
+    for mode in ['old', 'new']:
+        command = [sys.executable, __file__, '--mode', mode, '--rounds', str(args.rounds)]
+        if args.model: command += ['--model', args.model]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    keys = ['latency_ms_median', 'latency_ms_p95', 'encode_ms_median', 'traced_peak_mb', 'max_rss_mb']
+    print(f"{'':<20}{'old':>12}{'new':>12}")
+    for key in keys:
+        print(f'{key:<20}{results[0][key]:>12}{results[1][key]:>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+测量 utils 包的冷启动导入耗时(基于 python -X importtime)，超过阈值时以非0状态码退出，可以直接放进CI防止导入耗时回退。
+
+每条导入语句在新的解释器中运行 --rounds 次，取所有模块自身耗时之和的最小值，并列出累计耗时最高的模块。
+
+用法：
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --threshold 80 --rounds 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+from os import path
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+# 导入语句 -> 是否受阈值约束
+STATEMENTS = {
+    'import utils': True,
+    'from utils import ProjectPath': True,
+    'from utils import BrowserLauncher': False,
+    'from utils import DOMInspector': False,
+}
+# 冷启动时不应被导入的重量级依赖
+HEAVY_MODULES = ('cv2', 'numpy', 'torch', 'ultralytics', 'easyocr', 'paddleocr', 'yaml')
+
+
+def measure(statement: str) -> tuple[float, list[tuple[str, float]], list[str]]:
+    """
+    在新的解释器中执行导入语句，返回 (总耗时ms, 累计耗时最高的模块, 被导入的重量级依赖)。
+    """
+    # python自身启动时导入的模块(site、encodings等)不计入，只统计语句执行期间的导入
+    code = f'import sys; before = set(sys.modules); {statement}; print(sorted(set(sys.modules) - before))'
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+    imported = set(eval(process.stdout.strip().splitlines()[-1]))
+
+    total, cumulative = 0, []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if name.strip() not in imported:
+            continue
+        total += int(self_us)
+        cumulative.append((name.strip(), int(cumulative_us) / 1000))
+    heavy = sorted({name.split('.')[0] for name in imported} & set(HEAVY_MODULES))
+    return total / 1000, sorted(cumulative, key=lambda item: item[1], reverse=True)[:5], heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='utils包的冷启动导入耗时')
+    parser.add_argument('--threshold', type=float, default=50, help='import utils与ProjectPath允许的最大耗时(ms)')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    report, failures = {}, []
+    for statement, limited in STATEMENTS.items():
+        results = [measure(statement) for _ in range(args.rounds)]
+        elapsed, top, heavy = min(results, key=lambda result: result[0])
+        report[statement] = {'import_ms': round(elapsed, 2), 'heavy_modules': heavy,
+                             'top_modules': [[name, round(ms, 2)] for name, ms in top]}
+        if limited and elapsed > args.threshold:
+            failures.append(f'{statement}: {elapsed:.2f} ms 超过阈值 {args.threshold} ms')
+        if limited and heavy:
+            failures.append(f'{statement}: 冷启动导入了重量级依赖 {heavy}')
+
+    lines = ['| 导入语句 | 耗时(ms) | 重量级依赖 |', '| --- | --- | --- |']
+    for statement, result in report.items():
+        lines.append(f'| `{statement}` | {result["import_ms"]} | {", ".join(result["heavy_modules"]) or "-"} |')
+    print('\n'.join(lines))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if failures:
+        print('\n'.join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
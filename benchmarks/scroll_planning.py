@@ -0,0 +1,200 @@
+"""
+对比LabelGenerator的两种滚动截图策略：'plan'(规划最少滚动位置)与'element'(逐个滚动视口外的元素)。
+
+默认在模拟的长页面上运行(信息流布局，元素位置随机)，统计截图数量、page.evaluate调用次数、Python耗时，
+并按 --evaluate-ms、--screenshot-ms 估算真实浏览器中的总耗时；
+传入 --url 时使用playwright打开真实页面，按 config/label_generator.yaml 的selectors统计实际耗时。
+
+用法：
+    python benchmarks/scroll_planning.py --rows 50 --rounds 3
+    python benchmarks/scroll_planning.py --url https://www.bilibili.com/ --output benchmarks/scroll_planning.md
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from utils.dataset_writer import DatasetWriter
+from utils.label_generator import GEOMETRY_SCRIPT, SCROLL_SCRIPT, SCROLL_TO_SCRIPT, SCROLL_STRATEGIES, LabelGenerator
+
+VIEWPORT = {'width': 1280, 'height': 720}
+
+
+class SimulatedPage:
+    """
+    只实现LabelGenerator截图流程用到的page接口，元素坐标为文档坐标。
+    """
+
+    def __init__(self, elements: list[dict], scroll_height: int):
+        self.elements = elements
+        self.scroll_height = scroll_height
+        self.scroll_y = 0
+        self.evaluate_count = 0
+        self.screenshot_count = 0
+
+    def _scroll_to(self, offset: float):
+        self.scroll_y = min(max(offset, 0), max(self.scroll_height - VIEWPORT['height'], 0))
+
+    def evaluate(self, script: str, arg=None):
+        self.evaluate_count += 1
+        if script == GEOMETRY_SCRIPT:
+            ids = range(len(self.elements)) if arg['selectors'] else arg['ids']
+            return {'viewport': dict(VIEWPORT),
+                    'scroll': {'x': 0, 'y': self.scroll_y, 'height': self.scroll_height},
+                    'elements': [dict(self.elements[id], id=id, y=self.elements[id]['y'] - self.scroll_y)
+                                 for id in ids]}
+        element = self.elements[arg] if script == SCROLL_SCRIPT else None
+        if script == SCROLL_SCRIPT:
+            self._scroll_to(element['y'] + element['height'] / 2 - VIEWPORT['height'] / 2)
+        elif script == SCROLL_TO_SCRIPT:
+            self._scroll_to(arg)
+
+    def screenshot(self) -> bytes:
+        self.screenshot_count += 1
+        return b''
+
+
+
+def feed_layout(rows: int, seed: int) -> tuple[list[dict], int]:
+    """
+    生成信息流页面：顶部导航栏，之后每行4张卡片，每张卡片包含封面、标题、作者3类元素。
+    """
+    rng = random.Random(seed)
+    elements = [{'label': 0, 'x': 40 + 150 * index, 'y': 20, 'width': 120, 'height': 30, 'visible': True}
+                for index in range(6)]
+    top = 100
+    for _ in range(rows):
+        row_height = rng.randint(220, 320)
+        for column in range(4):
+            x = 40 + column * 300
+            cover = rng.randint(140, row_height - 70)
+            elements.append({'label': 1, 'x': x, 'y': top, 'width': 280, 'height': cover, 'visible': True})
+            elements.append({'label': 2, 'x': x, 'y': top + cover + 8, 'width': 280, 'height': 36, 'visible': True})
+            elements.append({'label': 3, 'x': x, 'y': top + cover + 50, 'width': 140, 'height': 16,
+                             'visible': rng.random() > 0.05})
+        top += row_height + 20
+    return elements, top + 200
+
+
+def generator(strategy: str, selectors: list[str], output_dir: str) -> LabelGenerator:
+    """
+    跳过__init__中的浏览器启动与数据集配置，只保留截图流程需要的属性。
+    """
+    label_generator = LabelGenerator.__new__(LabelGenerator)
+    label_generator._scroll_strategy = strategy
+    label_generator._selectors = selectors
+    label_generator._writer = DatasetWriter(output_dir)
+    label_generator._dedup = None
+    return label_generator
+
+
+def capture(label_generator: LabelGenerator, page) -> int:
+    with contextlib.redirect_stdout(io.StringIO()):
+        if label_generator._scroll_strategy == 'plan':
+            saved = label_generator._capture_by_plan(page)
+        else:
+            saved = label_generator._capture_by_element(page)
+    label_generator._writer.close()
+    return saved
+
+
+def count_labels(output_dir: str) -> int:
+    """
+    统计写入的标签行数，截图之间重复标注的元素越多，标签行数越多。
+    """
+    count = 0
+    for label_path in glob.glob(path.join(output_dir, 'labels', '**', '*.txt'), recursive=True):
+        with open(label_path, 'r') as rf:
+            count += len(rf.read().splitlines())
+    return count
+
+
+def simulate(args) -> dict:
+    report = {}
+    for strategy in SCROLL_STRATEGIES:
+        screenshots, evaluates, labels, seconds = [], [], [], []
+        for seed in range(args.rounds):
+            elements, scroll_height = feed_layout(args.rows, seed)
+            page = SimulatedPage(elements, scroll_height)
+            with tempfile.TemporaryDirectory() as output_dir:
+                label_generator = generator(strategy, ['nav', 'cover', 'title', 'author'], output_dir)
+                start = time.perf_counter()
+                capture(label_generator, page)
+                seconds.append(time.perf_counter() - start)
+                labels.append(count_labels(output_dir))
+            screenshots.append(page.screenshot_count)
+            evaluates.append(page.evaluate_count)
+        screenshot_count = sum(screenshots) / args.rounds
+        evaluate_count = sum(evaluates) / args.rounds
+        python_ms = sum(seconds) / args.rounds * 1000
+        report[strategy] = {
+            'screenshots': round(screenshot_count, 1),
+            'labels': round(sum(labels) / args.rounds, 1),
+            'evaluate_calls': round(evaluate_count, 1),
+            'python_ms': round(python_ms, 2),
+            'estimated_ms': round(python_ms + screenshot_count * args.screenshot_ms +
+                                  evaluate_count * args.evaluate_ms, 2),
+        }
+    return report
+
+
+def browser(args) -> dict:
+    import yaml
+    from playwright.sync_api import sync_playwright
+    from utils.project_path import ProjectPath
+
+    with open(path.join(ProjectPath.config_path, 'label_generator.yaml'), 'r', encoding='utf-8') as f:
+        selectors = yaml.safe_load(f).get('selectors')
+    selectors = [item if isinstance(item, str) else item.get('class') for item in selectors]
+
+    report = {}
+    with sync_playwright() as playwright:
+        chromium = playwright.chromium.launch()
+        for strategy in SCROLL_STRATEGIES:
+            page = chromium.new_page(viewport=VIEWPORT)
+            page.goto(args.url)
+            LabelGenerator._wait_for_page_ready(page)
+            with tempfile.TemporaryDirectory() as output_dir:
+                label_generator = generator(strategy, selectors, output_dir)
+                start = time.perf_counter()
+                saved = capture(label_generator, page)
+                report[strategy] = {'screenshots': saved, 'labels': count_labels(output_dir),
+                                    'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)}
+            page.close()
+        chromium.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LabelGenerator滚动截图策略对比')
+    parser.add_argument('--url', default=None, help='真实页面的URL，默认使用模拟页面')
+    parser.add_argument('--rows', type=int, default=50, help='模拟页面的卡片行数')
+    parser.add_argument('--rounds', type=int, default=3, help='模拟页面的数量(随机种子)')
+    parser.add_argument('--evaluate-ms', type=float, default=5, help='估算时每次page.evaluate的耗时')
+    parser.add_argument('--screenshot-ms', type=float, default=80, help='估算时每张截图的耗时')
+    parser.add_argument('--output', default=None, help='Markdown报告的保存路径，默认只打印')
+    args = parser.parse_args()
+
+    report = browser(args) if args.url else simulate(args)
+    columns = list(next(iter(report.values())).keys())
+    source = args.url or f'模拟信息流页面，{args.rows} 行卡片，{args.rounds} 个页面取平均'
+    lines = [f'页面：{source}', '', f'| 策略 | {" | ".join(columns)} |', f'| --- |{" --- |" * len(columns)}']
+    for strategy, result in report.items():
+        lines.append(f'| {strategy} | {" | ".join(str(result[column]) for column in columns)} |')
+    print('\n'.join(lines))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fw:
+            fw.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+离线基准测试：本地HTTP服务提供 benchmarks/fixtures 下的静态页面，不访问外网，也不需要训练好的模型。
+
+测量项目：
+    - 截图吞吐量：capture_frame(JPEG，CDP)与 page.screenshot(PNG)每秒截图数；
+    - 单步端到端延迟：截图 -> DOMInspector识别 -> 点击元素，统计p50/p95；传入 --ocr 时按文本筛选要点击的元素，
+      懒加载的OCR在点击前识别，耗时计入单步延迟，否则点击第一个元素；
+    - OCR吞吐量：按fixtures页面中文本元素的真实位置裁剪截图，每秒识别的裁剪图片数(需要 --ocr 且安装了PaddleOCR或EasyOCR)；
+    - LabelGenerator吞吐量：按 fixtures/label_generator.yaml 收集数据集，每分钟处理的页面数。
+
+默认使用随机初始化的 yolov8n.yaml 作为检测模型(与 batch_inference.py 一致)，检测结果没有意义，但推理耗时与真实模型一致；
+传入 --model 可以使用训练好的模型。各阶段的耗时通过 utils.tracing 汇总一并写入结果。
+
+结果以JSON保存，compare 子命令对比两次结果，指标回退超过容忍度时以非0状态码退出：
+    python benchmarks/suite.py run --output benchmarks/results/current.json
+    python benchmarks/suite.py compare benchmarks/results/baseline.json benchmarks/results/current.json --tolerance 10
+"""
+import argparse
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from os import path
+
+import numpy as np
+import yaml
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+FIXTURES = path.join(path.dirname(path.abspath(__file__)), 'fixtures')
+sys.path.insert(0, ROOT)
+
+from utils.browser_launcher import BrowserLauncher
+from utils.dom_inspector import DOMInspector
+from utils.label_generator import LabelGenerator
+from utils.project_path import ProjectPath
+from utils.tracing import tracer
+
+# 指标名称后缀 -> 数值越大越好(True)还是越小越好(False)，其余指标只记录不对比
+METRIC_DIRECTIONS = {'_per_second': True, '_per_minute': True, '_ms': False}
+TEXT_SELECTOR = '.channel-link, .video-title, .up-name'
+# 单步测量中按文本筛选的点击目标(search.html的搜索按钮)
+STEP_TEXT = '搜索'
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def fixture_server():
+    """
+    在随机端口上启动静态文件服务，返回fixtures目录的根URL。
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(_QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def percentiles(values: list[float]) -> tuple[float, float]:
+    p50, p95 = np.percentile(values, [50, 95])
+    return round(float(p50), 2), round(float(p95), 2)
+
+
+def bench_screenshots(browser, base_url: str, rounds: int) -> dict:
+    page = browser.page
+    page.goto(base_url + 'feed.html')
+    page.wait_for_load_state('networkidle')
+    browser.capture_frame(image_type='jpeg')
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        browser.capture_frame(image_type='jpeg')
+    jpeg = rounds / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        page.screenshot(type='png')
+    png = rounds / (time.perf_counter() - start)
+    return {'screenshot_jpeg_per_second': round(jpeg, 2), 'screenshot_png_per_second': round(png, 2)}
+
+
+def bench_step(browser, dom_inspector: DOMInspector, base_url: str, rounds: int, use_ocr: bool) -> dict:
+    page = browser.page
+    page.goto(base_url + 'search.html')
+    page.wait_for_load_state('networkidle')
+    # 预热：加载检测模型，测量OCR时同时加载OCR模型
+    dom_inspector.inspect(browser.capture_frame(), use_ocr=use_ocr)
+
+    latencies, detections = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = dom_inspector(browser.capture_frame(), use_ocr=use_ocr, lazy_ocr=True, browser=browser)
+        if use_ocr:
+            # 读取text会在筛选前批量识别懒加载的元素，与真实用例一样把OCR计入单步延迟
+            result.click(lambda item: STEP_TEXT in (item.get('text') or ''))
+        elif len(result):
+            result.click()
+        latencies.append((time.perf_counter() - start) * 1000)
+        detections.append(len(result))
+    p50, p95 = percentiles(latencies)
+    return {'step_p50_ms': p50, 'step_p95_ms': p95, 'step_detections': round(float(np.mean(detections)), 2)}
+
+
+def bench_ocr(browser, dom_inspector: DOMInspector, base_url: str, rounds: int) -> dict:
+    page = browser.page
+    page.goto(base_url + 'feed.html')
+    page.wait_for_load_state('networkidle')
+    frame = browser.capture_frame()
+    height, width = frame.shape[:2]
+    rects = page.evaluate('''selector => [...document.querySelectorAll(selector)].map(element => {
+        const rect = element.getBoundingClientRect();
+        return {x1: rect.left, y1: rect.top, x2: rect.right, y2: rect.bottom};
+    })''', TEXT_SELECTOR)
+    boxes = [rect for rect in rects if rect['x1'] >= 0 and rect['y1'] >= 0 and rect['x2'] <= width and
+             rect['y2'] <= height and rect['x2'] - rect['x1'] > 1 and rect['y2'] - rect['y1'] > 1]
+    pairs = [(frame, box) for box in boxes]
+    # 预热：加载OCR模型，之后绕过OCR缓存直接识别
+    dom_inspector._recognize_uncached(pairs[:1], 'ch')
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        dom_inspector._recognize_uncached(pairs, 'ch')
+    elapsed = time.perf_counter() - start
+    return {'ocr_crops': len(pairs), 'ocr_crops_per_second': round(len(pairs) * rounds / elapsed, 2)}
+
+
+def bench_label_generator(base_url: str) -> dict:
+    with open(path.join(FIXTURES, 'label_generator.yaml'), 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config['pages'] = [base_url + page for page in config['pages']]
+    name = f'benchmark_{datetime.now().strftime("%Y_%m_%d_%H_%M_%S")}'
+    dataset_path = path.join(ProjectPath.datasets_path, name)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = path.join(temp_dir, 'label_generator.yaml')
+        with open(config_path, 'w', encoding='utf-8') as fw:
+            yaml.dump(config, fw, allow_unicode=True)
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                LabelGenerator(config['pages'][0], sources_dir_name=name, config_path=config_path,
+                               dedup_index_path=path.join(temp_dir, 'duplicate_index.jsonl'))
+            elapsed = time.perf_counter() - start
+            with open(path.join(dataset_path, 'manifest.jsonl'), 'r', encoding='utf-8') as rf:
+                samples = sum(1 for line in rf if json.loads(line).get('type') == 'sample')
+        finally:
+            shutil.rmtree(dataset_path, ignore_errors=True)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path.join(ProjectPath.yamls_path, f'{name}.yaml'))
+    return {'label_generator_pages': len(config['pages']), 'label_generator_samples': samples,
+            'label_generator_pages_per_minute': round(len(config['pages']) / elapsed * 60, 2)}
+
+
+def git_commit() -> str or None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    ocr_available = bool(importlib.util.find_spec('paddleocr') or importlib.util.find_spec('easyocr'))
+    use_ocr = args.ocr and ocr_available
+    if args.ocr and not ocr_available:
+        print('没有安装PaddleOCR或EasyOCR，跳过OCR相关的测量', file=sys.stderr)
+
+    tracer.enable()
+    metrics = {}
+    browser = BrowserLauncher(headless=True)
+    dom_inspector = DOMInspector(yolo_model=args.model)
+    try:
+        with fixture_server() as base_url:
+            metrics.update(bench_screenshots(browser, base_url, args.rounds))
+            metrics.update(bench_step(browser, dom_inspector, base_url, args.rounds, use_ocr))
+            if use_ocr:
+                metrics.update(bench_ocr(browser, dom_inspector, base_url, args.rounds))
+            if not args.skip_label_generator:
+                metrics.update(bench_label_generator(base_url))
+    finally:
+        dom_inspector.close()
+        browser.close()
+
+    result = {
+        'meta': {'commit': git_commit(), 'timestamp': datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'model': args.model,
+                 'ocr': use_ocr, 'rounds': args.rounds},
+        'metrics': metrics,
+        'stages': tracer.summary(),
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        os.makedirs(path.dirname(path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as fw:
+            json.dump(result, fw, ensure_ascii=False, indent=2)
+
+
+def compare(args):
+    with open(args.baseline, 'r', encoding='utf-8') as rf:
+        baseline = json.load(rf)['metrics']
+    with open(args.current, 'r', encoding='utf-8') as rf:
+        current = json.load(rf)['metrics']
+
+    lines = ['| 指标 | 基准 | 当前 | 变化 | |', '| --- | --- | --- | --- | --- |']
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        higher_is_better = next((value for suffix, value in METRIC_DIRECTIONS.items() if name.endswith(suffix)), None)
+        old, new = baseline[name], current[name]
+        change = (new - old) / old * 100 if old else 0.0
+        status = ''
+        if higher_is_better is not None:
+            worse = -change if higher_is_better else change
+            if worse > args.tolerance:
+                status = '回退'
+                regressions.append(name)
+            elif worse < -args.tolerance:
+                status = '提升'
+        lines.append(f'| {name} | {old} | {new} | {change:+.1f}% | {status} |')
+    print('\n'.join(lines))
+
+    if regressions:
+        print(f'超过容忍度({args.tolerance}%)的回退：{", ".join(regressions)}', file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线基准测试')
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help='运行基准测试')
+    run_parser.add_argument('--model', default='yolov8n.yaml', help='YOLO模型路径，默认使用随机初始化的yolov8n')
+    run_parser.add_argument('--rounds', type=int, default=20, help='每项测量的重复次数')
+    run_parser.add_argument('--ocr', action='store_true', help='识别时执行OCR，并测量OCR吞吐量')
+    run_parser.add_argument('--skip-label-generator', action='store_true', help='跳过LabelGenerator吞吐量的测量')
+    run_parser.add_argument('--output', default=None, help='结果JSON的保存路径，默认只打印')
+    compare_parser = subparsers.add_parser('compare', help='对比两次结果')
+    compare_parser.add_argument('baseline', help='基准结果JSON')
+    compare_parser.add_argument('current', help='当前结果JSON')
+    compare_parser.add_argument('--tolerance', type=float, default=10, help='允许的回退百分比')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        compare(args)
+    else:
+        if args.command is None:
+            args = run_parser.parse_args([])
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
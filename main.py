@@ -1,4 +1,3 @@
-import time
 from os import path
 from utils import BrowserLauncher, DOMInspector, ProjectPath
 
@@ -8,30 +7,24 @@ if __name__ == '__main__':
     page = browser_launcher.page
     page.goto('https://www.bilibili.com/', timeout=0)
 
-    screenshot = page.screenshot()
-
     dom_inspector = DOMInspector(yolo_model=path.join(ProjectPath.root_path, 'bilibili_best.pt'))
-    result = dom_inspector(image=screenshot)
 
-    # 点击元素
-    result.click(lambda item: item.get('name') == 'channel-link' and '鬼畜' in item.get('text'))
+    # 点击元素，元素出现后立即点击，不需要固定等待页面加载
+    dom_inspector.click_when_visible(lambda item: item.get('name') == 'channel-link' and '鬼畜' in item.get('text'))
 
     # 输入元素
-    result.filter(lambda item: item.get('name') == 'center-search-container').input('UI自动化')
-
-    page.keyboard.press('Enter')
-
-    page.wait_for_timeout(500)
+    dom_inspector.wait_for(lambda item: item.get('name') == 'center-search-container').input('UI自动化')
 
-    new_page = browser_launcher.pages[-1]
+    # 搜索结果在新的标签页打开
+    with browser.expect_page() as new_page_info:
+        page.keyboard.press('Enter')
+    new_page = new_page_info.value
 
-    new_screenshot = new_page.screenshot()
-    new_result = dom_inspector(image=new_screenshot, use_ocr=False, page_index=-1)
-
-    new_result.filter(lambda item: item.get('name') == 'center-search-container').input('接口自动化')
+    dom_inspector.wait_for(lambda item: item.get('name') == 'center-search-container', use_ocr=False,
+                           page_index=-1).input('接口自动化')
 
     new_page.keyboard.press('Enter')
+    new_page.wait_for_load_state()
 
-    time.sleep(1)
-    time.sleep(15)
-
+    # 保留浏览器窗口以便查看结果
+    new_page.wait_for_timeout(15000)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from utils.async_browser_launcher import AsyncBrowser, AsyncBrowserLauncher, AsyncDOMInspector, AsyncDOMResultHandler
+from utils.lazy_text import LazyTextResolver
+from tests.test_dom_inspector import ScaleSensitiveDetector, frame_with_blocks
+
+
+class FakeMouse:
+
+    def __init__(self):
+        self.clicks = []
+
+    async def click(self, x: float, y: float):
+        self.clicks.append((x, y))
+
+
+class FakePage:
+
+    def __init__(self):
+        self.mouse = FakeMouse()
+        self.listeners = {}
+
+    def once(self, event: str, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def close(self):
+        for callback in self.listeners.pop('close', []):
+            callback(self)
+
+
+class FakeAsyncBrowser:
+
+    def __init__(self):
+        self.page = FakePage()
+
+
+@pytest.fixture
+def async_inspector(monkeypatch):
+    inspector = AsyncDOMInspector(yolo_model='scale_sensitive.pt')
+    model = ScaleSensitiveDetector()
+    monkeypatch.setattr(inspector.inspector._registry, 'get_yolo', lambda *args, **kwargs: model)
+    yield inspector
+    inspector.close()
+
+
+def test_browser_keyword_binds_results_to_browser_page(async_inspector):
+    browser = FakeAsyncBrowser()
+
+    async def run():
+        result = await async_inspector(frame_with_blocks(), browser=browser, use_ocr=False)
+        await result.click()
+        return result
+
+    result = asyncio.run(run())
+    assert result.page is browser.page
+    assert browser.page.mouse.clicks == [(200.0, 150.0)]
+
+
+def test_handler_accepts_browser_keyword():
+    browser = FakeAsyncBrowser()
+    assert AsyncDOMResultHandler([], browser=browser).page is browser.page
+
+
+def test_lazy_texts_are_recognized_off_the_event_loop():
+    threads = []
+
+    def recognize(image, boxes):
+        threads.append(threading.get_ident())
+        return [[f'text{box["x1"]}'] for box in boxes]
+
+    async def run():
+        resolver = LazyTextResolver(np.zeros((10, 10, 3), dtype=np.uint8), recognize)
+        items = [resolver.item({'box': {'x1': x1, 'y1': 0, 'x2': x1 + 1, 'y2': 1}, 'name': 'title'})
+                 for x1 in (1, 2, 3)]
+        handler = AsyncDOMResultHandler(items, page=FakePage())
+        filtered = await handler.filter(lambda item: item.get('text') != ['text2'])
+        texts = await filtered.get_texts
+        return threading.get_ident(), filtered, texts
+
+    loop_thread, filtered, texts = asyncio.run(run())
+    assert isinstance(filtered, AsyncDOMResultHandler)
+    assert texts == [['text1'], ['text3']]
+    assert threads and loop_thread not in threads
+
+
+def test_incremental_state_is_keyed_by_page_and_released_on_close(async_inspector):
+    first, second = FakePage(), FakePage()
+
+    async def run():
+        for page in (first, second, first):
+            await async_inspector(frame_with_blocks(), page=page, use_ocr=False, incremental=True)
+
+    asyncio.run(run())
+    states = async_inspector.inspector._frame_states
+    first_index, second_index = async_inspector._page_index(first), async_inspector._page_index(second)
+    assert first_index != second_index
+    assert set(states) == {first_index, second_index}
+
+    first.close()
+    assert set(states) == {second_index}
+    assert len(first.listeners) == 0
+
+
+def test_launcher_instances_are_released_with_their_loop(monkeypatch):
+    launched = []
+
+    async def fake_launch(**kwargs):
+        launched.append(object())
+        return launched[-1]
+
+    monkeypatch.setattr(AsyncBrowser, 'launch', fake_launch)
+    monkeypatch.setattr(AsyncBrowserLauncher, '_instances', type(AsyncBrowserLauncher._instances)())
+
+    async def run():
+        return await AsyncBrowserLauncher.launch(), await AsyncBrowserLauncher.launch()
+
+    first, again = asyncio.run(run())
+    assert first is again
+    second, _ = asyncio.run(run())
+    assert second is not first
+    assert len(AsyncBrowserLauncher._instances) <= 1
@@ -0,0 +1,91 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.browser_launcher import Browser, decode_frame
+
+
+class FakeSession:
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.params = []
+
+    def send(self, method: str, params: dict) -> dict:
+        self.params.append(params)
+        return {'data': base64.b64encode(self.data).decode()}
+
+
+class FakePage:
+
+    def __init__(self):
+        self.handlers = {}
+
+    def once(self, event: str, handler):
+        self.handlers[event] = handler
+
+    def close(self):
+        self.handlers.pop('close')(self)
+
+
+class FakeContext:
+
+    def __init__(self, data: bytes):
+        self.sessions = []
+        self.data = data
+
+    def new_cdp_session(self, page: FakePage) -> FakeSession:
+        self.sessions.append(FakeSession(self.data))
+        return self.sessions[-1]
+
+    def close(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+def fake_browser(data: bytes) -> Browser:
+    """
+    不启动playwright，只设置capture_frame用到的属性。
+    """
+    browser = Browser.__new__(Browser)
+    browser._browser_name = 'chromium'
+    browser._cdp_sessions = {}
+    browser._page = FakePage()
+    browser._browser = browser._playwright = FakeContext(data)
+    return browser
+
+
+@pytest.fixture
+def frame() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+
+
+def test_capture_frame_defaults_to_lossless_png(frame):
+    browser = fake_browser(cv2.imencode('.png', frame)[1].tobytes())
+
+    captured = browser.capture_frame()
+
+    assert np.array_equal(captured, frame)
+    assert browser._browser.sessions[0].params == [
+        {'format': 'png', 'optimizeForSpeed': True, 'captureBeyondViewport': False}]
+
+
+def test_cdp_session_is_released_when_page_closes(frame):
+    browser = fake_browser(cv2.imencode('.png', frame)[1].tobytes())
+    browser.capture_frame()
+    browser.capture_frame()
+    assert len(browser._browser.sessions) == 1
+
+    browser._page.close()
+
+    assert browser._cdp_sessions == {}
+
+
+def test_invalid_frame_data_raises():
+    with pytest.raises(ValueError):
+        decode_frame(b'not an image')
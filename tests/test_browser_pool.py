@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from utils import browser_pool
+from utils.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    """
+    模拟Browser，reset_failures为重建上下文时依次抛出的异常次数，launch_failures为启动时依次抛出的异常次数。
+    """
+
+    launches = 0
+    launch_failures = 0
+    reset_failures = 0
+
+    def __init__(self, **kwargs):
+        FakeBrowser.launches += 1
+        if FakeBrowser.launches > 1 and FakeBrowser.launch_failures:
+            FakeBrowser.launch_failures -= 1
+            raise RuntimeError('launch failed')
+        self.closed = False
+
+    def reset(self):
+        if FakeBrowser.reset_failures:
+            FakeBrowser.reset_failures -= 1
+            raise RuntimeError('reset failed')
+        return self
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_browser(monkeypatch):
+    FakeBrowser.launches, FakeBrowser.launch_failures, FakeBrowser.reset_failures = 0, 0, 0
+    monkeypatch.setattr(browser_pool, 'Browser', FakeBrowser)
+
+
+def fail(browser):
+    raise ValueError('flow failed')
+
+
+def test_completed_counts_only_successful_flows():
+    with BrowserPool(size=1) as pool:
+        results = pool.run([lambda browser: 1, fail, lambda browser: 3], return_exceptions=True)
+        metrics = pool.metrics
+
+    assert results[0] == 1 and isinstance(results[1], ValueError) and results[2] == 3
+    assert (metrics['completed'], metrics['failed']) == (2, 1)
+    assert metrics['workers'][0]['flows'] == 2
+
+
+def test_failed_reset_restarts_the_browser():
+    FakeBrowser.reset_failures = 1
+    with BrowserPool(size=1, isolate_flows=True) as pool:
+        assert pool.run([lambda browser: 1, lambda browser: 2]) == [1, 2]
+        assert pool.metrics['workers'][0]['restarts'] == 1
+
+
+def test_pending_flows_fail_when_no_browser_can_be_started():
+    FakeBrowser.reset_failures = 1
+    FakeBrowser.launch_failures = 1
+    submitted = threading.Event()
+    pool = BrowserPool(size=1, isolate_flows=True)
+    futures = [pool.submit(lambda browser: submitted.wait(5) and 0)]
+    futures += [pool.submit(lambda browser, index=index: index) for index in range(1, 3)]
+    submitted.set()
+
+    assert futures[0].result(timeout=5) == 0
+    for future in futures[1:]:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        pool.submit(lambda browser: None)
+    pool.close()
+    assert pool.metrics['alive'] == 0
@@ -0,0 +1,39 @@
+import json
+
+from utils.dataset_writer import DatasetWriter, MANIFEST_NAME
+
+
+def test_split_follows_the_stable_key_not_the_name(tmp_path):
+    with DatasetWriter(str(tmp_path / 'first')) as first, DatasetWriter(str(tmp_path / 'second')) as second:
+        keys = [f'https://example.com/@0,{offset}' for offset in range(0, 20000, 500)]
+        splits = [first.write(f'a{index}', b'png', '0 0.5 0.5 0.1 0.1', 'u', split_key=key)
+                  for index, key in enumerate(keys)]
+        assert splits == [second.write(f'b{index}', b'png', '0 0.5 0.5 0.1 0.1', 'u', split_key=key)
+                          for index, key in enumerate(keys)]
+        assert set(splits) == {'train', 'val'}
+
+
+def test_repeated_url_visits_do_not_collide(tmp_path):
+    root = str(tmp_path)
+    writer = DatasetWriter(root)
+    writer.write('first', b'png', '0 0.5 0.5 0.1 0.1', 'https://example.com/', visit=0)
+    writer.write('second', b'png', '0 0.5 0.5 0.1 0.1', 'https://example.com/', visit=1)
+    writer.finish_url('https://example.com/', visit=0)
+    writer.close()
+
+    resumed = DatasetWriter(root)
+    assert resumed.completed_visits == {('https://example.com/', 0)}
+    assert [sample['name'] for sample in resumed.samples] == ['first']
+    resumed.close()
+    with open(tmp_path / MANIFEST_NAME, encoding='utf-8') as rf:
+        records = [json.loads(line) for line in rf]
+    assert {'type': 'url', 'url': 'https://example.com/', 'visit': 0, 'samples': 1} in records
+
+
+def test_shards_lists_completed_shard_files(tmp_path):
+    with DatasetWriter(str(tmp_path), shard_size=1) as writer:
+        for index in range(3):
+            writer.write(f's{index}', b'png', '0 0.5 0.5 0.1 0.1', 'https://example.com/', split_key='same')
+        writer.finish_url('https://example.com/')
+        split = writer.split('same')
+        assert writer.shards == {split: [f'shards/{split}-0000{index}.tar' for index in range(3)]}
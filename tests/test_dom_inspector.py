@@ -0,0 +1,294 @@
+import json
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.dom_inspector import DOMInspector
+
+
+class _Result:
+
+    def __init__(self, detections: list[dict]):
+        self._detections = detections
+
+    def tojson(self) -> str:
+        return json.dumps(self._detections)
+
+
+class ScaleSensitiveDetector:
+    """
+    按ultralytics的letterbox缩放图片后只保留长边不小于MIN_SIZE的白色矩形，检测结果与推理时的缩放比例相关。
+    """
+
+    MIN_SIZE = 12
+    overrides = {'imgsz': 640}
+
+    def __init__(self):
+        self.sizes = []
+        self.batches = []
+
+    def __call__(self, images: list[np.ndarray], imgsz: int = 640) -> list[_Result]:
+        self.batches.append(len(images))
+        results = []
+        for image in images:
+            self.sizes.append(imgsz)
+            ratio = imgsz / max(image.shape[:2])
+            mask = cv2.inRange(image, (255, 255, 255), (255, 255, 255))
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            detections = []
+            for contour in contours:
+                x, y, w, h = cv2.boundingRect(contour)
+                if max(w, h) * ratio >= self.MIN_SIZE:
+                    detections.append({'name': 'block', 'class': 0, 'confidence': 0.9,
+                                       'box': {'x1': x, 'y1': y, 'x2': x + w, 'y2': y + h}})
+            results.append(_Result(sorted(detections, key=lambda item: (item['box']['y1'], item['box']['x1']))))
+        return results
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    dom_inspector = DOMInspector(yolo_model='scale_sensitive.pt')
+    model = ScaleSensitiveDetector()
+    monkeypatch.setattr(dom_inspector._registry, 'get_yolo', lambda *args, **kwargs: model)
+    return dom_inspector, model
+
+
+def frame_with_blocks() -> np.ndarray:
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    # 整帧检测时缩小到1/3，30px的方块低于MIN_SIZE，不会被检测到
+    for x1, y1, x2, y2 in [(100, 100, 300, 200), (400, 300, 430, 330), (1200, 600, 1500, 800)]:
+        frame[y1: y2, x1: x2] = 255
+    return frame
+
+
+def boxes_in(dom_list: list[dict], region: tuple[int, int, int, int]) -> list[tuple]:
+    x1, y1, x2, y2 = region
+    boxes = [tuple(dom_detail['box'][key] for key in ('x1', 'y1', 'x2', 'y2')) for dom_detail in dom_list]
+    return sorted(box for box in boxes if box[0] >= x1 and box[1] >= y1 and box[2] <= x2 and box[3] <= y2)
+
+
+def test_roi_boxes_match_full_frame_boxes(detector):
+    dom_inspector, model = detector
+    frame = frame_with_blocks()
+    roi = (50, 50, 650, 450)
+
+    full = dom_inspector.inspect(frame, use_ocr=False)
+    region = dom_inspector.inspect(frame, use_ocr=False, roi=roi)
+
+    assert boxes_in(region, roi) == boxes_in(full, roi) == [(100, 100, 300, 200)]
+    assert model.sizes == [640, 224]
+
+
+def test_clipped_roi_uses_viewport_scale(detector):
+    dom_inspector, model = detector
+    frame = frame_with_blocks()
+    roi = {'x': 50, 'y': 50, 'width': 600, 'height': 400}
+
+    full = dom_inspector.inspect(frame, use_ocr=False)
+    clipped = dom_inspector.inspect(frame[50: 450, 50: 650].copy(), use_ocr=False, roi=roi, clipped=True,
+                                    frame_size=(1920, 1080))
+
+    assert boxes_in(clipped, (50, 50, 650, 450)) == boxes_in(full, (50, 50, 650, 450))
+
+
+def test_clipped_roi_at_origin_uses_viewport_scale(detector):
+    dom_inspector, model = detector
+    frame = frame_with_blocks()
+    roi = (0, 0, 600, 400)
+
+    clipped = dom_inspector.inspect(frame[0: 400, 0: 600].copy(), use_ocr=False, roi=roi, clipped=True,
+                                    frame_size=(1920, 1080))
+    shifted = dom_inspector.inspect(frame[50: 450, 50: 650].copy(), use_ocr=False, roi=(50, 50, 650, 450),
+                                    clipped=True, frame_size=(1920, 1080))
+
+    assert boxes_in(clipped, roi) == [(100, 100, 300, 200)]
+    assert model.sizes == [224, 224]
+    assert boxes_in(shifted, (50, 50, 650, 450)) == [(100, 100, 300, 200)]
+
+
+def test_clipped_roi_requires_frame_size(detector):
+    dom_inspector, _ = detector
+
+    with pytest.raises(ValueError):
+        dom_inspector.inspect(frame_with_blocks()[0: 400, 0: 600], use_ocr=False, roi=(0, 0, 600, 400), clipped=True)
+
+
+def test_explicit_detect_size_is_kept_for_roi(detector):
+    dom_inspector, model = detector
+    dom_inspector.inspect(frame_with_blocks(), use_ocr=False, roi=(50, 50, 650, 450), detect_size=320)
+
+    assert model.sizes == [320]
+
+
+def test_incremental_regions_match_full_frame_boxes(detector):
+    dom_inspector, model = detector
+    frame = frame_with_blocks()
+    changed = frame.copy()
+    # 30px的方块在整帧检测时低于MIN_SIZE，变化区域按默认尺寸放大检测时会被误检
+    changed[100: 130, 1000: 1030] = 255
+
+    dom_inspector.inspect(frame, use_ocr=False, incremental=True)
+    incremental = dom_inspector.inspect(changed, use_ocr=False, incremental=True)
+    full = dom_inspector.inspect(changed, use_ocr=False)
+
+    assert boxes_in(incremental, (0, 0, 1920, 1080)) == boxes_in(full, (0, 0, 1920, 1080))
+    assert all(size < 640 for size in model.sizes[1: -1])
+
+
+@pytest.fixture
+def recognized(detector, monkeypatch):
+    dom_inspector, _ = detector
+    crops = []
+
+    def recognize_pairs(pairs, lang):
+        crops.extend((box['x1'], lang) for _, box in pairs)
+        return [[f'{lang}:{box["x1"]}'] for _, box in pairs]
+
+    monkeypatch.setattr(dom_inspector, '_recognize_pairs', recognize_pairs)
+    return dom_inspector, crops
+
+
+def test_incremental_reuses_lazily_resolved_texts(recognized):
+    dom_inspector, crops = recognized
+    frame = frame_with_blocks()
+
+    first = dom_inspector.inspect(frame, lazy_ocr=True, incremental=True)
+    assert [item['text'] for item in first] == [['ch:100'], ['ch:1200']]
+    second = dom_inspector.inspect(frame.copy(), lazy_ocr=True, incremental=True)
+
+    assert [item['text'] for item in second] == [['ch:100'], ['ch:1200']]
+    assert crops == [(100, 'ch'), (1200, 'ch')]
+
+
+def test_incremental_reocrs_texts_for_another_lang(recognized):
+    dom_inspector, crops = recognized
+    frame = frame_with_blocks()
+
+    dom_inspector.inspect(frame, incremental=True)
+    english = dom_inspector.inspect(frame.copy(), lang='en', lazy_ocr=True, incremental=True)
+
+    assert [item['text'] for item in english] == [['en:100'], ['en:1200']]
+    assert crops == [(100, 'ch'), (1200, 'ch'), (100, 'en'), (1200, 'en')]
+
+
+def test_clipped_roi_ocr_crops_in_clip_coordinates(recognized):
+    dom_inspector, crops = recognized
+    frame = frame_with_blocks()
+
+    dom_list = dom_inspector.inspect(frame[50: 450, 50: 650].copy(), roi=(50, 50, 650, 450), clipped=True,
+                                     frame_size=(1920, 1080))
+
+    assert [item['box']['x1'] for item in dom_list] == [100]
+    assert crops == [(50, 'ch')]
+
+
+def test_batch_matches_single_inspection_in_one_pass(detector, monkeypatch):
+    dom_inspector, model = detector
+    calls = []
+
+    def recognize_pairs(pairs, lang):
+        calls.append([box['x1'] for _, box in pairs])
+        return [[f'{lang}:{box["x1"]}'] for _, box in pairs]
+
+    monkeypatch.setattr(dom_inspector, '_recognize_pairs', recognize_pairs)
+    frames = [frame_with_blocks(), np.zeros((1080, 1920, 3), dtype=np.uint8), frame_with_blocks()[:, ::-1].copy()]
+
+    batched = dom_inspector.inspect_batch(frames)
+    assert model.batches == [3] and calls == [[100, 1200, 1620, 420]]
+    assert batched == [dom_inspector.inspect(frame) for frame in frames]
+
+
+def test_batch_checks_page_indexes(detector):
+    dom_inspector, _ = detector
+
+    with pytest.raises(ValueError):
+        dom_inspector.batch([frame_with_blocks()] * 2, page_index=[0], use_ocr=False)
+
+
+class FakePage:
+
+    def __init__(self, frame: np.ndarray):
+        self.frame = frame
+        self.viewport_size = {'width': frame.shape[1], 'height': frame.shape[0]}
+
+    def wait_for_timeout(self, timeout: float):
+        pass
+
+
+class FakeBrowser:
+
+    def __init__(self, frame: np.ndarray):
+        self.pages = [FakePage(frame)]
+        self.clips = []
+
+    def capture_frame(self, element_page: FakePage, clip: dict = None) -> np.ndarray:
+        self.clips.append(clip)
+        x, y = clip['x'], clip['y']
+        return element_page.frame[y: y + clip['height'], x: x + clip['width']].copy()
+
+
+def test_wait_for_clips_roi_at_origin_with_viewport_scale(detector):
+    dom_inspector, model = detector
+    browser = FakeBrowser(frame_with_blocks())
+
+    result = dom_inspector.wait_for(lambda item: True, browser=browser, use_ocr=False, roi=(0, 0, 600, 400))
+
+    assert browser.clips == [{'x': 0, 'y': 0, 'width': 600, 'height': 400}]
+    assert [tuple(box) for box in result.boxes] == [(100, 100, 300, 200)]
+    assert model.sizes == [224]
+
+
+class ScriptedPage(FakePage):
+
+    def __init__(self, frames: list[np.ndarray]):
+        super().__init__(frames[0])
+        self.frames = frames
+        self.waits = []
+
+    def wait_for_timeout(self, timeout: float):
+        self.waits.append(round(timeout, 3))
+        time.sleep(timeout / 1000)
+
+
+class ScriptedBrowser:
+    """
+    按顺序返回预先准备的截图，最后一张截图之后一直返回最后一张。
+    """
+
+    def __init__(self, frames: list[np.ndarray]):
+        self.pages = [ScriptedPage(frames)]
+        self.captures = 0
+
+    def capture_frame(self, element_page: ScriptedPage, clip: dict = None) -> np.ndarray:
+        self.captures += 1
+        return element_page.frames[min(self.captures, len(element_page.frames)) - 1].copy()
+
+
+def test_wait_for_backs_off_while_the_frame_is_unchanged(detector):
+    dom_inspector, model = detector
+    empty = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    # 5px的方块低于MIN_SIZE，截图变化但没有检测到元素
+    loading = empty.copy()
+    loading[500: 505, 500: 505] = 255
+    browser = ScriptedBrowser([empty] * 4 + [loading] * 3 + [frame_with_blocks()])
+
+    result = dom_inspector.wait_for(lambda item: True, browser=browser, use_ocr=False, timeout=5,
+                                    poll_interval=0.001, max_interval=0.003)
+
+    assert len(result) == 2
+    assert browser.pages[0].waits == [1, 1.5, 2.25, 3, 1, 1.5, 2.25]
+    assert len(model.batches) == 3
+
+
+def test_wait_for_times_out_without_reinspecting_an_unchanged_frame(detector):
+    dom_inspector, model = detector
+    browser = ScriptedBrowser([np.zeros((1080, 1920, 3), dtype=np.uint8)])
+
+    with pytest.raises(TimeoutError):
+        dom_inspector.wait_for(lambda item: True, browser=browser, use_ocr=False, timeout=0.3,
+                               poll_interval=0.005, max_interval=0.01)
+
+    assert browser.captures > 2
+    assert len(model.batches) == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from utils.dom_inspector import DOMInspector
+from utils.dom_query import DetectionView, DOMQuery, TextRequired
+
+CHANNEL = {'box': {'x1': 0, 'y1': 0, 'x2': 10, 'y2': 10}, 'name': 'channel-link', 'class': 0, 'confidence': 0.9}
+TITLE = dict(CHANNEL, name='video-title', **{'class': 1})
+
+
+def swallow_errors(item: dict) -> bool:
+    try:
+        return item['name'] == 'channel-link' and '鬼畜' in item['text']
+    except Exception:
+        return False
+
+
+@pytest.mark.parametrize('predicate', [
+    lambda item: item.get('name') == 'channel-link' and '鬼畜' in item.get('text'),
+    lambda item: item['name'] == 'channel-link' and 'text' in item and '鬼畜' in item['text'],
+    lambda item: item['name'] == 'channel-link' and any(key == 'text' for key in item),
+    lambda item: item['name'] == 'channel-link' and '鬼畜' in dict(item).get('text', []),
+    lambda item: item['name'] == 'channel-link' and '鬼畜' in item.copy().get('text', []),
+    lambda item: item['name'] == 'channel-link' and ['鬼畜'] in item.values(),
+    lambda item: item['name'] == 'channel-link' and ('text', ['鬼畜']) in item.items(),
+    swallow_errors,
+])
+def test_text_predicates_wait_for_ocr(predicate):
+    assert DOMInspector._match_detection(CHANNEL, predicate) is None
+    assert DOMInspector._match_detection(TITLE, predicate) is False
+    assert DOMInspector._match_text(dict(CHANNEL, text=['鬼畜']), predicate)
+
+
+def test_detection_fields_do_not_require_text():
+    view = DetectionView(CHANNEL)
+
+    assert 'name' in view and 'missing' not in view
+    assert view['name'] == 'channel-link' and view.get('missing') is None
+    with pytest.raises(TextRequired):
+        'text' in view
+
+
+def test_text_required_is_not_an_exception():
+    assert not issubclass(TextRequired, Exception)
+
+
+def test_dom_query_splits_detection_and_text_phases():
+    query = DOMQuery(name='channel-link', text_contains='鬼畜')
+
+    assert DOMInspector._match_detection(CHANNEL, query) is None
+    assert DOMInspector._match_detection(TITLE, query) is False
+    assert query.match(dict(CHANNEL, text=['鬼畜全明星']))
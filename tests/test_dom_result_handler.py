@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from utils.dom_result_handler import DOMResultHandler
+from tests.test_lazy_text import FakeBrowser
+
+
+def element(name: str, x1: float, y1: float, x2: float, y2: float, class_id: int = 0, confidence: float = 0.9) -> dict:
+    return {'box': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}, 'name': name, 'class': class_id,
+            'confidence': confidence}
+
+
+LABEL = element('search-label', 10, 10, 60, 30)
+ELEMENTS = [
+    LABEL,
+    element('search-input', 300, 12, 500, 28, class_id=1),
+    element('search-input', 80, 8, 200, 32, class_id=1, confidence=0.5),
+    element('search-button', 520, 10, 560, 30, class_id=2),
+    element('video-title', 80, 100, 200, 130, class_id=3),
+    element('video-title', 10, 200, 60, 220, class_id=3, confidence=0.3),
+]
+
+
+@pytest.fixture
+def handler() -> DOMResultHandler:
+    return DOMResultHandler(ELEMENTS, browser=FakeBrowser())
+
+
+def names(handler: DOMResultHandler) -> list[tuple]:
+    return [(item['name'], item['box']['x1']) for item in handler.get]
+
+
+def test_columns_follow_the_result_list(handler):
+    assert handler.boxes.shape == (6, 4)
+    assert handler.centers[0].tolist() == [35, 20]
+    assert handler.class_ids.tolist() == [0, 1, 1, 2, 3, 3]
+    assert len(DOMResultHandler([], browser=FakeBrowser()).boxes) == 0
+
+
+def test_field_queries_keep_the_original_order(handler):
+    assert names(handler.by_name('video-title', 'search-input')) == [
+        ('search-input', 300), ('search-input', 80), ('video-title', 80), ('video-title', 10)]
+    assert names(handler.by_name('missing')) == []
+    assert names(handler.by_class(2)) == [('search-button', 520)]
+    assert len(handler.min_confidence(0.8)) == 4
+
+
+def test_right_of_sorts_aligned_elements_by_gap(handler):
+    assert names(handler.right_of(LABEL)) == [('search-input', 80), ('search-input', 300), ('search-button', 520)]
+    assert names(handler.by_name('search-input').right_of(handler.by_name('search-label'))) == [
+        ('search-input', 80), ('search-input', 300)]
+    assert names(handler.right_of((10, 10, 60, 30), aligned=False)) == [
+        ('search-input', 80), ('video-title', 80), ('search-input', 300), ('search-button', 520)]
+
+
+def test_other_directions(handler):
+    assert names(handler.left_of(ELEMENTS[3])) == [('search-input', 300), ('search-input', 80), ('search-label', 10)]
+    assert names(handler.below(LABEL)) == [('video-title', 10)]
+    assert names(handler.above(ELEMENTS[5])) == [('search-label', 10)]
+
+
+def test_nearest_and_inside(handler):
+    assert names(handler.nearest(140, 110)) == [('video-title', 80)]
+    assert names(handler.nearest(0, 0, k=2)) == [('search-label', 10), ('search-input', 80)]
+    assert names(handler.inside(0, 0, 210, 40)) == [('search-label', 10), ('search-input', 80)]
+    assert len(handler.inside(0, 0, 210, 40, partial=True)) == 2
+    assert len(handler.inside(0, 0, 310, 40, partial=True)) == 3
+
+
+def test_reference_must_not_be_empty(handler):
+    with pytest.raises(ValueError):
+        handler.right_of(handler.by_name('missing'))
+
+
+def test_queries_match_a_python_scan():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 600, (50, 2))
+    elements = [element(f'e{index}', x, y, x + w, y + h)
+                for index, (x, y, w, h) in enumerate(np.c_[points, rng.uniform(5, 80, (50, 2))])]
+    handler = DOMResultHandler(elements, browser=FakeBrowser())
+    reference = (250, 250, 300, 300)
+
+    expected = sorted((item for item in elements if item['box']['x1'] - 300 >= -5
+                       and item['box']['y1'] < 300 and item['box']['y2'] > 250),
+                      key=lambda item: item['box']['x1'] - 300)
+    assert handler.right_of(reference).get == expected
@@ -0,0 +1,70 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.duplicate_index import DuplicateIndex
+
+LABELS = '0 0.5 0.5 0.2 0.1\n1 0.2 0.3 0.1 0.1'
+
+
+def screenshot(seed: int, noise: int = 0) -> bytes:
+    image = np.random.default_rng(seed).integers(0, 256, (8, 9), dtype=np.uint8)
+    image = cv2.resize(image, (360, 320), interpolation=cv2.INTER_NEAREST)
+    if noise:
+        image = cv2.add(image, np.full_like(image, noise))
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def test_near_duplicates_with_the_same_labels_are_dropped(tmp_path):
+    index = DuplicateIndex(str(tmp_path / 'index.jsonl'))
+
+    assert not index.is_duplicate(screenshot(0), LABELS, 'https://example.com/')
+    assert index.is_duplicate(screenshot(0, noise=2), LABELS, 'https://example.com/')
+    assert not index.is_duplicate(screenshot(1), LABELS, 'https://example.com/')
+    assert not index.is_duplicate(screenshot(0), '0 0.1 0.1 0.2 0.1', 'https://example.com/')
+    assert (index.checked, index.dropped) == (4, 1)
+
+
+def test_label_signature_ignores_order_and_small_shifts():
+    shifted = '1 0.201 0.3 0.1 0.1\n0 0.5 0.501 0.2 0.1'
+
+    assert DuplicateIndex.label_signature(LABELS) == DuplicateIndex.label_signature(shifted)
+    assert DuplicateIndex.label_signature(LABELS) != DuplicateIndex.label_signature('0 0.5 0.5 0.2 0.1')
+
+
+def test_keep_retains_extra_samples_per_group(tmp_path):
+    index = DuplicateIndex(str(tmp_path / 'index.jsonl'), keep=1)
+
+    assert [index.is_duplicate(screenshot(0), LABELS) for _ in range(3)] == [False, False, True]
+
+
+def test_only_committed_visits_are_persisted(tmp_path):
+    index_path = str(tmp_path / 'index.jsonl')
+    index = DuplicateIndex(index_path, dataset='first')
+    index.is_duplicate(screenshot(0), LABELS, 'https://example.com/a', 'a0')
+    index.is_duplicate(screenshot(1), LABELS, 'https://example.com/b', 'b0')
+    index.commit('https://example.com/a')
+
+    with open(index_path, encoding='utf-8') as rf:
+        records = [json.loads(line) for line in rf]
+    assert [(record['dataset'], record['name']) for record in records] == [('first', 'a0')]
+    resumed = DuplicateIndex(index_path)
+    assert len(resumed) == 1
+    assert resumed.is_duplicate(screenshot(0), LABELS)
+    assert not resumed.is_duplicate(screenshot(1), LABELS)
+
+
+def test_separate_index_files_do_not_share_samples(tmp_path):
+    first = DuplicateIndex(str(tmp_path / 'first' / 'index.jsonl'))
+    first.is_duplicate(screenshot(0), LABELS, 'https://example.com/')
+    first.commit('https://example.com/')
+
+    assert not DuplicateIndex(str(tmp_path / 'second' / 'index.jsonl')).is_duplicate(screenshot(0), LABELS)
+    assert DuplicateIndex(str(tmp_path / 'first' / 'index.jsonl')).is_duplicate(screenshot(0), LABELS)
+
+
+def test_max_distance_is_validated(tmp_path):
+    with pytest.raises(ValueError):
+        DuplicateIndex(str(tmp_path / 'index.jsonl'), max_distance=65)
@@ -0,0 +1,70 @@
+import threading
+
+import cv2
+import pytest
+
+from utils.dom_inspector import DOMInspector
+from utils.dom_query import DOMQuery
+from utils.inference_server import InferenceClient, InferenceServer
+from utils.model_registry import ModelRegistry
+from tests.test_dom_inspector import ScaleSensitiveDetector, frame_with_blocks
+
+BATCH_SIZE = 4
+
+
+@pytest.fixture
+def model(monkeypatch) -> ScaleSensitiveDetector:
+    model = ScaleSensitiveDetector()
+    monkeypatch.setattr(ModelRegistry(), 'get_yolo', lambda *args, **kwargs: model)
+    return model
+
+
+@pytest.fixture
+def server(model, tmp_path):
+    with InferenceServer('scale_sensitive.pt', unix_socket=str(tmp_path / 'inference.sock'),
+                         max_batch_size=BATCH_SIZE, batch_window=5) as server:
+        yield server
+
+
+def test_concurrent_requests_are_batched(server, model):
+    frame = frame_with_blocks()
+    expected = DOMInspector('scale_sensitive.pt').inspect(frame, use_ocr=False)
+    model.batches.clear()
+    barrier = threading.Barrier(BATCH_SIZE)
+    results = [None] * BATCH_SIZE
+
+    def request(index: int):
+        client = InferenceClient(server.url)
+        barrier.wait()
+        # PNG与原始数组两种请求体合并在同一个批次中
+        image = cv2.imencode('.png', frame)[1].tobytes() if index % 2 else frame
+        results[index] = client.inspect(image, use_ocr=False)
+        client.close()
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(BATCH_SIZE)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [expected] * BATCH_SIZE
+    assert model.batches == [BATCH_SIZE]
+    stats = InferenceClient(server.url).stats()
+    assert (stats['requests'], stats['batches'], stats['max_batch_size']) == (BATCH_SIZE, 1, BATCH_SIZE)
+
+
+def test_client_mode_filters_queries(model, tmp_path):
+    with InferenceServer('scale_sensitive.pt', unix_socket=str(tmp_path / 'inference.sock'), batch_window=0) as server:
+        dom_inspector = DOMInspector(server_url=server.url)
+
+        assert dom_inspector.inspect(frame_with_blocks(), use_ocr=False, dom_search=DOMQuery(name='missing')) == []
+        dom_list = dom_inspector.inspect(frame_with_blocks(), use_ocr=False,
+                                         dom_search=lambda item: item['box']['x1'] > 1000)
+        assert [item['box']['x1'] for item in dom_list] == [1200]
+        assert InferenceClient(server.url).health()['status'] == 'ok'
+
+
+def test_invalid_images_are_rejected(model, tmp_path):
+    with InferenceServer('scale_sensitive.pt', unix_socket=str(tmp_path / 'inference.sock'), batch_window=0) as server:
+        with pytest.raises(RuntimeError, match='400'):
+            InferenceClient(server.url).inspect(b'not an image', use_ocr=False)
@@ -0,0 +1,214 @@
+import itertools
+import random
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from utils import label_generator
+from utils.dataset_writer import DatasetWriter
+from utils.label_generator import GEOMETRY_SCRIPT, SCROLL_SCRIPT, SCROLL_TO_SCRIPT, LabelGenerator, plan_scroll_offsets
+
+VIEWPORT = {'width': 1000, 'height': 500}
+
+
+class LoadingPage:
+    """
+    模拟页面加载：load_states中的状态在等待时超时，元素数量按counts依次变化，最后一个数量之后保持不变。
+    """
+
+    def __init__(self, counts: list[int], timeouts: tuple = ()):
+        self.counts = counts
+        self.timeouts = timeouts
+        self.states = []
+        self.waits = []
+
+    def wait_for_load_state(self, state: str, timeout: float = None):
+        self.states.append((state, timeout))
+        if state in self.timeouts:
+            raise PlaywrightTimeoutError(f'{state} timeout')
+
+    def evaluate(self, script: str, arg=None) -> int:
+        return self.counts.pop(0) if len(self.counts) > 1 else self.counts[0]
+
+    def wait_for_timeout(self, timeout: float):
+        self.waits.append(timeout)
+
+
+def test_page_ready_returns_once_the_dom_is_stable(monkeypatch):
+    monkeypatch.setattr(label_generator, 'DOM_STABLE_INTERVAL', 1)
+    page = LoadingPage([10, 20, 25, 25])
+
+    started = time.perf_counter()
+    LabelGenerator._wait_for_page_ready(page, timeout=10000)
+
+    assert time.perf_counter() - started < 1
+    assert [state for state, _ in page.states] == ['load', 'networkidle']
+    assert all(0 < timeout <= 10000 for _, timeout in page.states)
+    assert page.waits == [1, 1, 1]
+
+
+def test_page_ready_stops_waiting_when_the_network_never_idles():
+    page = LoadingPage([10, 20], timeouts=('networkidle',))
+
+    LabelGenerator._wait_for_page_ready(page)
+
+    assert [state for state, _ in page.states] == ['load', 'networkidle']
+    assert page.waits == []
+
+
+def test_page_ready_is_bounded_by_the_timeout():
+    page = LoadingPage(list(range(1000)))
+
+    started = time.perf_counter()
+    LabelGenerator._wait_for_page_ready(page, timeout=50)
+
+    assert time.perf_counter() - started < 1
+    assert all(wait <= 50 for wait in page.waits)
+
+
+def test_data_names_do_not_collide_between_workers():
+    names = {LabelGenerator._data_name() for _ in range(1000)}
+
+    assert len(names) == 1000
+
+
+class FeedPage:
+    """
+    只实现截图流程用到的page接口，元素坐标为文档坐标，记录每次page.evaluate的参数。
+    """
+
+    def __init__(self, elements: list[dict], scroll_height: int):
+        self.elements = elements
+        self.scroll_height = scroll_height
+        self.scroll_y = 0
+        self.geometry_calls = []
+        self.screenshots = 0
+
+    def _scroll_to(self, offset: float):
+        self.scroll_y = min(max(offset, 0), max(self.scroll_height - VIEWPORT['height'], 0))
+
+    def evaluate(self, script: str, arg=None):
+        if script == GEOMETRY_SCRIPT:
+            self.geometry_calls.append(arg)
+            ids = range(len(self.elements)) if arg['selectors'] else arg['ids']
+            return {'viewport': dict(VIEWPORT),
+                    'scroll': {'x': 0, 'y': self.scroll_y, 'height': self.scroll_height},
+                    'elements': [dict(self.elements[id], id=id, y=self.elements[id]['y'] - self.scroll_y)
+                                 for id in ids]}
+        if script == SCROLL_SCRIPT:
+            element = self.elements[arg]
+            self._scroll_to(element['y'] + element['height'] / 2 - VIEWPORT['height'] / 2)
+        elif script == SCROLL_TO_SCRIPT:
+            self._scroll_to(arg)
+        else:
+            raise AssertionError(f'unexpected script: {script}')
+
+    def screenshot(self) -> bytes:
+        self.screenshots += 1
+        return b'png'
+
+
+def feed_elements() -> list[dict]:
+    elements = [{'label': 0, 'x': 10, 'y': 10, 'width': 100, 'height': 30, 'visible': True},
+                {'label': 1, 'x': 10, 'y': 60, 'width': 0, 'height': 0, 'visible': False}]
+    for row in range(6):
+        elements.append({'label': 1, 'x': 10, 'y': 100 + row * 300, 'width': 200, 'height': 250, 'visible': True})
+    return elements
+
+
+def generator(strategy: str, root: str) -> LabelGenerator:
+    """
+    跳过__init__中的浏览器启动与数据集配置，只保留截图流程需要的属性。
+    """
+    generator = LabelGenerator.__new__(LabelGenerator)
+    generator._scroll_strategy = strategy
+    generator._selectors = ['nav', 'card']
+    generator._writer = DatasetWriter(root)
+    generator._dedup = None
+    return generator
+
+
+def test_geometry_is_one_evaluate_per_snapshot(tmp_path):
+    page = FeedPage(feed_elements(), scroll_height=2000)
+    lg = generator('element', str(tmp_path))
+
+    saved = lg._capture_by_element(page, 'https://example.com/')
+    lg._writer.close()
+
+    assert saved == page.screenshots
+    assert len(page.geometry_calls) == saved
+    assert page.geometry_calls[0] == {'selectors': ['.nav', '.card'], 'ids': []}
+    # 滚动后只刷新上一次处于视口外的元素
+    assert all(call['selectors'] is None for call in page.geometry_calls[1:])
+    assert page.geometry_calls[1]['ids'] == [3, 4, 5, 6, 7]
+
+
+def test_invisible_elements_are_dropped_and_labels_use_the_viewport():
+    lg = LabelGenerator.__new__(LabelGenerator)
+    geometry = FeedPage(feed_elements(), scroll_height=2000).evaluate(GEOMETRY_SCRIPT, {'selectors': ['x'], 'ids': []})
+
+    visible, hidden = lg._element_visibility_classify(geometry)
+
+    assert [element['id'] for _, element in visible] == [0, 2]
+    assert [element['id'] for _, element in hidden] == [3, 4, 5, 6, 7]
+    assert LabelGenerator._element_position_for_yolo(geometry['elements'][2], geometry['viewport']) == \
+        '0.110000 0.450000 0.200000 0.500000'
+
+
+def geometry_of(elements: list[dict], scroll_height: int, scroll_y: int = 0) -> dict:
+    return {'viewport': dict(VIEWPORT), 'scroll': {'x': 0, 'y': scroll_y, 'height': scroll_height},
+            'elements': [dict(element, id=id, y=element['y'] - scroll_y) for id, element in enumerate(elements)]}
+
+
+def fully_visible(element: dict, offset: int) -> bool:
+    return offset <= element['y'] and element['y'] + element['height'] <= offset + VIEWPORT['height']
+
+
+def test_offsets_cover_every_element_with_the_fewest_screenshots():
+    rng = random.Random(0)
+    for _ in range(30):
+        elements = [{'label': 0, 'x': 0, 'y': rng.randint(0, 1500), 'width': 100, 'height': rng.randint(10, 400),
+                     'visible': True} for _ in range(rng.randint(1, 8))]
+        scroll_height = max(element['y'] + element['height'] for element in elements) + rng.randint(0, 200)
+        max_offset = max(scroll_height - VIEWPORT['height'], 0)
+
+        offsets = plan_scroll_offsets(geometry_of(elements, scroll_height, scroll_y=rng.randint(0, max_offset)))
+
+        assert offsets == sorted(offsets) and all(0 <= offset <= max_offset for offset in offsets)
+        assert all(any(fully_visible(element, offset) for offset in offsets) for element in elements)
+        # 最优解的滚动位置可以只取区间的端点
+        candidates = sorted({min(element['y'], max_offset) for element in elements})
+        minimum = next(size for size in range(1, len(elements) + 1)
+                       if any(all(any(fully_visible(element, offset) for offset in combination) for element in elements)
+                              for combination in itertools.combinations(candidates, size)))
+        assert len(offsets) == minimum
+
+
+def test_elements_that_cannot_be_captured_are_skipped():
+    elements = [{'label': 0, 'x': 0, 'y': 100, 'width': 100, 'height': 50, 'visible': True},
+                {'label': 0, 'x': 0, 'y': 1000, 'width': 100, 'height': 600, 'visible': True},
+                {'label': 0, 'x': 950, 'y': 1500, 'width': 100, 'height': 50, 'visible': True},
+                {'label': 0, 'x': 0, 'y': 1200, 'width': 100, 'height': 50, 'visible': False},
+                {'label': 0, 'x': 0, 'y': 1900, 'width': 100, 'height': 50, 'visible': True}]
+    geometry = geometry_of(elements, scroll_height=2000)
+
+    assert plan_scroll_offsets(geometry) == [100, 1500]
+    assert plan_scroll_offsets(geometry, element_ids=[4]) == [1500]
+    assert plan_scroll_offsets(geometry, element_ids=[1, 2, 3]) == []
+
+
+def test_plan_strategy_labels_every_element_with_fewer_screenshots(tmp_path):
+    elements = [{'label': 1, 'x': 10, 'y': 100 + row * 180, 'width': 200, 'height': 150, 'visible': True}
+                for row in range(10)]
+    counts = {}
+    for strategy in ('plan', 'element'):
+        page = FeedPage(elements, scroll_height=2000)
+        lg = generator(strategy, str(tmp_path / strategy))
+        capture = lg._capture_by_plan if strategy == 'plan' else lg._capture_by_element
+        counts[strategy] = capture(page, 'https://example.com/')
+        lg._writer.finish_url('https://example.com/')
+        lg._writer.close()
+        labels = [path.read_text() for path in (tmp_path / strategy).rglob('*.txt') if path.name != 'class.txt']
+        assert sum(len(text.splitlines()) for text in labels) >= len(elements)
+
+    assert counts['plan'] < counts['element']
@@ -0,0 +1,74 @@
+import numpy as np
+
+from utils.dom_result_handler import DOMResultHandler
+from utils.lazy_text import LazyDOMItem, LazyTextResolver, resolve_texts
+
+
+class FakeBrowser:
+
+    def __init__(self):
+        self.pages = [object()]
+
+
+class CountingRecognizer:
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image: np.ndarray, boxes: list[dict]) -> list[list[str]]:
+        self.calls.append([box['x1'] for box in boxes])
+        return [[f'text{box["x1"]}'] for box in boxes]
+
+
+def lazy_items(recognize, names=('title', 'link', 'title'), **extra) -> tuple[LazyTextResolver, list[LazyDOMItem]]:
+    resolver = LazyTextResolver(np.zeros((10, 10, 3), dtype=np.uint8), recognize)
+    items = [resolver.item({'box': {'x1': x1, 'y1': 0, 'x2': x1 + 1, 'y2': 1}, 'name': name, **extra})
+             for x1, name in enumerate(names)]
+    return resolver, items
+
+
+def test_text_is_recognized_once_and_the_frame_is_released():
+    recognize = CountingRecognizer()
+    resolver, items = lazy_items(recognize)
+
+    assert not any(item.resolved for item in items)
+    assert 'text' in items[0] and 'text' not in dict(items[0])
+    assert items[1]['text'] == ['text1']
+    assert items[1].get('text') == ['text1']
+    resolve_texts(items)
+
+    assert recognize.calls == [[1], [0, 2]]
+    assert all(item.resolved for item in items)
+    assert resolver._image_cv is None
+
+
+def test_existing_texts_are_not_recognized():
+    recognize = CountingRecognizer()
+    resolver, items = lazy_items(recognize, text=['已识别'])
+
+    resolve_texts(items)
+
+    assert recognize.calls == []
+    assert [item['text'] for item in items] == [['已识别']] * 3
+
+
+def test_filter_recognizes_only_items_whose_callback_reads_text():
+    recognize = CountingRecognizer()
+    _, items = lazy_items(recognize)
+    handler = DOMResultHandler(items, browser=FakeBrowser())
+
+    result = handler.filter(lambda item: item['name'] == 'title' and item['text'] == ['text2'])
+
+    assert recognize.calls == [[0, 2]]
+    assert not items[1].resolved
+    assert [item['box']['x1'] for item in result.get] == [2]
+
+
+def test_get_texts_recognizes_pending_items_in_one_batch():
+    recognize = CountingRecognizer()
+    _, items = lazy_items(recognize)
+    handler = DOMResultHandler(items, browser=FakeBrowser())
+
+    assert handler.get_texts == [['text0'], ['text1'], ['text2']]
+    assert handler.get_texts == [['text0'], ['text1'], ['text2']]
+    assert recognize.calls == [[0, 1, 2]]
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from utils.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    全新的ModelRegistry，slow.pt 的加载会阻塞到 release 被设置，其余模型立即加载。
+    """
+    monkeypatch.setattr(ModelRegistry, '_instance', None)
+    registry = ModelRegistry()
+    release, started = threading.Event(), threading.Event()
+    loads = []
+
+    def load_yolo(yolo_model, backend='ultralytics'):
+        loads.append(yolo_model)
+        if yolo_model == 'slow.pt':
+            started.set()
+            assert release.wait(5)
+        if yolo_model == 'broken.pt':
+            raise FileNotFoundError(yolo_model)
+        with registry._lock:
+            registry._stats['loads'] += 1
+        return object()
+
+    monkeypatch.setattr(registry, '_load_yolo', load_yolo)
+    monkeypatch.setattr(registry, '_model_size', lambda model, yolo_model: 1)
+    return registry, release, started, loads
+
+
+def test_slow_load_does_not_block_other_models(registry):
+    registry, release, started, loads = registry
+    fast = registry.get_yolo('fast.pt')
+    thread = threading.Thread(target=registry.get_yolo, args=('slow.pt',))
+    thread.start()
+    assert started.wait(5)
+
+    assert registry.get_yolo('fast.pt') is fast
+    assert registry.get_yolo('other.pt') is not None
+    assert thread.is_alive()
+    release.set()
+    thread.join(5)
+    assert loads == ['fast.pt', 'slow.pt', 'other.pt']
+
+
+def test_concurrent_requests_load_a_model_once(registry):
+    registry, release, started, loads = registry
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.get_yolo('slow.pt'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert loads == ['slow.pt']
+    assert len(models) == 4 and all(model is models[0] for model in models)
+    assert registry.stats['loads'] == 1
+
+
+def test_failed_load_is_not_counted(registry):
+    registry, *_ = registry
+
+    with pytest.raises(FileNotFoundError):
+        registry.get_yolo('broken.pt')
+
+    assert registry.stats['loads'] == 0
+    assert registry.stats['misses'] == 1
+
+
+def test_memory_budget_cannot_change_silently(registry):
+    registry, *_ = registry
+
+    with pytest.raises(ValueError):
+        ModelRegistry(memory_budget=1024)
+    assert registry.configure(1024).stats['memory_budget'] == 1024
@@ -0,0 +1,66 @@
+import pytest
+
+from utils.npl_code import NLP2Code
+
+transformers = pytest.importorskip('transformers')
+tokenizers = pytest.importorskip('tokenizers')
+
+
+@pytest.fixture(scope='module')
+def tiny_model(tmp_path_factory) -> str:
+    """
+    在临时目录中构造一个按字符分词的随机GPT-2小模型，不需要下载权重。
+    """
+    import torch
+
+    path = tmp_path_factory.mktemp('tiny_lm')
+    vocab = {'<eos>': 0}
+    for code in range(32, 127):
+        vocab.setdefault(chr(code), len(vocab))
+    vocab['\n'] = len(vocab)
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token='<eos>'))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Split('', behavior='isolated')
+    tokenizer.decoder = tokenizers.decoders.Fuse()
+    transformers.PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token='<eos>').save_pretrained(path)
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=len(vocab), n_positions=128, n_embd=32, n_layer=2, n_head=2,
+                                     bos_token_id=0, eos_token_id=0)
+    transformers.GPT2LMHeadModel(config).save_pretrained(path)
+    return str(path)
+
+
+def test_device_is_the_first_positional_argument():
+    nlp2code = NLP2Code('cpu')
+
+    assert nlp2code._device == 'cpu' and not nlp2code.loaded
+    with pytest.raises(TypeError):
+        NLP2Code('cpu', 'THUDM/codegeex2-6b')
+
+
+def test_batch_matches_single_generation(tiny_model):
+    messages = ['a', 'read a yaml file and return a dict']
+    nlp2code = NLP2Code('cpu', model_path=tiny_model, cache_size=0, max_new_tokens=8)
+
+    assert nlp2code.batch(messages) == [nlp2code(message) for message in messages]
+
+
+def test_batch_with_max_length_does_not_truncate_short_prompts(tiny_model):
+    messages = ['a', 'read a yaml file and return a dict']
+    nlp2code = NLP2Code('cpu', model_path=tiny_model, cache_size=0)
+    max_length = len(nlp2code.prompt(messages[1])) + 8
+    kwargs = {'max_length': max_length, 'min_length': max_length}
+
+    batched = nlp2code.batch(messages, **kwargs)
+
+    assert [len(code) for code in batched] == [max_length, max_length]
+    assert batched == [nlp2code(message, **kwargs) for message in messages]
+
+
+def test_cache_key_includes_generate_kwargs(tiny_model):
+    nlp2code = NLP2Code('cpu', model_path=tiny_model, max_new_tokens=4)
+
+    short = nlp2code('a')
+    longer = nlp2code('a', max_new_tokens=8)
+
+    assert len(short) < len(longer)
+    assert longer.startswith(short)
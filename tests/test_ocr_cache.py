@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from tests.test_dom_inspector import ScaleSensitiveDetector, frame_with_blocks
+from utils.dom_inspector import DOMInspector
+from utils.model_registry import ModelRegistry
+from utils.ocr_cache import OCRCache
+
+
+class FakeReader:
+
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, crop, detail=0):
+        self.calls += 1
+        return [f'{crop.shape[1]}x{crop.shape[0]}']
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    全新的ModelRegistry，PaddleOCR加载失败，EasyOCR使用FakeReader。
+    """
+    monkeypatch.setattr(ModelRegistry, '_instance', None)
+    registry = ModelRegistry()
+    reader = FakeReader()
+    loads = []
+
+    def load_ocr(ocr, lang):
+        loads.append(ocr)
+        if ocr == 'paddleocr':
+            raise ImportError('No module named paddleocr')
+        return 0, reader
+
+    monkeypatch.setattr(registry, '_load_ocr', load_ocr)
+    return registry, reader, loads
+
+
+def test_key_depends_on_pixels_engine_and_lang():
+    crop = np.zeros((20, 40, 3), dtype=np.uint8)
+    other = crop.copy()
+    other[0, 0, 0] = 1
+
+    view = np.zeros((40, 60, 3), dtype=np.uint8)[:20, :40]
+
+    assert OCRCache.key(crop, 'easyocr', 'ch') == OCRCache.key(view, 'easyocr', 'ch')
+    assert len({OCRCache.key(crop, 'easyocr', 'ch'), OCRCache.key(crop, 'paddleocr', 'ch'),
+                OCRCache.key(crop, 'easyocr', 'en'), OCRCache.key(other, 'easyocr', 'ch')}) == 4
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = OCRCache(max_items=2)
+    cache.set_many({'a': ['A'], 'b': ['B']})
+    cache.get_many(['a'])
+    cache.set_many({'c': ['C']})
+
+    assert cache.get_many(['a', 'b', 'c']) == [['A'], None, ['C']]
+    assert cache.stats['size'] == 2
+
+
+def test_disk_tier_is_shared_across_instances(tmp_path):
+    disk_path = str(tmp_path / 'ocr_cache.sqlite3')
+    first = OCRCache(disk_path=disk_path)
+    first.set_many({'a': ['频道', 'A']})
+    first.close()
+
+    second = OCRCache(disk_path=disk_path)
+
+    assert second.get_many(['a', 'b']) == [['频道', 'A'], None]
+    assert second.stats['disk_hits'] == 1 and second.stats['misses'] == 1
+    second.close()
+
+
+def test_paddle_fallback_is_registered_under_easyocr(registry):
+    registry, reader, loads = registry
+
+    assert registry.get_ocr('paddleocr', 'ch') == (0, reader)
+    assert registry.get_ocr('paddleocr', 'ch') == (0, reader)
+    assert registry.get_ocr('easyocr', 'ch') == (0, reader)
+    assert loads == ['paddleocr', 'easyocr']
+    assert registry.stats['ocr_models'] == [('easyocr', 'ch')]
+
+
+def test_cache_keys_use_the_loaded_engine(registry, monkeypatch):
+    registry, reader, _ = registry
+    model = ScaleSensitiveDetector()
+    monkeypatch.setattr(registry, 'get_yolo', lambda *args, **kwargs: model)
+    cache = OCRCache()
+    dom_inspector = DOMInspector(yolo_model='scale_sensitive.pt', ocr='paddleocr', ocr_cache=cache)
+    frame = frame_with_blocks()
+
+    dom_list = dom_inspector.inspect(frame)
+    crops = [dom_inspector._crop(frame, dom_detail['box']) for dom_detail in dom_list]
+
+    assert cache.get_many([OCRCache.key(crop, 'easyocr', 'ch') for crop in crops]) == \
+        [dom_detail['text'] for dom_detail in dom_list]
+    assert cache.get_many([OCRCache.key(crop, 'paddleocr', 'ch') for crop in crops]) == [None] * len(crops)
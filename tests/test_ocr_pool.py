@@ -0,0 +1,49 @@
+import gc
+import queue
+import threading
+import weakref
+
+import numpy as np
+
+from utils import ocr_pool
+from utils.ocr_pool import OCRWorkerPool
+
+
+def fake_pool(results: list[tuple]) -> OCRWorkerPool:
+    """
+    不启动工作进程，使用线程队列代替进程队列，results为预先放入的工作进程返回结果。
+    """
+    pool = OCRWorkerPool.__new__(OCRWorkerPool)
+    pool._num_processes = 1
+    pool._timeout = 1
+    pool._task_id = 1
+    pool._lock = threading.Lock()
+    pool._closed = False
+    pool._engine = 'easyocr'
+    pool._tasks = queue.Queue()
+    pool._results = queue.Queue()
+    pool._workers = []
+    for result in results:
+        pool._results.put(result)
+    return pool
+
+
+def test_late_results_from_earlier_calls_are_skipped():
+    pool = fake_pool([('result', 1, [(0, ['stale'])]), ('error', 1, 'stale error'), ('result', 2, [(0, ['fresh'])])])
+
+    texts = pool.recognize(np.zeros((20, 20, 3), dtype=np.uint8), [(0, 0, 10, 10)])
+
+    assert texts == [['fresh']]
+    assert pool._tasks.get_nowait()[0] == 2
+
+
+def test_pool_is_shut_down_when_collected(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr_pool, '_shutdown', lambda *args: calls.append(args))
+    pool = fake_pool([])
+    pool._finalizer = weakref.finalize(pool, ocr_pool._shutdown, pool._workers, pool._tasks, pool._results)
+
+    del pool
+    gc.collect()
+
+    assert len(calls) == 1
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from utils.ocr_recognizer import OCRRecognizer
+
+
+class FakeEasyOCRReader:
+    """
+    按裁剪图片中的文本行数返回结果，模拟readtext在裁剪图片内再做一次文本检测的行为。
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, crop, detail=0):
+        self.calls += 1
+        return [f'line{index}' for index in range(int(crop[0, 0, 0]))]
+
+
+def multi_line_crop(lines: int) -> np.ndarray:
+    crop = np.full((24 * lines, 160, 3), 255, dtype=np.uint8)
+    crop[0, 0, 0] = lines
+    return crop
+
+
+def test_easyocr_defaults_to_per_crop_recognition():
+    reader = FakeEasyOCRReader()
+    recognizer = OCRRecognizer(0, reader)
+    crops = [multi_line_crop(2), multi_line_crop(1), multi_line_crop(3)]
+
+    texts = recognizer.recognize_batch(crops)
+
+    assert texts == [recognizer.recognize(crop) for crop in crops]
+    assert texts[0] == ['line0', 'line1']
+    assert reader.calls == 2 * len(crops)
+
+
+def test_batch_size_defaults_by_engine():
+    assert OCRRecognizer(0, FakeEasyOCRReader())._batch_size == 0
+    assert OCRRecognizer(1, object())._batch_size == OCRRecognizer.DEFAULT_BATCH_SIZE
+    assert OCRRecognizer(0, FakeEasyOCRReader(), batch_size=8)._batch_size == 8
+
+
+class FakeTextRecognizer:
+    """
+    模拟PaddleOCR的text_recognizer，记录每次调用时的rec_batch_num。
+    """
+
+    rec_image_shape = [3, 48, 320]
+
+    def __init__(self, fail: bool = False):
+        self.rec_batch_num = 6
+        self.fail = fail
+        self.batch_nums = []
+
+    def __call__(self, images):
+        self.batch_nums.append(self.rec_batch_num)
+        if self.fail:
+            raise RuntimeError('recognize failed')
+        return [(f'{image.shape[1]}', 0.9) for image in images], 0.0
+
+
+class FakePaddleOCR:
+
+    def __init__(self, fail: bool = False):
+        self.text_recognizer = FakeTextRecognizer(fail)
+
+
+def test_paddle_batch_restores_shared_rec_batch_num():
+    ocr_model = FakePaddleOCR()
+    crops = [np.full((24, 80, 3), 255, dtype=np.uint8) for _ in range(5)]
+
+    texts = OCRRecognizer(1, ocr_model, batch_size=4).recognize_batch(crops)
+
+    assert texts == [['160']] * 5
+    assert ocr_model.text_recognizer.batch_nums == [4, 1]
+    assert ocr_model.text_recognizer.rec_batch_num == 6
+
+
+def test_paddle_batch_restores_rec_batch_num_on_error():
+    ocr_model = FakePaddleOCR(fail=True)
+
+    with pytest.raises(RuntimeError):
+        OCRRecognizer(1, ocr_model, batch_size=4).recognize_batch([np.full((24, 80, 3), 255, dtype=np.uint8)])
+
+    assert ocr_model.text_recognizer.rec_batch_num == 6
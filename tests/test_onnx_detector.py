@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from utils.onnx_detector import ONNXDetector
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('ultralytics')
+from ultralytics.data.augment import LetterBox
+from ultralytics.utils import ops
+
+try:
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:
+    from ultralytics.utils.ops import non_max_suppression
+
+SHAPES = [(1080, 1920), (400, 600), (777, 333), (640, 640)]
+
+
+def detector(image_size: tuple[int, int] = (640, 640), conf: float = ONNXDetector.DEFAULT_CONF) -> ONNXDetector:
+    """
+    不加载ONNX模型，只设置前处理与后处理用到的属性。
+    """
+    detector = ONNXDetector.__new__(ONNXDetector)
+    detector._image_size = image_size
+    detector._conf = conf
+    detector._iou = ONNXDetector.DEFAULT_IOU
+    detector._max_det = ONNXDetector.DEFAULT_MAX_DET
+    detector._names = {0: 'channel-link', 1: 'video-card', 2: 'up-name'}
+    return detector
+
+
+def random_output(rng: np.random.Generator, count: int = 500, size: int = 640, classes: int = 3) -> np.ndarray:
+    """
+    模拟 (4 + 类别数, 候选框数) 的模型输出，候选框为letterbox后的 (中心x, 中心y, 宽, 高)。
+    """
+    xy = rng.uniform(0, size, (count, 2))
+    wh = rng.uniform(4, size / 4, (count, 2))
+    scores = rng.uniform(0, 1, (count, classes)) ** 3
+    return np.concatenate([xy, wh, scores], axis=1).T.astype(np.float32)
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('size', [(640, 640), (320, 320)])
+def test_letterbox_matches_ultralytics(shape, size):
+    image = np.random.default_rng(0).integers(0, 256, (*shape, 3), dtype=np.uint8)
+
+    tensor = detector(size)._preprocess(image)
+    expected = LetterBox(new_shape=size, auto=False)(image=image)
+
+    assert tensor.shape == (1, 3, *size)
+    assert np.allclose(tensor[0], expected[..., ::-1].transpose(2, 0, 1) / 255, atol=1e-6)
+
+
+def test_nms_matches_torchvision():
+    from torchvision.ops import nms
+    rng = np.random.default_rng(1)
+    xy = rng.uniform(0, 600, (300, 2))
+    boxes = np.concatenate([xy, xy + rng.uniform(5, 120, (300, 2))], axis=1).astype(np.float32)
+    scores = rng.uniform(0, 1, 300).astype(np.float32)
+
+    keep = ONNXDetector._nms(boxes, scores, 0.5)
+
+    assert keep.tolist() == nms(torch.from_numpy(boxes), torch.from_numpy(scores), 0.5).tolist()
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_postprocess_matches_ultralytics(shape):
+    output = random_output(np.random.default_rng(2))
+    onnx_detector = detector()
+
+    detections = onnx_detector._postprocess(output, shape)
+    expected = non_max_suppression(torch.from_numpy(output[None]), ONNXDetector.DEFAULT_CONF, ONNXDetector.DEFAULT_IOU,
+                                   max_det=ONNXDetector.DEFAULT_MAX_DET)[0].numpy()
+    expected[:, :4] = ops.scale_boxes((640, 640), expected[:, :4], shape)
+
+    boxes = np.array([[item['box'][key] for key in ('x1', 'y1', 'x2', 'y2')] for item in detections])
+    assert len(detections) == len(expected) > 0
+    assert np.allclose(boxes, expected[:, :4], atol=1e-3)
+    assert [item['confidence'] for item in detections] == pytest.approx(expected[:, 4].tolist())
+    assert [item['class'] for item in detections] == expected[:, 5].astype(int).tolist()
+    assert {item['name'] for item in detections} <= set(onnx_detector.names.values())
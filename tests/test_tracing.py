@@ -0,0 +1,98 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from utils.dom_inspector import DOMInspector
+from utils.tracing import NOOP_SPAN, Span, Tracer, tracer
+from tests.test_dom_inspector import ScaleSensitiveDetector, frame_with_blocks
+
+
+def recorded(trace: Tracer, name: str, durations_ms: list[float]):
+    for duration in durations_ms:
+        span = Span(trace, name, {})
+        span.duration = int(duration * 1e6)
+        trace._record(span)
+
+
+def test_disabled_tracer_records_nothing():
+    trace = Tracer(enabled=False)
+
+    with trace.span('browser.capture', size=1) as span:
+        span.set(bytes=10)
+
+    assert span is NOOP_SPAN
+    assert trace.spans == [] and trace.summary() == {}
+
+
+def test_summary_percentiles_match_numpy():
+    trace = Tracer(enabled=True)
+    durations = [float(value) for value in np.random.default_rng(0).uniform(1, 100, 37)]
+    recorded(trace, 'inspector.detect', durations)
+    recorded(trace, 'handler.click', [500])
+
+    summary = trace.summary()
+
+    assert list(summary) == ['inspector.detect', 'handler.click']
+    stats = summary['inspector.detect']
+    assert stats['count'] == 37 and stats['max_ms'] == round(max(durations), 3)
+    assert stats['p50_ms'] == pytest.approx(np.percentile(durations, 50), abs=1e-3)
+    assert stats['p95_ms'] == pytest.approx(np.percentile(durations, 95), abs=1e-3)
+    assert '| handler.click | 1 | 500.0 |' in trace.format_summary()
+
+
+def test_chrome_trace_nests_spans_per_thread(tmp_path):
+    trace = Tracer(enabled=True)
+
+    def step():
+        with trace.span('handler.locate', elements=3):
+            with trace.span('inspector.ocr', boxes=(1, 2), engine=object()) as span:
+                span.set(hits=1)
+
+    worker = threading.Thread(target=step)
+    worker.start()
+    worker.join()
+    with pytest.raises(ValueError):
+        with trace.span('browser.capture'):
+            raise ValueError('boom')
+    events = json.loads(open(trace.export_chrome_trace(str(tmp_path / 'trace.json')), encoding='utf-8').read())
+
+    inner, outer, failed = events['traceEvents']
+    assert (inner['name'], outer['name'], inner['ph'], inner['cat']) == ('inspector.ocr', 'handler.locate', 'X',
+                                                                         'inspector')
+    assert inner['tid'] == outer['tid'] != failed['tid']
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert inner['args']['boxes'] == [1, 2] and inner['args']['hits'] == 1
+    assert isinstance(inner['args']['engine'], str)
+    assert failed['args'] == {'error': "ValueError('boom')"}
+
+
+def test_traced_decorator_and_span_limit():
+    trace = Tracer(enabled=True, max_spans=2)
+
+    @trace.traced()
+    def work(value: int) -> int:
+        return value * 2
+
+    assert [work(value) for value in range(3)] == [0, 2, 4]
+    assert [span.name for span in trace.spans] == [work.__qualname__] * 2
+    trace.disable()
+    work(1)
+    assert len(trace.spans) == 2
+
+
+def test_inspector_stages_are_recorded(monkeypatch):
+    dom_inspector = DOMInspector(yolo_model='scale_sensitive.pt')
+    model = ScaleSensitiveDetector()
+    monkeypatch.setattr(dom_inspector._registry, 'get_yolo', lambda *args, **kwargs: model)
+    tracer.clear()
+    tracer.enable()
+    try:
+        dom_inspector.inspect(frame_with_blocks(), use_ocr=False)
+    finally:
+        tracer.disable()
+    spans = {span.name: span for span in tracer.spans}
+    tracer.clear()
+
+    assert spans['inspector.detect'].attributes['boxes'] == 2
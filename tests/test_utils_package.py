@@ -0,0 +1,33 @@
+import importlib
+import subprocess
+import sys
+from os import path
+
+import pytest
+
+import utils
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+HEAVY_MODULES = ('cv2', 'numpy', 'torch', 'ultralytics', 'easyocr', 'paddleocr', 'yaml', 'playwright')
+
+
+@pytest.mark.parametrize('name', sorted(utils._LAZY_ATTRIBUTES))
+def test_lazy_attributes_resolve_to_their_module(name):
+    value = getattr(utils, name)
+
+    assert value is getattr(importlib.import_module(utils._LAZY_ATTRIBUTES[name]), name)
+    assert vars(utils)[name] is value
+
+
+def test_unknown_attributes_raise_attribute_error():
+    with pytest.raises(AttributeError, match='Missing'):
+        utils.Missing
+    assert set(utils.__all__) <= set(dir(utils))
+
+
+@pytest.mark.parametrize('statement', ['import utils', 'from utils import ProjectPath'])
+def test_cold_import_skips_heavy_dependencies(statement):
+    code = f'import sys; {statement}; print(sorted(set(sys.modules) & set({HEAVY_MODULES!r})))'
+    process = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert process.stdout.strip() == '[]'
@@ -1,4 +1,52 @@
-from utils.browser_launcher import BrowserLauncher
-from utils.label_generator import LabelGenerator
-from utils.project_path import ProjectPath
-from utils.dom_inspector import DOMInspector
+"""
+utils包按需导入：访问 utils.DOMInspector 等属性时才导入对应的模块，
+只需要 ProjectPath 或浏览器封装的脚本不会付出 cv2、ultralytics、torch 等依赖的导入成本。
+"""
+import importlib
+import typing
+
+if typing.TYPE_CHECKING:
+    from utils.browser_launcher import BrowserLauncher
+    from utils.label_generator import LabelGenerator
+    from utils.project_path import ProjectPath
+    from utils.dom_inspector import DOMInspector
+    from utils.dom_query import DOMQuery
+    from utils.ocr_cache import OCRCache
+    from utils.async_browser_launcher import AsyncBrowser, AsyncBrowserLauncher, AsyncDOMInspector
+    from utils.browser_pool import BrowserPool
+    from utils.dataset_writer import DatasetWriter
+    from utils.duplicate_index import DuplicateIndex
+    from utils.tracing import tracer
+
+# 属性名 -> 所在模块
+_LAZY_ATTRIBUTES = {
+    'BrowserLauncher': 'utils.browser_launcher',
+    'LabelGenerator': 'utils.label_generator',
+    'ProjectPath': 'utils.project_path',
+    'DOMInspector': 'utils.dom_inspector',
+    'DOMQuery': 'utils.dom_query',
+    'OCRCache': 'utils.ocr_cache',
+    'AsyncBrowser': 'utils.async_browser_launcher',
+    'AsyncBrowserLauncher': 'utils.async_browser_launcher',
+    'AsyncDOMInspector': 'utils.async_browser_launcher',
+    'BrowserPool': 'utils.browser_pool',
+    'DatasetWriter': 'utils.dataset_writer',
+    'DuplicateIndex': 'utils.duplicate_index',
+    'tracer': 'utils.tracing',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'utils' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    # 缓存到模块命名空间，之后的访问不再经过__getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,353 @@
+import asyncio
+import base64
+import functools
+import itertools
+import logging
+import typing
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from playwright.async_api import async_playwright, Page, BrowserContext, Error
+from utils.browser_launcher import Browser, decode_frame
+from utils.dom_inspector import DOMInspector
+from utils.dom_result_handler import DOMResultHandler
+
+
+class AsyncBrowser:
+    """
+    基于playwright.async_api封装的异步浏览器启动类，一个事件循环内可以同时驱动多个页面。
+    请使用 await AsyncBrowser.launch() 创建实例。
+
+    Example:
+        browser = await AsyncBrowser.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto('https://www.bilibili.com/')
+        frame = await browser.capture_frame(page)
+        await browser.close()
+    """
+
+    BROWSER_MAP = Browser.BROWSER_MAP
+    DEFAULT_VIEWPORT_SIZE = Browser.DEFAULT_VIEWPORT_SIZE
+
+    def __init__(self, playwright, browser_name: str, browser: BrowserContext, page: Page):
+        self._playwright = playwright
+        self._browser_name = browser_name
+        self._browser = browser
+        self._page = page
+        self._cdp_sessions = {}
+
+    @classmethod
+    async def launch(cls, browser_type: str = 'chrome', headless: bool = False) -> 'AsyncBrowser':
+        """
+        启动浏览器。
+        :param browser_type: 需要启动的浏览器，可选 chromium、firefox、webkit，默认chrome
+        :param headless: 是否以无头模式启动，默认False
+        :return: AsyncBrowser
+        """
+        browser_type = browser_type or 'chrome'
+        browser_name = cls.BROWSER_MAP.get(browser_type, None)
+        if not browser_name:
+            raise ValueError(f'传入的浏览器: {browser_type} 不存在. 支持的浏览器: chromium, firefox, webkit')
+
+        playwright = await async_playwright().start()
+        channel = browser_type if browser_type == 'chrome' else None
+        _browser = await getattr(playwright, browser_name).launch(headless=headless, channel=channel)
+        _browser = await _browser.new_context(viewport=cls.DEFAULT_VIEWPORT_SIZE)
+        _page = await _browser.new_page()
+        return cls(playwright, browser_name, _browser, _page)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        关闭浏览器与playwright。
+        """
+        await self._browser.close()
+        await self._playwright.stop()
+
+    async def new_page(self) -> Page:
+        """
+        打开一个新的页面
+        :return: Page
+        """
+        return await self._browser.new_page()
+
+    async def capture_frame(self, element_page: Page = None, clip: dict = None, image_type: str = 'png',
+                            quality: int = 90) -> np.ndarray:
+        """
+        截取页面并返回BGR格式的图像数组，参数与Browser.capture_frame一致，解码在线程池中执行，不阻塞事件循环。
+        :param (Page) element_page: 可选。需要截图的页面，默认为初始页面
+        :param (dict) clip: 可选。截图区域，默认截取整个可视窗口
+        :param (str) image_type: 可选。截图的编码格式，可选 png、jpeg，默认png
+        :param (int) quality: 可选。jpeg的图像质量，0-100，默认90
+        :return: BGR格式的图像数组
+        """
+        element_page = self._page if not element_page else element_page
+        if image_type not in ['jpeg', 'png']:
+            raise ValueError(f'传入的截图格式: {image_type} 不存在. 支持的格式: jpeg, png')
+
+        data = None
+        if self._browser_name == 'chromium' and not clip:
+            try:
+                session = self._cdp_sessions.get(element_page)
+                if session is None:
+                    session = self._cdp_sessions[element_page] = await self._browser.new_cdp_session(element_page)
+                    element_page.once('close', lambda page: self._cdp_sessions.pop(page, None))
+                params = {'format': image_type, 'optimizeForSpeed': True, 'captureBeyondViewport': False}
+                if image_type == 'jpeg': params['quality'] = quality
+                data = base64.b64decode((await session.send('Page.captureScreenshot', params))['data'])
+            except Error:
+                self._cdp_sessions.pop(element_page, None)
+        if data is None:
+            options = {'type': image_type, 'clip': clip}
+            if image_type == 'jpeg': options['quality'] = quality
+            data = await element_page.screenshot(**options)
+        return await asyncio.to_thread(decode_frame, data)
+
+    @property
+    def page(self) -> Page:
+        return self._page
+
+    @property
+    def browser(self) -> BrowserContext:
+        return self._browser
+
+    @property
+    def pages(self) -> list[Page]:
+        return self._browser.pages
+
+
+class AsyncBrowserLauncher:
+    """
+    异步浏览器的单例启动类，同一个事件循环内只启动一个浏览器，与BrowserLauncher对应。
+
+    Example:
+        browser = await AsyncBrowserLauncher.launch(headless=True)
+    """
+
+    # 按事件循环保存实例，事件循环被回收后实例随之释放，已关闭的事件循环在下次启动时清除
+    _instances: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncBrowser]' = weakref.WeakKeyDictionary()
+
+    @classmethod
+    async def launch(cls, browser_type: str = 'chrome', headless: bool = False, **kwargs) -> AsyncBrowser:
+        for closed_loop in [loop for loop in cls._instances if loop.is_closed()]:
+            cls._instances.pop(closed_loop, None)
+        loop = asyncio.get_running_loop()
+        if loop not in cls._instances:
+            cls._instances[loop] = await AsyncBrowser.launch(browser_type=browser_type, headless=headless)
+        return cls._instances[loop]
+
+
+class AsyncDOMResultHandler(DOMResultHandler):
+    """
+    DOMResultHandler的异步版本，绑定到一个异步页面对象，click、input、scroll为协程。
+    需要读取text的 filter 与 get_texts 也是协程，懒加载文本的OCR识别在线程池中执行，不阻塞事件循环；
+    按检测字段与位置的查询方法(by_name、right_of等)与DOMResultHandler一致，返回AsyncDOMResultHandler。
+
+    Example:
+        result = await async_dom_inspector(image=frame, page=page)
+        await result.click(lambda item: item.get('name') == 'channel-link')
+        texts = await result.by_name('video-title').get_texts
+    """
+
+    def __init__(self, result_list, page: Page = None, executor: ThreadPoolExecutor = None,
+                 browser: AsyncBrowser = None):
+        """
+        Args:
+            result_list (list[dict]): 一系列DOM元素详细信息，每个元素都用字典表示。
+            page (Page, optional): 执行操作的异步页面对象，默认None使用browser的初始页面。
+            executor (ThreadPoolExecutor, optional): 懒加载文本时执行OCR识别的线程池，默认使用事件循环的默认线程池。
+            browser (AsyncBrowser, optional): 没有传入page时使用该浏览器的初始页面。
+        """
+        if page is None and browser is None:
+            raise ValueError('请传入执行操作的page或是browser')
+        self._logging = logging.getLogger('Handler')
+        self._result_list = result_list
+        self._build_columns()
+        self._page = page if page is not None else browser.page
+        self._page_index = None
+        self._executor = executor
+
+    def _new(self, result_list: list[dict]):
+        return AsyncDOMResultHandler(result_list, page=self._page, executor=self._executor)
+
+    async def _run(self, func: typing.Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def filter(self, callback: typing.Callable) -> 'AsyncDOMResultHandler':
+        """
+        在线程池中根据回调筛选元素，回调需要读取的懒加载文本在线程池中识别。
+
+        Args:
+            callback (Callable): 用于筛选DOM元素的回调函数。
+
+        returns:
+            AsyncDOMResultHandler: 包含筛选元素的新实例。
+        """
+        return await self._run(DOMResultHandler.filter, self, callback)
+
+    @property
+    def get_texts(self) -> typing.Awaitable[list]:
+        """
+        获取DOM元素的文本内容列表，需要 await，懒加载文本在线程池中识别。
+
+        returns:
+            Awaitable[list]: 包含DOM元素文本内容的列表。
+        """
+        return self._run(DOMResultHandler.get_texts.fget, self)
+
+    async def _position(self, callback: typing.Callable = None) -> tuple[float, float] or None:
+        """
+        在线程池中获取元素的中心坐标，懒加载文本的OCR识别不会阻塞事件循环。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._get_position, callback)
+
+    async def click(self, callback: typing.Callable = None, double: bool = False):
+        """
+        点击DOM元素。
+
+        Args:
+            callback (Callable): 用于筛选DOM元素的回调函数。
+            double (bool): 是否执行双击操作。
+
+        returns:
+            None
+        """
+        x, y = await self._position(callback)
+        if not x or not y:
+            return None
+        if not double:
+            await self._page.mouse.click(x=x, y=y)
+        else:
+            await self._page.mouse.dblclick(x=x, y=y)
+
+    async def input(self, text: str, clear: bool = True, callback: typing.Callable = None):
+        """
+        模拟在DOM输入元素中输入文本。
+
+        Args:
+            text (str): 需要输入的文本。
+            clear (bool): 是否需要在输入之前清空文本框，默认Ture 清除。
+            callback (Callable): 用于筛选DOM元素的回调函数。
+
+        returns:
+            None
+        """
+        x, y = await self._position(callback)
+        if not x or not y:
+            return None
+        await self._page.mouse.click(x=x, y=y)
+        if clear:
+            await self._page.keyboard.press('Control+A')
+            await self._page.keyboard.press('Backspace')
+        await self._page.keyboard.insert_text(text=text)
+
+    async def scroll(self, callback: typing.Callable = None, scroll_x: float = 100.00, scroll_y: float = 100.00,
+                     wait: float = DOMResultHandler.DEFAULT_SCROLL_WAIT):
+        """
+        模拟在DOM元素上滚动。
+
+        Args:
+            callback (Callable): 用于筛选DOM元素的回调函数。
+            scroll_x (float): 水平方向的滚动量。
+            scroll_y (float): 垂直方向的滚动量。
+            wait (float): 移动鼠标后与滚动后的等待时间，单位毫秒，传入0不等待。
+
+        returns:
+            None
+        """
+        x, y = await self._position(callback)
+        await self._page.mouse.move(x, y)
+        if wait: await self._page.wait_for_timeout(wait)
+        await self._page.mouse.wheel(delta_x=scroll_x, delta_y=scroll_y)
+        if wait: await self._page.wait_for_timeout(wait)
+
+    @property
+    def page(self) -> Page:
+        return self._page
+
+
+class AsyncDOMInspector:
+    """
+    DOMInspector的异步版本，推理在线程池中执行，等待推理时事件循环可以继续驱动其他页面的加载与操作。
+
+    Args:
+        yolo_model (str): YOLO模型的路径。
+        executor (ThreadPoolExecutor, optional): 执行推理的线程池，默认创建单线程的线程池。
+        browser (AsyncBrowser, optional): 调用时没有传入page与browser时，结果绑定到该浏览器的初始页面。默认为None。
+        **kwargs: 其余参数传给DOMInspector，例如 ocr、ocr_batch_size、num_processes、ocr_cache。
+
+    Notes:
+        - ultralytics的模型不是线程安全的，默认的线程池只有一个线程，推理按顺序执行，与页面的IO操作重叠。
+
+    Example:
+        async def run(browser, inspector, url):
+            page = await browser.new_page()
+            await page.goto(url)
+            result = await inspector(image=await browser.capture_frame(page), page=page)
+            await result.click(lambda item: item.get('name') == 'channel-link')
+
+        async def main(urls):
+            browser = await AsyncBrowserLauncher.launch(headless=True)
+            inspector = AsyncDOMInspector(yolo_model=path.join(ProjectPath.root_path, 'bilibili_best.pt'))
+            await asyncio.gather(*(run(browser, inspector, url) for url in urls))
+    """
+
+    def __init__(self, yolo_model: str, executor: ThreadPoolExecutor = None, browser: AsyncBrowser = None, **kwargs):
+        self._inspector = DOMInspector(yolo_model, **kwargs)
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='DOMInspector')
+        self._browser = browser
+        # 增量识别按页面保存上一帧，页面对象映射到递增的页面索引，页面关闭时清除对应的上一帧
+        self._page_indexes: 'weakref.WeakKeyDictionary[Page, int]' = weakref.WeakKeyDictionary()
+        self._page_counter = itertools.count()
+
+    async def __call__(self, image: bytes | np.ndarray, page: Page = None, browser: AsyncBrowser = None,
+                       **kwargs) -> AsyncDOMResultHandler:
+        """
+        在图像中检测DOM元素并执行OCR识别。
+
+        Args:
+            image (bytes | np.ndarray): 输入的图像字节数据，或是已解码的BGR图像数组。
+            page (Page, optional): 截图所在的异步页面对象，返回的AsyncDOMResultHandler在该页面上执行操作。
+            browser (AsyncBrowser, optional): 没有传入page时使用该浏览器的初始页面，默认使用构造时传入的browser。
+            **kwargs: 其余参数与DOMInspector.inspect一致，例如 lang、dom_search、use_ocr、lazy_ocr。
+
+        Returns:
+            AsyncDOMResultHandler: AsyncDOMResultHandler实例化对象。
+        """
+        browser = browser if browser is not None else self._browser
+        if page is None:
+            if browser is None:
+                raise ValueError('请传入截图所在的page或是browser')
+            page = browser.page
+        kwargs.setdefault('page_index', self._page_index(page))
+        loop = asyncio.get_running_loop()
+        dom_list = await loop.run_in_executor(self._executor, functools.partial(self._inspector.inspect, image, **kwargs))
+        return AsyncDOMResultHandler(dom_list, page=page, executor=self._executor)
+
+    def _page_index(self, page: Page) -> int:
+        """
+        返回页面对应的页面索引，首次出现的页面分配新的索引，并在页面关闭时清除增量识别保存的上一帧。
+        """
+        index = self._page_indexes.get(page)
+        if index is None:
+            index = self._page_indexes[page] = next(self._page_counter)
+            page.once('close', lambda _: self._inspector.reset_incremental(index))
+        return index
+
+    def close(self):
+        """
+        关闭线程池与DOMInspector的OCR工作进程池。
+        """
+        self._executor.shutdown(wait=True)
+        self._inspector.close()
+
+    @property
+    def inspector(self) -> DOMInspector:
+        return self._inspector
@@ -1,5 +1,26 @@
+import base64
+import typing
 import playwright.sync_api
 from playwright.sync_api import sync_playwright, expect
+from utils.tracing import tracer
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+
+
+def decode_frame(data: bytes) -> 'np.ndarray':
+    """
+    把截图的编码数据解码为BGR格式的图像数组。
+    :param (bytes) data: PNG或JPEG编码的截图
+    :return: BGR格式的图像数组
+    """
+    # 只有截图解码需要cv2与numpy，延迟导入以加快 import utils
+    import cv2
+    import numpy as np
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags=cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError(f'截图解码失败，共 {len(data)} 字节，不是有效的PNG或JPEG数据')
+    return frame
 
 
 class Browser:
@@ -14,23 +35,47 @@ class Browser:
     }
     DEFAULT_VIEWPORT_SIZE = {'width': 1920, 'height': 1080}
 
-    def __init__(self, browser_type: str = 'chrome', headless: bool = False):
+    def __init__(self, browser_type: str = 'chrome', headless: bool = False, storage_state: str or dict = None):
         """
         构造函数
         :param browser_type: 需要启动的浏览器，可选 chromium、firefox、webkit，默认chrome
         :param headless: 是否以无头模式启动，默认False
+        :param storage_state: 可选。浏览器上下文的初始存储状态(cookie、localStorage)，可以是文件路径或是 browser.storage_state() 的返回值
         """
         self._playwright = sync_playwright().start()
+        self._browser_name = self.BROWSER_MAP.get(browser_type or 'chrome')
+        self._storage_state = storage_state
+        self._cdp_sessions = {}
         self._page, self._browser = self._launcher(browser_type or 'chrome', headless)
         self._browser.on('page', lambda page: page.set_viewport_size(self.DEFAULT_VIEWPORT_SIZE))
 
     def __del__(self):
         try:
-            self._browser.close()
-            self._playwright.stop()
+            self.close()
         except TypeError:
             pass
 
+    def close(self):
+        """
+        关闭浏览器与playwright。
+        """
+        self._browser.close()
+        self._playwright.stop()
+
+    def reset(self):
+        """
+        关闭当前的浏览器上下文并创建一个新的上下文与页面，清除上一个流程留下的cookie、页面等状态。
+        :return: self，实现链式调用
+        """
+        browser = self._browser.browser
+        self._browser.close()
+        self._cdp_sessions.clear()
+        self._browser = browser.new_context(storage_state=self._storage_state)
+        self._page = self._browser.new_page()
+        self._page.set_viewport_size(self.DEFAULT_VIEWPORT_SIZE)
+        self._browser.on('page', lambda page: page.set_viewport_size(self.DEFAULT_VIEWPORT_SIZE))
+        return self
+
     def _launcher(self, browser_type: str or None = None, headless: bool = False) -> (
             playwright.sync_api.Page, playwright.sync_api.BrowserContext):
         """
@@ -46,7 +91,7 @@ class Browser:
         browser_type = browser_type if browser_type == 'chrome' else None
 
         _browser = getattr(self._playwright, browser_name).launch(headless=headless, channel=browser_type)
-        _browser = _browser.new_context()
+        _browser = _browser.new_context(storage_state=self._storage_state)
         _page = _browser.new_page()
         _page.set_viewport_size(self.DEFAULT_VIEWPORT_SIZE)
         return _page, _browser
@@ -79,6 +124,7 @@ class Browser:
         else:
             return element_page.locator(selector=selector, has_text=has_text)
 
+    @tracer.traced('browser.type')
     def type(self, selector, text: str = '', selector_type: str = None, clear: bool = True,
              delay: float | int = 0 or 0.00,
              element_page=None):
@@ -135,6 +181,7 @@ class Browser:
 
         return self
 
+    @tracer.traced('browser.click')
     def click(self, selector, selector_type=None, delay=0, element_page=None, has_text=None):
         """
         基于playwright封装的点击方法，可以对多个元素进行过批量点击
@@ -182,6 +229,56 @@ class Browser:
                                  element_page=element_page).click()
         return self
 
+    def capture_frame(self, element_page: playwright.sync_api.Page = None, clip: dict = None,
+                      image_type: str = 'png', quality: int = 90) -> 'np.ndarray':
+        """
+        截取页面并直接返回BGR格式的图像数组，可以直接传入DOMInspector，避免重复解码的开销。
+        Chromium下截取整个可视窗口时通过CDP的Page.captureScreenshot截图(开启optimizeForSpeed)，
+        其他浏览器或是指定了截图区域时使用page.screenshot。
+        默认使用无损的PNG，与检测模型训练、LabelGenerator收集数据集时的截图一致；JPEG编码更快但有损，需要显式传入。
+        :param (Page) element_page: 可选。需要截图的页面，默认为初始页面
+        :param (dict) clip: 可选。截图区域，格式为 {'x': 0, 'y': 0, 'width': 1920, 'height': 1080}，默认截取整个可视窗口
+        :param (str) image_type: 可选。截图的编码格式，可选 png、jpeg，默认png
+        :param (int) quality: 可选。jpeg的图像质量，0-100，默认90
+        :return: BGR格式的图像数组
+
+        Example:
+            frame = browser_launcher.capture_frame()
+            result = dom_inspector(image=frame)
+        """
+        element_page = self._page if not element_page else element_page
+        if image_type not in ['jpeg', 'png']:
+            raise ValueError(f'传入的截图格式: {image_type} 不存在. 支持的格式: jpeg, png')
+
+        data = None
+        with tracer.span('browser.capture', image_type=image_type, clip=clip) as span:
+            if self._browser_name == 'chromium' and not clip:
+                try:
+                    data = self._cdp_screenshot(element_page, image_type, quality)
+                    span.set(method='cdp')
+                except playwright.sync_api.Error:
+                    self._cdp_sessions.pop(element_page, None)
+            if data is None:
+                options = {'type': image_type, 'clip': clip}
+                if image_type == 'jpeg': options['quality'] = quality
+                data = element_page.screenshot(**options)
+                span.set(method='screenshot')
+            span.set(bytes=len(data))
+        with tracer.span('browser.decode', bytes=len(data)):
+            return decode_frame(data)
+
+    def _cdp_screenshot(self, element_page: playwright.sync_api.Page, image_type: str, quality: int) -> bytes:
+        """
+        通过CDP会话截图，每个页面的CDP会话只创建一次，页面关闭时释放。
+        """
+        session = self._cdp_sessions.get(element_page)
+        if session is None:
+            session = self._cdp_sessions[element_page] = self._browser.new_cdp_session(element_page)
+            element_page.once('close', lambda page: self._cdp_sessions.pop(page, None))
+        params = {'format': image_type, 'optimizeForSpeed': True, 'captureBeyondViewport': False}
+        if image_type == 'jpeg': params['quality'] = quality
+        return base64.b64decode(session.send('Page.captureScreenshot', params)['data'])
+
     def page_assert(self,
                     page_or_locator: playwright.sync_api.Page | playwright.sync_api.Locator) -> playwright.sync_api.expect:
         """
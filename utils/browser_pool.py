@@ -0,0 +1,240 @@
+import os
+import queue
+import threading
+import time
+import typing
+from concurrent.futures import Future
+from utils.browser_launcher import Browser
+
+
+class BrowserPool:
+    """
+    浏览器池与流程调度器，用于并行执行多个相互独立的UI流程。
+
+    池内每个工作线程各自启动一个Browser(独立的浏览器进程、上下文、页面与视窗设置)，
+    playwright的同步接口只能在创建它的线程内使用，因此浏览器与工作线程一一绑定。
+    提交的流程按先进先出的顺序分配给空闲的工作线程，流程函数的第一个参数是该工作线程的Browser，
+    DOMInspector识别时把这个Browser传入 browser 参数，返回的DOMResultHandler就会绑定到该浏览器，而不是全局单例。
+
+    Args:
+        size (int, optional): 工作线程(浏览器)数量。默认为CPU核心数的一半。
+        browser_type (str, optional): 需要启动的浏览器，可选 chromium、firefox、webkit，默认chrome。
+        headless (bool, optional): 是否以无头模式启动，默认True。
+        storage_state (str | dict, optional): 浏览器上下文的初始存储状态，例如登录后的cookie。
+        isolate_flows (bool, optional): 每个流程结束后是否重建浏览器上下文，使同一浏览器上的流程互不影响。默认False。
+            重建上下文失败时重新启动该工作线程的浏览器，重新启动也失败时该工作线程退出，
+            所有工作线程都退出后，排队中的流程以RuntimeError结束，不会一直等待。
+
+    Example:
+        def search_flow(browser: Browser, keyword: str):
+            browser.page.goto('https://www.bilibili.com/')
+            result = dom_inspector(image=browser.capture_frame(), browser=browser)
+            result.filter(lambda item: item.get('name') == 'center-search-container').input(keyword)
+            return keyword
+
+        with BrowserPool(size=4, headless=True) as pool:
+            futures = [pool.submit(search_flow, keyword) for keyword in ['UI自动化', '接口自动化']]
+            print([future.result() for future in futures])
+            print(pool.metrics)
+    """
+
+    def __init__(self, size: int = None, browser_type: str = 'chrome', headless: bool = True,
+                 storage_state: str or dict = None, isolate_flows: bool = False):
+        self._size = size or max((os.cpu_count() or 2) // 2, 1)
+        self._browser_type = browser_type
+        self._headless = headless
+        self._storage_state = storage_state
+        self._isolate_flows = isolate_flows
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._started_at = time.perf_counter()
+        self._submitted = 0
+        self._max_queue_depth = 0
+        self._launch_errors = []
+        self._alive = self._size
+        self._ready = threading.Barrier(self._size + 1)
+        self._worker_metrics = [{'worker': index, 'flows': 0, 'failed': 0, 'restarts': 0, 'busy_seconds': 0.0}
+                                for index in range(self._size)]
+        self._workers = [threading.Thread(target=self._worker, args=(index,), name=f'BrowserPool-{index}', daemon=True)
+                         for index in range(self._size)]
+        for worker in self._workers:
+            worker.start()
+        self._ready.wait()
+        if self._launch_errors:
+            self.close()
+            raise RuntimeError(f'浏览器启动失败：{self._launch_errors[0]}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, flow: typing.Callable[..., typing.Any], *args, **kwargs) -> Future:
+        """
+        提交一个流程。
+
+        Args:
+            flow (Callable): 流程函数，第一个参数为工作线程的Browser，其余参数为args与kwargs。
+
+        Returns:
+            Future: 流程的执行结果。
+        """
+        if self._closed:
+            raise RuntimeError('浏览器池已关闭')
+        future = Future()
+        with self._lock:
+            # 在锁内检查并入队，最后一个工作线程退出时能清理到所有已入队的流程
+            if not self._alive:
+                raise RuntimeError(f'浏览器池中没有可用的浏览器：{self._launch_errors[-1]}')
+            self._tasks.put((future, flow, args, kwargs))
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._tasks.qsize())
+        return future
+
+    def run(self, flows: list[typing.Callable], return_exceptions: bool = False) -> list:
+        """
+        并行执行一组流程并按传入顺序返回结果。
+
+        Args:
+            flows (list[Callable]): 流程函数列表，每个函数只接收工作线程的Browser。
+            return_exceptions (bool, optional): 流程抛出异常时是否把异常作为结果返回，默认False直接抛出。
+
+        Returns:
+            list: 与flows一一对应的执行结果。
+        """
+        futures = [self.submit(flow) for flow in flows]
+        results = []
+        for future in futures:
+            exception = future.exception()
+            if exception and not return_exceptions:
+                raise exception
+            results.append(exception if exception else future.result())
+        return results
+
+    def close(self):
+        """
+        等待已提交的流程执行完毕后关闭所有浏览器。
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def metrics(self) -> dict:
+        """
+        returns:
+            dict: 调度器与各个工作线程的指标。
+                - queue_depth / max_queue_depth：当前与历史最大的排队流程数量。
+                - submitted / completed / failed：提交、成功完成、失败的流程数量。
+                - throughput：整体吞吐量(只统计成功完成的流程)，单位 流程/秒。
+                - workers：每个工作线程成功完成与失败的流程数量、浏览器重启次数、忙碌时长、利用率与吞吐量。
+                - alive：仍在运行的工作线程数量。
+        """
+        elapsed = time.perf_counter() - self._started_at
+        with self._lock:
+            workers = []
+            for metric in self._worker_metrics:
+                busy = metric['busy_seconds']
+                workers.append({**metric,
+                                'utilization': round(busy / elapsed, 4) if elapsed else 0.0,
+                                'throughput': round(metric['flows'] / busy, 4) if busy else 0.0})
+            completed = sum(metric['flows'] for metric in self._worker_metrics)
+            return {
+                'size': self._size,
+                'queue_depth': self._tasks.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'submitted': self._submitted,
+                'completed': completed,
+                'failed': sum(metric['failed'] for metric in self._worker_metrics),
+                'elapsed_seconds': round(elapsed, 3),
+                'throughput': round(completed / elapsed, 4) if elapsed else 0.0,
+                'alive': self._alive,
+                'workers': workers,
+            }
+
+    def _worker(self, index: int):
+        try:
+            browser = Browser(browser_type=self._browser_type, headless=self._headless,
+                              storage_state=self._storage_state)
+        except Exception as e:
+            self._launch_errors.append(e)
+            self._ready.wait()
+            return
+        self._ready.wait()
+
+        try:
+            while browser is not None:
+                task = self._tasks.get()
+                if task is None:
+                    break
+                future, flow, args, kwargs = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                start = time.perf_counter()
+                try:
+                    future.set_result(flow(browser, *args, **kwargs))
+                    failed = False
+                except BaseException as e:
+                    future.set_exception(e)
+                    failed = True
+                finally:
+                    if self._isolate_flows:
+                        browser = self._reset_browser(index, browser)
+                with self._lock:
+                    metric = self._worker_metrics[index]
+                    metric['flows'] += int(not failed)
+                    metric['failed'] += int(failed)
+                    metric['busy_seconds'] += time.perf_counter() - start
+        finally:
+            if browser is not None:
+                browser.close()
+            else:
+                self._worker_exited()
+
+    def _reset_browser(self, index: int, browser: Browser) -> Browser or None:
+        """
+        重建浏览器上下文，失败时关闭浏览器并重新启动，重新启动也失败时返回None。
+        """
+        try:
+            return browser.reset()
+        except Exception:
+            try:
+                browser.close()
+            except Exception:
+                pass
+        try:
+            browser = Browser(browser_type=self._browser_type, headless=self._headless,
+                              storage_state=self._storage_state)
+        except Exception as e:
+            self._launch_errors.append(e)
+            return None
+        with self._lock:
+            self._worker_metrics[index]['restarts'] += 1
+        return browser
+
+    def _worker_exited(self):
+        """
+        工作线程因浏览器无法启动而退出，最后一个工作线程退出时让排队中的流程以RuntimeError结束。
+        """
+        with self._lock:
+            self._alive -= 1
+            if self._alive:
+                return
+        error = RuntimeError(f'浏览器池中没有可用的浏览器：{self._launch_errors[-1]}')
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None and task[0].set_running_or_notify_cancel():
+                task[0].set_exception(error)
@@ -0,0 +1,232 @@
+import hashlib
+from collections import Counter
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from os import path
+
+VAL_RATIO = 1 / 15
+MANIFEST_NAME = 'manifest.jsonl'
+SPLITS = ('train', 'val')
+
+
+class DatasetWriter:
+    """
+    在截图时直接把样本写入所属的训练集或验证集，并以追加的方式记录manifest.jsonl，中断后重新运行可以跳过已完成的URL。
+
+    manifest.jsonl每行一条记录：
+        {"type": "sample", "name": ..., "split": ..., "url": ..., "visit": ..., "shard": ...}  写入一个样本
+        {"type": "url", "url": ..., "visit": ..., "samples": ...}                           一次URL访问收集完毕
+
+    同一个URL在一次收集中可以出现多次，以 (url, visit) 区分每一次访问，visit为该URL第几次出现(从0开始)。
+    恢复时只保留已完成访问的样本，未完成访问的样本文件会被删除(已写入分片的样本保留在旧分片中，但不再记录在manifest里)，该访问会被重新收集。
+    """
+
+    def __init__(self, root: str, val_ratio: float = VAL_RATIO, classify: bool = True, shard_size: int = 0):
+        """
+        :param root: 数据集目录，目录下生成 images、labels 与 manifest.jsonl。
+        :param val_ratio: 验证集的比例，默认1/15。
+        :param classify: 是否划分训练集与验证集，False时所有样本直接写入images、labels目录，由使用者自行划分。
+        :param shard_size: 大于0时把每个划分的截图与标签按顺序打包进tar分片(shards/train-00000.tar)，每个分片最多shard_size个样本，
+            避免样本数量很多时在目录中产生大量小文件。分片用于存储与传输，训练前需要解包。默认0不打包。
+        """
+        if not 0 <= val_ratio < 1:
+            raise ValueError(f'val_ratio需要在[0, 1)之间：{val_ratio}')
+        self._root = root
+        self._val_ratio = val_ratio
+        self._classify = classify
+        self._shard_size = shard_size
+        self._lock = threading.Lock()
+        self._shards = {}
+        self._shard_indexes = Counter()
+
+        for directory in ('images', 'labels'):
+            for split in (SPLITS if classify else ('',)):
+                os.makedirs(path.join(root, directory, split), exist_ok=True)
+        if shard_size:
+            os.makedirs(path.join(root, 'shards'), exist_ok=True)
+
+        self._samples, self._completed_visits = self._resume()
+        self._pending = {}
+        self._manifest = open(path.join(root, MANIFEST_NAME), 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def completed_urls(self) -> set[str]:
+        """
+        至少有一次访问收集完毕的URL。
+        """
+        return {url for url, _ in self._completed_visits}
+
+    @property
+    def completed_visits(self) -> set[tuple[str, int]]:
+        """
+        已经收集完毕的 (url, visit)。
+        """
+        return set(self._completed_visits)
+
+    @property
+    def shards(self) -> dict[str, list[str]]:
+        """
+        已完成访问的样本所在的tar分片，按划分分组，路径相对于数据集目录，没有打包时为空字典。
+        """
+        shards = {}
+        for sample in self._samples:
+            if sample.get('shard'):
+                names = shards.setdefault(sample['split'] or 'data', [])
+                if f'shards/{sample["shard"]}' not in names:
+                    names.append(f'shards/{sample["shard"]}')
+        return shards
+
+    @property
+    def samples(self) -> list[dict]:
+        """
+        已完成URL的样本记录。
+        """
+        return list(self._samples)
+
+    def split(self, key: str) -> str:
+        """
+        按样本键的哈希值确定样本所属的划分，同一个键始终划分到同一个集合，与写入顺序、并发以及重复收集无关。
+
+        :param key: 稳定的样本键，例如 URL与滚动位置，重复收集同一位置时得到相同的键，避免同一画面同时出现在训练集与验证集。
+        :return: 'train' 或 'val'，不划分时为空字符串。
+        """
+        if not self._classify:
+            return ''
+        value = int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big') / 2 ** 64
+        return 'val' if value < self._val_ratio else 'train'
+
+    def write(self, name: str, image: bytes, labels: str, url: str = None, split_key: str = None,
+              visit: int = 0) -> str:
+        """
+        写入一个样本，并在manifest中追加记录。
+
+        :param name: 样本文件名，不含扩展名。
+        :param image: png格式的截图。
+        :param labels: YOLO格式的标签文本。
+        :param url: 样本所属的URL，用于中断后恢复。
+        :param split_key: 决定划分的稳定键，默认None使用name。name每次收集都不同时需要传入，例如 URL与滚动位置。
+        :param visit: 同一个URL第几次出现，默认0。
+        :return: 样本所属的划分。
+        """
+        split = self.split(split_key or name)
+        with self._lock:
+            if self._shard_size:
+                shard = self._shard(split)
+                tar = shard['tar']
+                for filename, data in ((f'{name}.png', image), (f'{name}.txt', labels.encode('utf-8'))):
+                    info = tarfile.TarInfo(filename)
+                    info.size = len(data)
+                    info.mtime = time.time()
+                    tar.addfile(info, io.BytesIO(data))
+                shard['count'] += 1
+                shard_name = shard['name']
+            else:
+                with open(path.join(self._root, 'images', split, f'{name}.png'), 'wb') as fw:
+                    fw.write(image)
+                with open(path.join(self._root, 'labels', split, f'{name}.txt'), 'w') as fw:
+                    fw.write(labels)
+                shard_name = None
+
+            record = {'type': 'sample', 'name': name, 'split': split, 'url': url, 'visit': visit, 'shard': shard_name}
+            self._append(record)
+            self._pending.setdefault((url, visit), []).append(record)
+        return split
+
+    def finish_url(self, url: str, visit: int = 0):
+        """
+        标记URL的一次访问收集完毕，之后恢复时会跳过该访问。
+        """
+        with self._lock:
+            if self._shard_size:
+                # 分片中的样本落盘后才记录URL完成，避免中断时manifest记录了分片中尚未写入的样本
+                for shard in self._shards.values():
+                    shard['tar'].fileobj.flush()
+            samples = self._pending.pop((url, visit), [])
+            self._append({'type': 'url', 'url': url, 'visit': visit, 'samples': len(samples)})
+            self._samples += samples
+            self._completed_visits.add((url, visit))
+
+    def close(self):
+        with self._lock:
+            for shard in self._shards.values():
+                shard['tar'].close()
+            self._shards.clear()
+            if not self._manifest.closed:
+                self._manifest.close()
+
+    def _append(self, record: dict):
+        self._manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._manifest.flush()
+        os.fsync(self._manifest.fileno())
+
+    def _shard(self, split: str) -> dict:
+        """
+        获取划分当前写入的分片，写满后关闭并创建新的分片。恢复时从未使用过的编号开始，不会追加到旧的分片中。
+        """
+        shard = self._shards.get(split)
+        if shard and shard['count'] >= self._shard_size:
+            shard['tar'].close()
+            shard = None
+        if not shard:
+            while True:
+                name = f'{split or "data"}-{self._shard_indexes[split]:05d}.tar'
+                self._shard_indexes[split] += 1
+                if not path.exists(path.join(self._root, 'shards', name)):
+                    break
+            shard = {'name': name, 'count': 0, 'tar': tarfile.open(path.join(self._root, 'shards', name), 'w')}
+            self._shards[split] = shard
+        return shard
+
+    def _resume(self) -> tuple[list[dict], set[tuple[str, int]]]:
+        """
+        读取已有的manifest，返回已完成访问的样本与已完成的 (url, visit)，并删除未完成访问写入的样本文件。
+        没有visit字段的旧记录按第0次访问处理。
+        """
+        manifest_path = path.join(self._root, MANIFEST_NAME)
+        if not path.exists(manifest_path):
+            return [], set()
+
+        samples, completed_visits = [], set()
+        with open(manifest_path, 'r', encoding='utf-8') as rf:
+            for line in rf:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中断时最后一行可能没有写完整
+                    continue
+                if record.get('type') == 'sample':
+                    record.setdefault('visit', 0)
+                    samples.append(record)
+                elif record.get('type') == 'url':
+                    completed_visits.add((record['url'], record.get('visit', 0)))
+
+        finished = [sample for sample in samples if (sample['url'], sample['visit']) in completed_visits]
+        # 重写manifest只保留已完成URL的记录，否则重新收集该URL后旧的样本记录会被当作已完成
+        temp_path = f'{manifest_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fw:
+            for sample in finished:
+                fw.write(json.dumps(sample, ensure_ascii=False) + '\n')
+            counts = Counter((sample['url'], sample['visit']) for sample in finished)
+            for url, visit in completed_visits:
+                fw.write(json.dumps({'type': 'url', 'url': url, 'visit': visit, 'samples': counts[(url, visit)]},
+                                    ensure_ascii=False) + '\n')
+        os.replace(temp_path, manifest_path)
+
+        for sample in samples:
+            if (sample['url'], sample['visit']) in completed_visits or sample['shard']:
+                continue
+            for directory, extension in (('images', 'png'), ('labels', 'txt')):
+                file_path = path.join(self._root, directory, sample['split'], f'{sample["name"]}.{extension}')
+                if path.exists(file_path):
+                    os.remove(file_path)
+        return finished, completed_visits
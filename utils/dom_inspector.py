@@ -1,15 +1,20 @@
 import math
+import time
 import typing
 import numpy as np
-from PIL import Image
-from io import BytesIO
-from ultralytics import YOLO
 import json
 import cv2
-from utils import ProjectPath
+from utils.browser_launcher import BrowserLauncher
 from utils.dom_result_handler import DOMResultHandler
+from utils.model_registry import ModelRegistry
+from utils.ocr_recognizer import OCRRecognizer
+from utils.ocr_pool import OCRWorkerPool
+from utils.dom_query import DOMQuery, DetectionView, TextRequired
+from utils.lazy_text import LazyTextResolver
+from utils.ocr_cache import OCRCache
+from utils.frame_diff import FrameDiff
+from utils.tracing import tracer
 import os
-from os import path
 
 
 class DOMInspector:
@@ -23,42 +28,122 @@ class DOMInspector:
         _yolo_model (str): YOLO模型的路径。
     """
 
-    DEFAULT_NUM_PROCESSES = math.floor(os.cpu_count() / 2)
+    DEFAULT_NUM_PROCESSES = max(math.floor(os.cpu_count() / 2), 1)
     DEFAULT_LANG = 'ch'
+    INCREMENTAL_FULL_RATIO = 0.5
+    INCREMENTAL_MARGIN = 32
+    DETECTOR_BACKENDS = ('ultralytics', 'onnxruntime', 'openvino')
+    DEFAULT_DETECT_SIZE = 640
+    DETECT_SIZE_STRIDE = 32
+    DEFAULT_WAIT_TIMEOUT = 10
+    WAIT_POLL_INTERVAL = 0.1
+    WAIT_MAX_INTERVAL = 1.0
+    WAIT_BACKOFF = 1.5
 
-    def __init__(self, yolo_model: str, ocr: str = 'paddleocr'):
+    def __init__(self, yolo_model: str = None, ocr: str = 'paddleocr',
+                 ocr_batch_size: int = None, num_processes: int = 0,
+                 ocr_cache: OCRCache = None, server_url: str = None, detector_backend: str = 'ultralytics'):
         """
         初始化DOMInspector类。
 
         Args:
             yolo_model (str): YOLO模型的路径。
+            ocr (str, optional): OCR引擎，可选 "paddleocr" 或是 "easyocr"。默认为'paddleocr'。
+            ocr_batch_size (int, optional): 批量OCR识别时每批的图片数量，传入0时逐个识别。
+                默认为None，PaddleOCR每批16张，EasyOCR逐个识别(批量识别会合并多行文本，需要显式开启)。
+            num_processes (int, optional): OCR工作进程数量，传入0时在当前进程内识别。默认为0。
+                可传入DOMInspector.DEFAULT_NUM_PROCESSES开启多进程识别。
+            ocr_cache (OCRCache, optional): OCR结果缓存，内容相同的裁剪图片只识别一次。默认为None不使用缓存。
+            server_url (str, optional): 推理服务(InferenceServer)的地址，传入时以客户端模式运行，不在当前进程加载模型。
+                例如 http://127.0.0.1:8765 或 unix:///tmp/auto_flow_ai.sock。默认为None。
+            detector_backend (str, optional): YOLO的推理后端，可选 "ultralytics"、"onnxruntime"、"openvino"。
+                使用 onnxruntime 或 openvino 时yolo_model可以传入ONNX模型(包括export_onnx导出的INT8模型)，
+                传入 .pt 模型时自动导出为ONNX，适合没有GPU的CPU环境。默认为'ultralytics'。
+
+        Notes:
+            - 模型由进程级的ModelRegistry统一管理，多个DOMInspector实例共享同一份已加载的模型。
+            - 开启多进程识别时，每个工作进程各自加载OCR模型；工作进程启动或识别失败时自动回退到进程内识别。
+            - 开启多进程识别后，不再使用时请调用close()释放工作进程。
+            - 客户端模式下模型、OCR参数与缓存由推理服务决定，lazy_ocr与incremental不生效；
+              dom_search为不含where的DOMQuery时在服务端筛选，其他形式在收到结果后由客户端筛选。
         """
+        if not yolo_model and not server_url:
+            raise ValueError('请传入yolo_model或是推理服务地址server_url')
+        self._client = None
+        if server_url:
+            from utils.inference_server import InferenceClient
+            self._client = InferenceClient(server_url)
+        if detector_backend not in self.DETECTOR_BACKENDS:
+            raise ValueError(f'不支持的推理后端：{detector_backend}，可选 {", ".join(self.DETECTOR_BACKENDS)}')
         self._yolo_model = yolo_model
+        self._detector_backend = detector_backend
         self._ocr = ocr
-
+        self._ocr_batch_size = ocr_batch_size
+        self._num_processes = num_processes
+        self._ocr_pools: dict[str, OCRWorkerPool or None] = {}
+        self._ocr_cache = ocr_cache
+        self._registry = ModelRegistry()
+        self._frame_diff = FrameDiff()
+        self._frame_states: dict[int, tuple[np.ndarray, list[dict]]] = {}
 
     def __call__(self,
-                 image: bytes,
+                 image: bytes | np.ndarray,
                  lang: str = 'ch',
-                 dom_search: typing.Callable = None,
+                 dom_search: typing.Callable | DOMQuery | tuple = None,
                  use_ocr: bool = True,
                  page_index: int = 0,
+                 lazy_ocr: bool = False,
+                 incremental: bool = False,
+                 browser=None,
+                 roi: tuple[int, int, int, int] | dict = None,
+                 detect_size: int = None,
+                 clipped: bool = False,
+                 frame_size: tuple[int, int] = None,
                  **kwargs
                  ) -> DOMResultHandler:
         """
         在图像中检测DOM元素并执行OCR识别。
 
         Args:
-            image (bytes): 输入的图像字节数据。
+            image (bytes | np.ndarray): 输入的图像字节数据，或是已解码的BGR图像数组。
             lang (str, optional): OCR识别使用的语言。默认为'ch'。
-            dom_search (Callable, optional): 用于筛选DOM元素的自定义搜索函数。默认为None。
+            dom_search (Callable | DOMQuery | tuple, optional): 用于筛选DOM元素的搜索条件。默认为None。支持三种形式：
+                - 函数：接收元素字典，返回是否匹配。
+                - DOMQuery：结构化查询条件。
+                - 元组 (检测阶段函数, 文本阶段函数)：检测阶段函数只读取检测字段，文本阶段函数可以为None。
+            use_ocr (bool, optional): 是否执行OCR识别。默认为True。
+            page_index (int, optional): 截图所在页面的索引。默认为0。
+            lazy_ocr (bool, optional): 是否懒加载文本，开启后元素的text在第一次被读取时才识别。默认为False。
+            incremental (bool, optional): 是否增量识别，开启后与同一页面的上一帧截图对比，只对发生变化的区域执行检测与OCR。默认为False。
+            browser (Browser, optional): 返回结果绑定的浏览器。默认为None。
+            roi (tuple[int, int, int, int] | dict, optional): 只在该区域内检测与OCR，格式为页面坐标 (x1, y1, x2, y2)，
+                或是与Browser.capture_frame的clip相同的 {'x', 'y', 'width', 'height'}。默认为None检测整个截图。
+            detect_size (int, optional): YOLO的推理分辨率(长边像素，32的倍数)，传入小于模型训练尺寸的值，
+                例如320，可以执行更快的粗略检测。默认为None使用模型的默认尺寸，
+                传入roi时按roi与整帧截图的长边比例缩小，roi内元素的缩放比例与整帧检测一致。
+            clipped (bool, optional): image是否是使用 capture_frame(clip=roi) 只截取的roi区域。默认为False。
+            frame_size (tuple[int, int], optional): clipped为True时整帧截图(视口)的尺寸 (宽, 高)，
+                默认为None使用browser页面的视口尺寸。
 
         Returns:
             DOMResultHandler: DOMResultHandler实例化对象。
 
         Notes:
-            - 输入图像应为字节数据。
-            - 如果提供了dom_search函数，则只返回满足搜索条件的DOM元素。
+            - 输入图像应为字节数据或是BGR格式的图像数组，可以使用Browser.capture_frame直接获取图像数组。
+            - 截图只解码一次，YOLO检测与OCR裁剪共用同一个图像数组，裁剪结果是该数组的视图，不会复制像素。
+            - 如果提供了dom_search，则只返回满足搜索条件的DOM元素。
+            - dom_search会先在OCR之前使用检测字段(box、name、class、confidence)执行，只有通过检测阶段的元素才会进入OCR识别。
+              传入函数时，函数在检测阶段读取text的元素会在OCR之后再执行一次。
+            - use_ocr为False时只执行检测阶段的筛选，需要读取text才能判断的元素会被保留。
+            - 开启lazy_ocr时，只有dom_search需要读取text的元素会立即识别，其余元素在读取text时才识别，
+              只按名称点击的步骤只需要YOLO推理的耗时。
+            - 开启incremental时，按page_index保存上一帧截图与识别结果，未变化区域内的元素直接复用检测结果与文本
+              (包括lazy_ocr读取时识别的文本，lang不同时重新识别)，变化区域(扩展到与之相交的旧元素的完整范围)
+              按整帧检测的缩放比例重新检测后合并；变化面积超过一半或截图尺寸变化时整帧重新检测。
+            - 传入browser时，返回的DOMResultHandler在该浏览器上执行操作，否则使用BrowserLauncher的全局单例。
+            - 传入roi时，image可以是整个页面的截图(只检测其中的roi区域)，也可以是使用 capture_frame(clip=roi) 只截取的roi区域，
+              后者需要传入clipped=True，按frame_size的缩放比例检测。两种情况返回的坐标都是页面坐标，可以直接点击。
+              roi不能与incremental同时使用。
 
         Example:
                 browser_launcher = BrowserLauncher(headless=True)
@@ -70,61 +155,744 @@ class DOMInspector:
                 result = dom_inspector(image=screenshot, dom_search=lambda item: item.get('name') == 'channel-link' and '鬼畜' in item.get('text'))
                 result.click()
         """
-        ocr_type, ocr_model = None, None
-        if use_ocr:
-            ocr_type, ocr_model = self._get_ocr_model(self._ocr, lang)
-        image_array = np.frombuffer(image, dtype=np.uint8)
-        image_cv = cv2.imdecode(image_array, flags=cv2.IMREAD_COLOR)
+        if clipped and frame_size is None:
+            browser = browser if browser is not None else BrowserLauncher()
+            frame_size = self._viewport_size(browser.pages[page_index])
+        dom_list = self.inspect(image, lang=lang, dom_search=dom_search, use_ocr=use_ocr, page_index=page_index,
+                                lazy_ocr=lazy_ocr, incremental=incremental, roi=roi, detect_size=detect_size,
+                                clipped=clipped, frame_size=frame_size)
+        return DOMResultHandler(dom_list, page_index=page_index, browser=browser)
+
+    def wait_for(self,
+                 dom_search: typing.Callable | DOMQuery | tuple,
+                 timeout: float = DEFAULT_WAIT_TIMEOUT,
+                 browser=None,
+                 page_index: int = 0,
+                 poll_interval: float = WAIT_POLL_INTERVAL,
+                 max_interval: float = WAIT_MAX_INTERVAL,
+                 **kwargs
+                 ) -> DOMResultHandler:
+        """
+        反复截图识别，直到出现满足dom_search的元素，代替固定时长的等待。
+
+        Args:
+            dom_search (Callable | DOMQuery | tuple): 等待出现的元素条件，与__call__的dom_search一致。
+            timeout (float, optional): 超时时间，单位秒。默认为DEFAULT_WAIT_TIMEOUT。
+            browser (Browser, optional): 截图与操作使用的浏览器。默认为None使用BrowserLauncher的全局单例。
+            page_index (int, optional): 截图所在页面的索引。默认为0。
+            poll_interval (float, optional): 最短的重试间隔，单位秒。默认为WAIT_POLL_INTERVAL。
+            max_interval (float, optional): 最长的重试间隔，单位秒。默认为WAIT_MAX_INTERVAL。
+            **kwargs: 其余参数传给inspect，例如 lang、use_ocr、lazy_ocr、roi、detect_size。
+
+        Returns:
+            DOMResultHandler: 只包含满足条件的元素，绑定到截图所在的页面。
+
+        Raises:
+            TimeoutError: 超时后仍没有出现满足条件的元素。
+
+        Notes:
+            - 截图与上一次重试相比没有变化时跳过识别，页面没有变化时结果不会改变。
+            - 截图发生变化(页面仍在加载)时按最短间隔重试，没有变化时间隔按WAIT_BACKOFF倍增长，直到max_interval。
+            - 传入roi时只截取roi区域，按页面视口尺寸的缩放比例检测。
+
+        Example:
+            dom_inspector.wait_for(lambda item: item.get('name') == 'center-search-container', use_ocr=False).input('UI自动化')
+        """
+        browser = browser if browser is not None else BrowserLauncher()
+        page = browser.pages[page_index]
+        clip = None
+        if kwargs.get('roi') is not None:
+            x1, y1, x2, y2 = self._roi_coords(kwargs['roi'])
+            clip = {'x': x1, 'y': y1, 'width': x2 - x1, 'height': y2 - y1}
+            kwargs.update(clipped=True, frame_size=kwargs.get('frame_size') or self._viewport_size(page))
+        deadline = time.perf_counter() + timeout
+        interval = poll_interval
+        previous, attempts, inferences = None, 0, 0
+        with tracer.span('inspector.wait_for', timeout=timeout) as span:
+            while True:
+                attempts += 1
+                frame = browser.capture_frame(element_page=page, clip=clip)
+                if (previous is None or previous.shape != frame.shape or
+                        self._frame_diff.changed_tiles(previous, frame).any()):
+                    inferences += 1
+                    dom_list = self.inspect(frame, dom_search=dom_search, page_index=page_index, **kwargs)
+                    if dom_list:
+                        span.set(attempts=attempts, inferences=inferences, found=len(dom_list))
+                        return DOMResultHandler(dom_list, page_index=page_index, browser=browser)
+                    interval = poll_interval
+                else:
+                    interval = min(interval * self.WAIT_BACKOFF, max_interval)
+                previous = frame
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    span.set(attempts=attempts, inferences=inferences, found=0)
+                    raise TimeoutError(f'等待元素超时({timeout}秒)，共截图{attempts}次，识别{inferences}次')
+                page.wait_for_timeout(min(interval, remaining) * 1000)
+
+    def click_when_visible(self,
+                           dom_search: typing.Callable | DOMQuery | tuple,
+                           timeout: float = DEFAULT_WAIT_TIMEOUT,
+                           double: bool = False,
+                           **kwargs
+                           ) -> DOMResultHandler:
+        """
+        等待满足dom_search的元素出现后立即点击第一个元素。
+
+        Args:
+            dom_search (Callable | DOMQuery | tuple): 需要点击的元素条件。
+            timeout (float, optional): 超时时间，单位秒。默认为DEFAULT_WAIT_TIMEOUT。
+            double (bool, optional): 是否执行双击操作。默认为False。
+            **kwargs: 其余参数传给wait_for，例如 browser、page_index、use_ocr、roi。
+
+        Returns:
+            DOMResultHandler: wait_for返回的元素。
+
+        Raises:
+            TimeoutError: 超时后仍没有出现满足条件的元素。
+
+        Example:
+            dom_inspector.click_when_visible(DOMQuery(name='channel-link', text_contains='鬼畜'))
+        """
+        result = self.wait_for(dom_search, timeout=timeout, **kwargs)
+        result.click(double=double)
+        return result
+
+    def inspect(self,
+                image: bytes | np.ndarray,
+                lang: str = 'ch',
+                dom_search: typing.Callable | DOMQuery | tuple = None,
+                use_ocr: bool = True,
+                page_index: int = 0,
+                lazy_ocr: bool = False,
+                incremental: bool = False,
+                roi: tuple[int, int, int, int] | dict = None,
+                detect_size: int = None,
+                clipped: bool = False,
+                frame_size: tuple[int, int] = None
+                ) -> list[dict]:
+        """
+        在图像中检测DOM元素并执行OCR识别，参数与__call__一致，返回元素字典列表而不是DOMResultHandler，
+        不依赖浏览器，供异步接口、推理服务等场景使用。clipped为True时必须传入frame_size。
+
+        Returns:
+            list[dict]: 元素字典列表。
+        """
+        if roi is not None and incremental:
+            raise ValueError('roi不能与incremental同时使用')
+        with tracer.span('inspector.inspect', use_ocr=use_ocr, lazy_ocr=lazy_ocr, incremental=incremental,
+                         roi=roi is not None, remote=self._client is not None) as span:
+            dom_list = self._inspect(image, lang, dom_search, use_ocr, page_index, lazy_ocr, incremental, roi,
+                                     detect_size, clipped, frame_size)
+            span.set(results=len(dom_list))
+        return dom_list
 
-        image_object = Image.open(BytesIO(image))
-        self._model = YOLO(self._yolo_model)
+    def _inspect(self, image: bytes | np.ndarray, lang: str, dom_search, use_ocr: bool, page_index: int,
+                 lazy_ocr: bool, incremental: bool, roi: tuple[int, int, int, int] | dict,
+                 detect_size: int, clipped: bool, frame_size: tuple[int, int]) -> list[dict]:
+        """
+        inspect的实现，参数与inspect一致。
+        """
+        if self._client:
+            return self._inspect_remote(image, lang=lang, dom_search=dom_search, use_ocr=use_ocr, roi=roi,
+                                        detect_size=detect_size, clipped=clipped, frame_size=frame_size)
+        image_cv = self.decode(image)
+        # 只截取了roi区域时，检测与OCR使用截图坐标，返回的坐标加上offset还原为页面坐标
+        offset = (0, 0)
+        if roi is not None:
+            image_cv, region, frame_size, offset = self._roi_frame(image_cv, roi, clipped, frame_size)
+            detections = self._detect(image_cv, region, detect_size=detect_size, frame_size=frame_size)
+            for dom_detail in detections:
+                self._offset_box(dom_detail.get('box'), *offset)
+        elif incremental:
+            detections = self._detect_incremental(image_cv, page_index, lang=lang, detect_size=detect_size)
+        else:
+            detections = self._detect(image_cv, detect_size=detect_size)
 
-        result = self._model(image_object)
-        image_object.close()
+        candidates = [(dom_detail, matched) for dom_detail in detections
+                      if (matched := self._match_detection(dom_detail, dom_search)) is not False]
         dom_list = []
-        for index, item in enumerate(result):
-            item = json.loads(item.tojson())
-            if not item:
-                continue
-            if use_ocr:
-                dom_list += [self._with_ocr((item, image_cv, dom_search, ocr_type, ocr_model)) for item in item]
+        if use_ocr and lazy_ocr:
+            # 增量识别时把懒加载识别的文本写回上一帧保存的元素，下一帧复用的元素不再重复识别
+            sources = {id(dom_detail.get('box')): dom_detail for dom_detail, _ in candidates} if incremental else {}
+
+            def recognize(image: np.ndarray, boxes: list[dict]) -> list[list[str]]:
+                texts = self._recognize(image, self._shift_boxes(boxes, offset), lang)
+                for box, text in zip(boxes, texts):
+                    if id(box) in sources:
+                        self._store_text(sources[id(box)], text, lang)
+                return texts
+
+            resolver = LazyTextResolver(image_cv, recognize)
+            lazy_items = [(resolver.item(dom_detail), matched) for dom_detail, matched in candidates]
+            resolver.resolve([lazy_item for lazy_item, matched in lazy_items if matched is None])
+            dom_list += [lazy_item for lazy_item, matched in lazy_items
+                         if matched or self._match_text(lazy_item, dom_search)]
+        elif use_ocr:
+            self._fill_texts(image_cv, [dom_detail for dom_detail, _ in candidates], lang, offset)
+            for dom_detail, matched in candidates:
+                result_with_text = self._with_ocr(dom_detail, dom_detail.get('text'))
+                if matched or self._match_text(result_with_text, dom_search):
+                    dom_list.append(result_with_text)
+        else:
+            dom_list += [{key: value for key, value in dom_detail.items() if key not in ('text', 'text_lang')}
+                         for dom_detail, _ in candidates]
+        return dom_list
+
+    def batch(self,
+              images: list[bytes | np.ndarray],
+              lang: str = 'ch',
+              dom_search: typing.Callable | DOMQuery | tuple = None,
+              use_ocr: bool = True,
+              page_index: int | list[int] = 0,
+              browser=None,
+              detect_size: int = None
+              ) -> list[DOMResultHandler]:
+        """
+        批量识别多张截图，YOLO对所有截图执行一次批量推理，OCR把所有截图的裁剪图片合并在一起批量识别。
+
+        Args:
+            images (list[bytes | np.ndarray]): 图像字节数据或是已解码的BGR图像数组列表。
+            lang (str, optional): OCR识别使用的语言。默认为'ch'。
+            dom_search (Callable | DOMQuery | tuple, optional): 用于筛选DOM元素的搜索条件，与__call__一致。默认为None。
+            use_ocr (bool, optional): 是否执行OCR识别。默认为True。
+            page_index (int | list[int], optional): 截图所在页面的索引，传入列表时与images一一对应。默认为0。
+            browser (Browser, optional): 返回结果绑定的浏览器。默认为None。
+            detect_size (int, optional): YOLO的推理分辨率，与__call__一致。默认为None。
+
+        Returns:
+            list[DOMResultHandler]: 与images一一对应的DOMResultHandler实例。
+
+        Notes:
+            - 批量识别不支持lazy_ocr与incremental。
+
+        Example:
+            frames = [browser_launcher.capture_frame(page) for page in browser_launcher.pages]
+            results = dom_inspector.batch(frames, page_index=list(range(len(frames))))
+        """
+        page_indexes = page_index if isinstance(page_index, list) else [page_index] * len(images)
+        if len(page_indexes) != len(images):
+            raise ValueError(f'page_index的数量({len(page_indexes)})与images的数量({len(images)})不一致')
+        dom_lists = self.inspect_batch(images, lang=lang, dom_search=dom_search, use_ocr=use_ocr,
+                                       detect_size=detect_size)
+        return [DOMResultHandler(dom_list, page_index=index, browser=browser)
+                for dom_list, index in zip(dom_lists, page_indexes)]
+
+    def inspect_batch(self,
+                      images: list[bytes | np.ndarray],
+                      lang: str = 'ch',
+                      dom_search: typing.Callable | DOMQuery | tuple = None,
+                      use_ocr: bool = True,
+                      detect_size: int = None,
+                      frame_size: tuple[int, int] = None
+                      ) -> list[list[dict]]:
+        """
+        批量识别多张截图，参数与batch一致，返回与images一一对应的元素字典列表。
+        images是从尺寸为frame_size (宽, 高) 的整帧截图中裁剪的区域时传入frame_size，按整帧检测的缩放比例推理。
+
+        Returns:
+            list[list[dict]]: 每张截图的元素字典列表。
+        """
+        if self._client:
+            return [self._inspect_remote(image, lang=lang, dom_search=dom_search, use_ocr=use_ocr,
+                                         detect_size=detect_size) for image in images]
+        image_cvs = [self.decode(image) for image in images]
+        if not image_cvs:
+            return []
+        detections = self._predict(image_cvs, detect_size=detect_size, frame_size=frame_size)
+
+        candidates = [[(dom_detail, matched) for dom_detail in image_detections
+                       if (matched := self._match_detection(dom_detail, dom_search)) is not False]
+                      for image_detections in detections]
+        if not use_ocr:
+            return [[dom_detail for dom_detail, _ in image_candidates] for image_candidates in candidates]
+
+        pairs = [(image_cv, dom_detail) for image_cv, image_candidates in zip(image_cvs, candidates)
+                 for dom_detail, _ in image_candidates]
+        texts = self._recognize_pairs([(image_cv, dom_detail.get('box')) for image_cv, dom_detail in pairs], lang)
+        for (_, dom_detail), text in zip(pairs, texts):
+            dom_detail['text'] = text
+
+        dom_lists = []
+        for image_candidates in candidates:
+            dom_list = []
+            for dom_detail, matched in image_candidates:
+                result_with_text = self._with_ocr(dom_detail, dom_detail.get('text'))
+                if matched or self._match_text(result_with_text, dom_search):
+                    dom_list.append(result_with_text)
+            dom_lists.append(dom_list)
+        return dom_lists
+
+    def _inspect_remote(self, image: bytes | np.ndarray, lang: str, dom_search, use_ocr: bool,
+                        roi: tuple[int, int, int, int] | dict = None, detect_size: int = None,
+                        clipped: bool = False, frame_size: tuple[int, int] = None) -> list[dict]:
+        """
+        客户端模式：请求推理服务识别截图，无法发送给服务的dom_search在收到结果后执行。
+        传入roi时在客户端裁剪后只发送roi区域，返回的坐标还原为页面坐标。
+        """
+        query = dom_search if isinstance(dom_search, DOMQuery) and dom_search.serializable else None
+        image = self.decode(image) if isinstance(image, np.ndarray) or roi is not None else image
+        if roi is not None:
+            image_cv, (x1, y1, x2, y2), frame_size, (offset_x, offset_y) = \
+                self._roi_frame(image, roi, clipped, frame_size)
+            image = image_cv[y1: y2, x1: x2]
+            x1, y1 = x1 + offset_x, y1 + offset_y
+        with tracer.span('inspector.remote', use_ocr=use_ocr, query=query is not None) as span:
+            dom_list = self._client.inspect(image, lang=lang, use_ocr=use_ocr, query=query, detect_size=detect_size,
+                                            frame_size=frame_size)
+            span.set(boxes=len(dom_list))
+        if roi is not None:
+            for dom_detail in dom_list:
+                self._offset_box(dom_detail.get('box'), x1, y1)
+        if query is not None or not dom_search:
+            return dom_list
+        result = []
+        for dom_detail in dom_list:
+            matched = self._match_detection(dom_detail, dom_search)
+            if matched or (matched is None and (not use_ocr or self._match_text(dom_detail, dom_search))):
+                result.append(dom_detail)
+        return result
+
+    def _detect(self, image_cv: np.ndarray, region: tuple[int, int, int, int] = None,
+                detect_size: int = None, frame_size: tuple[int, int] = None) -> list[dict]:
+        """
+        使用YOLO检测截图中的DOM元素。
+
+        Args:
+            image_cv (np.ndarray): 解码后的BGR截图。
+            region (tuple[int, int, int, int], optional): 只检测该区域 (x1, y1, x2, y2)，返回的坐标仍是整张截图的坐标。
+            detect_size (int, optional): YOLO的推理分辨率，默认None使用模型的默认尺寸，传入region时按整帧检测的缩放比例推理。
+            frame_size (tuple[int, int], optional): 整帧截图的尺寸 (宽, 高)，默认None使用image_cv的尺寸。
+
+        Returns:
+            list[dict]: YOLO返回的元素字典列表。
+        """
+        height, width = image_cv.shape[:2]
+        x1, y1, x2, y2 = region if region else (0, 0, width, height)
+        detections = self._predict([image_cv[y1: y2, x1: x2]], detect_size=detect_size,
+                                   frame_size=(frame_size or (width, height)) if region else None)[0]
+        if region:
+            for dom_detail in detections:
+                self._offset_box(dom_detail.get('box'), x1, y1)
+        return detections
+
+    @staticmethod
+    def _offset_box(box: dict, x: float, y: float):
+        box.update({'x1': box.get('x1') + x, 'y1': box.get('y1') + y, 'x2': box.get('x2') + x, 'y2': box.get('y2') + y})
+
+    @staticmethod
+    def _roi_coords(roi: tuple[int, int, int, int] | dict) -> tuple[int, int, int, int]:
+        """
+        把roi统一转换为 (x1, y1, x2, y2)。
+        """
+        if isinstance(roi, dict):
+            x, y = int(roi.get('x', 0)), int(roi.get('y', 0))
+            return x, y, x + int(roi['width']), y + int(roi['height'])
+        if isinstance(roi, (tuple, list)) and len(roi) == 4:
+            return tuple(int(value) for value in roi)
+        raise TypeError(f'不支持的roi格式：{roi}，请传入 (x1, y1, x2, y2) 或是 {{"x", "y", "width", "height"}}')
+
+    @classmethod
+    def _roi_frame(cls, image_cv: np.ndarray, roi: tuple[int, int, int, int] | dict, clipped: bool = False,
+                   frame_size: tuple[int, int] = None) -> tuple[np.ndarray, tuple, tuple, tuple]:
+        """
+        返回需要检测的区域、整帧截图的尺寸，以及截图坐标到页面坐标的偏移。
+        clipped为True时image_cv只截取了roi区域，检测整张截图，整帧尺寸使用调用方传入的frame_size。
+
+        Returns:
+            tuple[np.ndarray, tuple, tuple, tuple]: (截图, 检测区域 (x1, y1, x2, y2), 整帧尺寸 (宽, 高), 偏移 (x, y))。
+        """
+        x1, y1, x2, y2 = cls._roi_coords(roi)
+        height, width = image_cv.shape[:2]
+        if clipped:
+            if (x2 - x1, y2 - y1) != (width, height):
+                raise ValueError(f'截图尺寸 {width}x{height} 与roi {roi} 的尺寸不一致')
+            if not frame_size:
+                raise ValueError('clipped为True时需要传入整帧截图的尺寸frame_size')
+            return image_cv, (0, 0, width, height), tuple(frame_size), (x1, y1)
+        x1, y1, x2, y2 = max(x1, 0), max(y1, 0), min(x2, width), min(y2, height)
+        if x1 >= x2 or y1 >= y2:
+            raise ValueError(f'roi不在截图范围内：{roi}，截图尺寸为 {width}x{height}')
+        return image_cv, (x1, y1, x2, y2), (width, height), (0, 0)
+
+    @staticmethod
+    def _viewport_size(page) -> tuple[int, int]:
+        """
+        页面视口的尺寸 (宽, 高)，没有固定视口时读取窗口的内部尺寸。
+        """
+        viewport = page.viewport_size or page.evaluate('() => ({width: innerWidth, height: innerHeight})')
+        return viewport['width'], viewport['height']
+
+    @staticmethod
+    def _shift_boxes(boxes: list[dict], offset: tuple[int, int]) -> list[dict]:
+        """
+        把页面坐标转换为截图坐标，offset为 (0, 0) 时直接返回boxes。
+        """
+        x, y = offset
+        if not x and not y:
+            return boxes
+        return [{'x1': box.get('x1') - x, 'y1': box.get('y1') - y, 'x2': box.get('x2') - x,
+                 'y2': box.get('y2') - y} for box in boxes]
+
+    def _predict(self, image_cvs: list[np.ndarray], detect_size: int = None,
+                 frame_size: tuple[int, int] = None) -> list[list[dict]]:
+        """
+        使用当前的推理后端对一组截图执行一次YOLO推理。
+
+        Args:
+            image_cvs (list[np.ndarray]): 解码后的BGR截图列表。
+            detect_size (int, optional): YOLO的推理分辨率，默认None使用模型的默认尺寸。
+            frame_size (tuple[int, int], optional): image_cvs是从该尺寸 (宽, 高) 的整帧截图中裁剪的区域时传入，
+                没有传入detect_size时按整帧检测的缩放比例推理。默认为None。
+
+        Returns:
+            list[list[dict]]: 与image_cvs一一对应的元素字典列表。
+        """
+        self._model = self._registry.get_yolo(self._yolo_model, backend=self._detector_backend)
+        if frame_size and not detect_size:
+            return self._predict_frame_scale(image_cvs, frame_size)
+        with tracer.span('inspector.detect', images=len(image_cvs), detect_size=detect_size,
+                         backend=self._detector_backend) as span:
+            with self._registry.lock(self._yolo_model):
+                if self._detector_backend != 'ultralytics':
+                    detections = self._model(image_cvs, image_size=detect_size)
+                else:
+                    results = self._model(image_cvs, imgsz=detect_size) if detect_size else self._model(image_cvs)
+                    detections = [json.loads(item.tojson()) or [] for item in results]
+            span.set(boxes=sum(len(image_detections) for image_detections in detections))
+        return detections
+
+    def _predict_frame_scale(self, image_cvs: list[np.ndarray], frame_size: tuple[int, int]) -> list[list[dict]]:
+        """
+        按整帧检测的缩放比例检测裁剪区域，避免小区域被放大到模型的默认尺寸，检测结果与整帧检测不一致。
+
+        ultralytics与动态尺寸的ONNX模型按区域与整帧的长边比例缩小推理分辨率，尺寸相同的区域一起推理；
+        固定尺寸的ONNX模型无法修改推理分辨率，把区域放在整帧尺寸的空白画布左上角后检测，返回的坐标仍是区域内的坐标。
+        """
+        frame_width, frame_height = frame_size
+        if self._detector_backend != 'ultralytics' and not self._model.dynamic_size:
+            canvases = []
+            for image_cv in image_cvs:
+                height, width = image_cv.shape[:2]
+                canvas = np.zeros((max(frame_height, height), max(frame_width, width), 3), dtype=image_cv.dtype)
+                canvas[:height, :width] = image_cv
+                canvases.append(canvas)
+            return self._predict(canvases)
+
+        groups: dict[int, list[int]] = {}
+        for index, image_cv in enumerate(image_cvs):
+            groups.setdefault(self._frame_scale_size(image_cv.shape, frame_size), []).append(index)
+        detections = [[] for _ in image_cvs]
+        for size, indexes in groups.items():
+            group_detections = self._predict([image_cvs[index] for index in indexes], detect_size=size)
+            for index, image_detections in zip(indexes, group_detections):
+                detections[index] = image_detections
+        return detections
+
+    def _frame_scale_size(self, shape: tuple, frame_size: tuple[int, int]) -> int:
+        """
+        区域的长边在整帧检测时缩放后的像素数，向上取整到DETECT_SIZE_STRIDE的倍数，作为区域的推理分辨率。
+        """
+        if self._detector_backend == 'ultralytics':
+            base = self._model.overrides.get('imgsz') or self.DEFAULT_DETECT_SIZE
+        else:
+            base = self._model.image_size
+        base = max(base) if isinstance(base, (list, tuple)) else int(base)
+        stride = self.DETECT_SIZE_STRIDE
+        size = math.ceil(max(shape[:2]) * base / max(frame_size) / stride) * stride
+        return min(max(size, stride), base)
+
+    def _detect_incremental(self, image_cv: np.ndarray, page_index: int, lang: str = DEFAULT_LANG,
+                            detect_size: int = None) -> list[dict]:
+        """
+        与同一页面的上一帧对比，复用未变化区域的元素，只对变化区域重新检测。
+
+        Args:
+            image_cv (np.ndarray): 解码后的BGR截图。
+            page_index (int): 截图所在页面的索引。
+            lang (str, optional): 本次OCR识别使用的语言，复用元素的文本按其他语言识别时会被清除，重新识别。
+            detect_size (int, optional): YOLO的推理分辨率，默认None使用模型的默认尺寸，变化区域按整帧检测的缩放比例推理。
+
+        Returns:
+            list[dict]: 元素字典列表，复用的元素保留已识别的text与识别语言text_lang。
+        """
+        previous = self._frame_states.get(page_index)
+        if previous is None or previous[0].shape != image_cv.shape:
+            detections = self._detect(image_cv, detect_size=detect_size)
+        else:
+            previous_image, previous_detections = previous
+            regions = self._frame_diff.changed_regions(previous_image, image_cv)
+            changed_area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in regions)
+            if not regions:
+                detections = previous_detections
+            elif changed_area > image_cv.shape[0] * image_cv.shape[1] * self.INCREMENTAL_FULL_RATIO:
+                detections = self._detect(image_cv, detect_size=detect_size)
             else:
-                dom_list += item
-        return DOMResultHandler(dom_list, page_index=page_index)
+                regions = self._expand_regions(regions, previous_detections, image_cv.shape)
+                detections = [dom_detail for dom_detail in previous_detections
+                              if not any(self._intersects(self._box_coords(dom_detail.get('box')), region)
+                                         for region in regions)]
+                for region in regions:
+                    detections += self._detect(image_cv, region, detect_size=detect_size)
+        for dom_detail in detections:
+            if dom_detail.get('text') is not None and dom_detail.get('text_lang') != lang:
+                dom_detail.pop('text')
+                dom_detail.pop('text_lang', None)
+        self._frame_states[page_index] = (image_cv, detections)
+        return detections
+
+    def _expand_regions(self, regions: list[tuple], detections: list[dict], shape: tuple) -> list[tuple]:
+        """
+        把变化区域扩展到与之相交的旧元素的完整范围并留出边距，再合并相互重叠的区域，避免元素被区域边界截断或重复检测。
+        """
+        height, width = shape[:2]
+        expanded = []
+        for region in regions:
+            x1, y1, x2, y2 = region
+            for dom_detail in detections:
+                box = self._box_coords(dom_detail.get('box'))
+                if self._intersects(box, region):
+                    x1, y1, x2, y2 = min(x1, box[0]), min(y1, box[1]), max(x2, box[2]), max(y2, box[3])
+            margin = self.INCREMENTAL_MARGIN
+            expanded.append((max(x1 - margin, 0), max(y1 - margin, 0), min(x2 + margin, width), min(y2 + margin, height)))
+
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(expanded)):
+                for j in range(i + 1, len(expanded)):
+                    if self._intersects(expanded[i], expanded[j]):
+                        a, b = expanded[i], expanded.pop(j)
+                        expanded[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                        merged = True
+                        break
+                if merged:
+                    break
+        return expanded
+
+    def _fill_texts(self, image_cv: np.ndarray, detections: list[dict], lang: str, offset: tuple[int, int] = (0, 0)):
+        """
+        识别还没有text的元素，并把文本写回元素字典，增量识别时复用的元素不会重复识别。
+        offset为截图坐标到页面坐标的偏移。
+        """
+        pending = [dom_detail for dom_detail in detections if dom_detail.get('text') is None]
+        texts = self._recognize(image_cv, self._shift_boxes([dom_detail.get('box') for dom_detail in pending], offset),
+                                lang)
+        for dom_detail, text in zip(pending, texts):
+            self._store_text(dom_detail, text, lang)
+
+    @staticmethod
+    def _store_text(dom_detail: dict, text: list[str], lang: str):
+        """
+        把识别结果与识别语言写回元素字典，增量识别复用元素时按语言判断文本是否可以直接使用。
+        """
+        dom_detail['text'] = text
+        dom_detail['text_lang'] = lang
+
+    def reset_incremental(self, page_index: int = None):
+        """
+        清除增量识别保存的上一帧。
 
-    def _with_ocr(self, d):
-        dom_detail, image_cv, dom_search, ocr_type, ocr_model = d
+        Args:
+            page_index (int, optional): 页面索引，默认None清除全部页面。
+        """
+        if page_index is None:
+            self._frame_states.clear()
+        else:
+            self._frame_states.pop(page_index, None)
+
+    @staticmethod
+    def _intersects(a: tuple, b: tuple) -> bool:
+        return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+    def _with_ocr(self, dom_detail: dict, text: list[str]) -> dict:
         box: dict = dom_detail.get('box')
         name = dom_detail.get('name')
         _class = dom_detail.get('class')
         confidence = dom_detail.get('confidence')
-        cropped_image = image_cv[int(box.get('y1')): int(box.get('y2')), int(box.get('x1')): int(box.get('x2'))]
-        cropped_arr = np.array(cropped_image)
-        if ocr_type:
-            text_result = ocr_model.ocr(cropped_arr, cls=False, det=False)
-            text_result = [item[0][0] for item in text_result]
-        else:
-            text_result = ocr_model.readtext(cropped_arr, detail=0)
-        result_with_text = {"box": box, "name": name, "class": _class, "confidence": confidence,
-                            "text": text_result}
-        if isinstance(dom_search, typing.Callable) and dom_search(result_with_text):
-            return result_with_text
-        elif not dom_search:
-            return result_with_text
+        return {"box": box, "name": name, "class": _class, "confidence": confidence, "text": text}
 
-    def _get_ocr_model(self, ocr: str, lang: str):
-        from easyocr import Reader
-        model_path = path.join(ProjectPath.public_path, 'easyocr_model')
-        if not ocr:
-            raise ValueError(f'不支持传入的ocr参数：{ocr}')
-        if ocr not in ['paddleocr', 'easyocr']:
-            raise ValueError(f'仅支持两种ocr模型，请传入 "paddleocr" 或是 "easyocr" ')
-        if ocr == 'paddleocr':
+    @staticmethod
+    def _match_detection(dom_detail: dict, dom_search) -> bool or None:
+        """
+        在OCR之前只使用检测字段执行dom_search。
+
+        returns:
+            bool or None: True表示匹配，False表示不匹配，None表示需要OCR识别后才能判断。
+        """
+        if not dom_search:
+            return True
+        if isinstance(dom_search, DOMQuery):
+            return None if dom_search.match_detection(dom_detail) and dom_search.needs_text else \
+                dom_search.match_detection(dom_detail)
+        if isinstance(dom_search, tuple):
+            detection_search, text_search = dom_search
+            if detection_search and not detection_search(dom_detail):
+                return False
+            return None if text_search else True
+        try:
+            return bool(dom_search(DetectionView(dom_detail)))
+        except TextRequired:
+            return None
+
+    @staticmethod
+    def _match_text(result_with_text: dict, dom_search) -> bool:
+        """
+        在OCR之后使用包含text的元素字典执行dom_search。
+        """
+        if isinstance(dom_search, tuple):
+            return bool(dom_search[1](result_with_text))
+        return bool(dom_search(result_with_text))
+
+    def _recognize(self, image_cv: np.ndarray, boxes: list[dict], lang: str) -> list[list[str]]:
+        """
+        识别截图中一组元素的文本。
+
+        Args:
+            image_cv (np.ndarray): 解码后的BGR截图。
+            boxes (list[dict]): YOLO返回的元素坐标列表。
+            lang (str): OCR识别使用的语言。
+
+        Returns:
+            list[list[str]]: 与boxes一一对应的文本列表。
+        """
+        return self._recognize_pairs([(image_cv, box) for box in boxes], lang)
+
+    def _recognize_pairs(self, pairs: list[tuple[np.ndarray, dict]], lang: str) -> list[list[str]]:
+        """
+        识别一组 (截图, 元素坐标) 的文本，截图可以各不相同，设置了OCR结果缓存时只识别未命中缓存的元素。
+
+        Args:
+            pairs (list[tuple[np.ndarray, dict]]): 解码后的BGR截图与YOLO返回的元素坐标。
+            lang (str): OCR识别使用的语言。
+
+        Returns:
+            list[list[str]]: 与pairs一一对应的文本列表。
+        """
+        with tracer.span('inspector.ocr', crops=len(pairs), lang=lang, cached=self._ocr_cache is not None) as span:
+            if self._ocr_cache is None:
+                return self._recognize_uncached(pairs, lang)
+
+            # 缓存键使用实际加载的OCR引擎，PaddleOCR回退到EasyOCR时不会把EasyOCR的结果保存在PaddleOCR的键下
+            engine = self._ocr_engine(lang)
+            keys = [self._ocr_cache.key(self._crop(image_cv, box), engine, lang) for image_cv, box in pairs]
+            texts = self._ocr_cache.get_many(keys)
+            missing = [index for index, text in enumerate(texts) if text is None]
+            span.set(cache_hits=len(pairs) - len(missing))
+            if missing:
+                missing_texts = self._recognize_uncached([pairs[index] for index in missing], lang)
+                for index, text in zip(missing, missing_texts):
+                    texts[index] = text
+                self._ocr_cache.set_many({keys[index]: texts[index] for index in missing})
+            return texts
+
+    def _recognize_uncached(self, pairs: list[tuple[np.ndarray, dict]], lang: str) -> list[list[str]]:
+        """
+        识别一组 (截图, 元素坐标) 的文本，开启多进程时按截图分组交给OCR工作进程池，
+        否则把所有截图的裁剪图片合并在一起，在当前进程内批量识别。
+        """
+        with tracer.span('ocr.recognize', crops=len(pairs), engine=self._ocr) as span:
+            if tracer.enabled:
+                span.set(crop_sizes=[self._crop(image_cv, box).shape[:2][::-1] for image_cv, box in pairs])
+            return self._recognize_crops(pairs, lang, span)
+
+    def _recognize_crops(self, pairs: list[tuple[np.ndarray, dict]], lang: str, span) -> list[list[str]]:
+        """
+        _recognize_uncached的实现，span用于记录是否使用了OCR工作进程池。
+        """
+        pool = self._get_ocr_pool(lang)
+        span.set(pool=bool(pool))
+        if pool:
             try:
-                from paddleocr import PaddleOCR
-                ocr = PaddleOCR(use_angle_cls=True, lang=lang, show_log=False)
-                return 1, ocr
-            except:
-                print('PP飞桨OCR使用失败，将使用EasyOCR')
-                return 0, Reader(['ch_sim', 'en'], model_storage_directory=model_path, download_enabled=False)
-        return 0, Reader(['ch_sim', 'en'], model_storage_directory=model_path, download_enabled=False)
\ No newline at end of file
+                texts = [None] * len(pairs)
+                groups: dict[int, list[int]] = {}
+                for index, (image_cv, _) in enumerate(pairs):
+                    groups.setdefault(id(image_cv), []).append(index)
+                for indices in groups.values():
+                    image_cv = pairs[indices[0]][0]
+                    group_texts = pool.recognize(image_cv, [self._box_coords(pairs[index][1]) for index in indices])
+                    for index, text in zip(indices, group_texts):
+                        texts[index] = text
+                return texts
+            except RuntimeError as e:
+                print(f'多进程OCR识别失败，将使用进程内OCR：{e}')
+                pool.close()
+                self._ocr_pools[lang] = None
+                span.set(pool=False)
+
+        ocr_type, ocr_model = self._get_ocr_model(self._ocr, lang)
+        recognizer = OCRRecognizer(ocr_type, ocr_model, batch_size=self._ocr_batch_size)
+        with self._registry.lock((ModelRegistry.OCR_ENGINES[ocr_type], lang)):
+            return recognizer.recognize_batch([self._crop(image_cv, box) for image_cv, box in pairs])
+
+    def _ocr_engine(self, lang: str) -> str:
+        """
+        实际用于识别的OCR引擎，开启多进程时以工作进程加载的引擎为准，否则加载进程内的OCR模型后判断。
+        """
+        pool = self._get_ocr_pool(lang)
+        if pool:
+            return pool.engine
+        return ModelRegistry.OCR_ENGINES[self._get_ocr_model(self._ocr, lang)[0]]
+
+    def _get_ocr_pool(self, lang: str) -> OCRWorkerPool or None:
+        if not self._num_processes:
+            return None
+        if lang not in self._ocr_pools:
+            try:
+                self._ocr_pools[lang] = OCRWorkerPool(ocr=self._ocr, lang=lang, num_processes=self._num_processes,
+                                                      batch_size=self._ocr_batch_size)
+            except (RuntimeError, OSError) as e:
+                print(f'OCR工作进程启动失败，将使用进程内OCR：{e}')
+                self._ocr_pools[lang] = None
+        return self._ocr_pools[lang]
+
+    @property
+    def ocr_cache(self) -> OCRCache or None:
+        return self._ocr_cache
+
+    def close(self):
+        """
+        关闭OCR工作进程池与推理服务的连接。
+        """
+        if self._client:
+            self._client.close()
+        for pool in self._ocr_pools.values():
+            if pool: pool.close()
+        self._ocr_pools.clear()
+
+    @staticmethod
+    def _box_coords(box: dict) -> tuple[int, int, int, int]:
+        return int(box.get('x1')), int(box.get('y1')), int(box.get('x2')), int(box.get('y2'))
+
+    @classmethod
+    def _crop(cls, image_cv: np.ndarray, box: dict) -> np.ndarray:
+        x1, y1, x2, y2 = cls._box_coords(box)
+        return image_cv[y1: y2, x1: x2]
+
+    @staticmethod
+    def decode(image: bytes | np.ndarray) -> np.ndarray:
+        """
+        把截图统一转换为BGR格式的图像数组。
+
+        Args:
+            image (bytes | np.ndarray): 图像字节数据(PNG、JPEG等)，或是图像数组(BGR、BGRA、灰度)。
+
+        Returns:
+            np.ndarray: BGR格式的图像数组。
+        """
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2:
+                return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            if image.shape[2] == 4:
+                return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            return image
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            with tracer.span('inspector.decode', bytes=len(image)):
+                image_cv = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), flags=cv2.IMREAD_COLOR)
+            if image_cv is None:
+                raise ValueError('图像字节数据解码失败')
+            return image_cv
+        raise TypeError(f'不支持的图像类型：{type(image)}，请传入图像字节数据或是图像数组')
+
+    def _get_ocr_model(self, ocr: str, lang: str):
+        return self._registry.get_ocr(ocr, lang)
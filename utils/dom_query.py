@@ -0,0 +1,162 @@
+import typing
+
+
+class TextRequired(BaseException):
+    """
+    检测阶段的筛选条件读取了text字段，需要OCR识别后才能判断。
+    继承BaseException，筛选函数中的 except Exception 不会把它当作普通错误吞掉。
+    """
+
+
+class DetectionView(dict):
+    """
+    只包含YOLO检测字段(box、name、class、confidence)的DOM元素视图，读取text时抛出TextRequired。
+
+    DOMInspector在OCR之前使用它执行dom_search，利用 and / or 的短路特性，
+    例如 item.get('name') == 'channel-link' and '鬼畜' in item.get('text')，
+    name不匹配的元素在读取text之前就已经被排除，不会进入OCR识别。
+
+    Notes:
+        - 判断 'text' in item、遍历字典(keys、values、items)以及copy都会涉及text，同样抛出TextRequired。
+    """
+
+    def __getitem__(self, key):
+        if key == 'text':
+            raise TextRequired
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == 'text':
+            raise TextRequired
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        if key == 'text':
+            raise TextRequired
+        return super().__contains__(key)
+
+    def __iter__(self):
+        raise TextRequired
+
+    def keys(self):
+        raise TextRequired
+
+    def values(self):
+        raise TextRequired
+
+    def items(self):
+        raise TextRequired
+
+    def copy(self):
+        raise TextRequired
+
+
+class DOMQuery:
+    """
+    结构化的DOM元素查询条件，检测字段的条件在OCR之前执行，文本条件在OCR之后执行。
+
+    Args:
+        name (str | list[str], optional): 元素名称，传入列表时匹配其中任意一个。
+        class_id (int | list[int], optional): 元素的类别索引，传入列表时匹配其中任意一个。
+        min_confidence (float, optional): 最低置信度。
+        text (str, optional): 元素文本完全等于该值。
+        text_contains (str, optional): 元素文本包含该值。
+        where (Callable, optional): 额外的筛选函数，接收包含text的元素字典，在OCR之后执行。
+
+    Example:
+        query = DOMQuery(name='channel-link', text_contains='鬼畜')
+        result = dom_inspector(image=screenshot, dom_search=query)
+        result.click()
+    """
+
+    def __init__(self, name: str | list[str] = None, class_id: int | list[int] = None, min_confidence: float = None,
+                 text: str = None, text_contains: str = None, where: typing.Callable = None):
+        self._names = [name] if isinstance(name, str) else name
+        self._class_ids = [class_id] if isinstance(class_id, int) else class_id
+        self._min_confidence = min_confidence
+        self._text = text
+        self._text_contains = text_contains
+        self._where = where
+
+    def __call__(self, item: dict) -> bool:
+        return self.match(item)
+
+    @property
+    def needs_text(self) -> bool:
+        """
+        returns:
+            bool: 查询条件是否需要读取元素文本。
+        """
+        return self._text is not None or self._text_contains is not None or self._where is not None
+
+    @property
+    def serializable(self) -> bool:
+        """
+        returns:
+            bool: 查询条件是否可以转换为字典，包含where函数时不可以。
+        """
+        return self._where is None
+
+    def to_dict(self) -> dict:
+        """
+        把查询条件转换为可以JSON序列化的字典，用于发送给推理服务。
+
+        returns:
+            dict: 查询条件字典，可以使用DOMQuery.from_dict还原。
+        """
+        if not self.serializable:
+            raise ValueError('包含where函数的查询条件无法序列化')
+        return {'name': self._names, 'class_id': self._class_ids, 'min_confidence': self._min_confidence,
+                'text': self._text, 'text_contains': self._text_contains}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DOMQuery':
+        """
+        从to_dict返回的字典还原查询条件。
+
+        Args:
+            data (dict): 查询条件字典。
+
+        returns:
+            DOMQuery: 查询条件。
+        """
+        return cls(**{key: data.get(key) for key in ('name', 'class_id', 'min_confidence', 'text', 'text_contains')})
+
+    def match_detection(self, item: dict) -> bool:
+        """
+        只使用检测字段判断元素是否匹配。
+
+        Args:
+            item (dict): YOLO返回的元素字典。
+
+        returns:
+            bool: 是否匹配。
+        """
+        if self._names is not None and item.get('name') not in self._names:
+            return False
+        if self._class_ids is not None and item.get('class') not in self._class_ids:
+            return False
+        if self._min_confidence is not None and item.get('confidence', 0) < self._min_confidence:
+            return False
+        return True
+
+    def match(self, item: dict) -> bool:
+        """
+        使用全部条件判断元素是否匹配。
+
+        Args:
+            item (dict): 包含text的元素字典。
+
+        returns:
+            bool: 是否匹配。
+        """
+        if not self.match_detection(item):
+            return False
+        text = ''.join(item.get('text') or [])
+        if self._text is not None and text != self._text:
+            return False
+        if self._text_contains is not None and self._text_contains not in text:
+            return False
+        if self._where is not None and not self._where(item):
+            return False
+        return True
@@ -1,6 +1,10 @@
 import typing
+import numpy as np
 import playwright.sync_api
-from utils import BrowserLauncher
+from utils.browser_launcher import BrowserLauncher
+from utils.dom_query import DetectionView, TextRequired
+from utils.lazy_text import LazyDOMItem, resolve_texts
+from utils.tracing import tracer
 import logging
 
 
@@ -18,6 +22,15 @@ class DOMResultHandler:
         click(callback, page_index, double): 模拟点击DOM元素。
         input(text, callback, page_index): 模拟在DOM输入元素中输入文本。
         scroll(callback, page_index, scroll_x, scroll_y): 模拟在DOM元素上滚动。
+        by_name(*names) / by_class(*class_ids) / min_confidence(threshold): 按检测字段筛选元素。
+        inside(x1, y1, x2, y2) / nearest(x, y): 按区域、距离筛选元素。
+        right_of(other) / left_of(other) / below(other) / above(other): 按与另一个元素的相对位置筛选元素。
+
+    Notes:
+        - 元素的坐标、置信度、类别索引以NumPy数组按列保存，并建立名称到元素索引的索引，
+          按检测字段与位置的筛选都是向量化计算，不需要对每个元素执行Python回调。
+        - DOMInspector开启lazy_ocr时，元素的text在filter、get_texts、click、input的回调第一次读取时才识别，
+          回调执行前会先批量识别所有需要读取text的元素，识别结果会被缓存。
 
     Example:
         dom_inspector = DOMInspector(yolo_model_path)
@@ -28,18 +41,26 @@ class DOMResultHandler:
         dom_handler.click(callback=lambda item: 'button' in item.get('name'))
         dom_handler.input('Hello World!', callback=lambda item: 'input' in item.get('name'))
         dom_handler.scroll(callback=lambda item: 'scroll' in item.get('name'))
+        search_label = dom_handler.filter(lambda item: '搜索' in item.get('text'))
+        dom_handler.by_name('search-input').right_of(search_label).click()
     """
 
-    def __init__(self, result_list, page_index: int = 0):
+    DEFAULT_SCROLL_WAIT = 500
+
+    def __init__(self, result_list, page_index: int = 0, browser=None):
         """
         初始化DOMResultHandler，传入一系列DOM元素详细信息。
 
         Args:
             result_list (list[dict]): 一系列DOM元素详细信息，每个元素都用字典表示。
+            page_index (int): 执行操作的页面索引。
+            browser (Browser, optional): 执行操作的浏览器，默认None使用BrowserLauncher的全局单例。
+                在BrowserPool等多浏览器场景下传入各自的Browser，使结果绑定到自己的浏览器上下文。
         """
         self._logging = logging.getLogger('Handler')
         self._result_list = result_list
-        self._browser_launcher = BrowserLauncher()
+        self._build_columns()
+        self._browser_launcher = browser if browser is not None else BrowserLauncher()
         self._page = self._browser_launcher.pages[page_index]
         self._page_index = page_index
 
@@ -53,6 +74,7 @@ class DOMResultHandler:
         returns:
             tuple[float, float] or None: DOM元素的中心坐标 (x, y)，如果找不到则返回None。
         """
+        self._resolve_texts(callback)
         dom_detail: list[dict] = self._result_list if not callback else \
             [item for item in self._result_list if callback(item)]
         if not dom_detail:
@@ -61,11 +83,227 @@ class DOMResultHandler:
             return None, None
         dom_detail: dict = dom_detail[0]
         box: dict = dom_detail.get('box')
-        x1, y1, x2, y2 = box.values()
+        x1, y1, x2, y2 = box.get('x1'), box.get('y1'), box.get('x2'), box.get('y2')
         x = (x2 - x1) / 2 + x1
         y = (y2 - y1) / 2 + y1
         return x, y
 
+    def _build_columns(self):
+        """
+        把元素列表转换为按列保存的NumPy数组，并建立名称到元素索引的索引。
+        """
+        boxes = [item.get('box') for item in self._result_list]
+        self._boxes = np.array([[box.get('x1'), box.get('y1'), box.get('x2'), box.get('y2')] for box in boxes],
+                               dtype=np.float64).reshape(-1, 4)
+        self._confidences = np.array([item.get('confidence') or 0 for item in self._result_list], dtype=np.float64)
+        self._class_ids = np.array([-1 if item.get('class') is None else item.get('class')
+                                    for item in self._result_list], dtype=np.int64)
+        name_index: dict[str, list[int]] = {}
+        for index, item in enumerate(self._result_list):
+            name_index.setdefault(item.get('name'), []).append(index)
+        self._name_index = {name: np.array(indices, dtype=np.int64) for name, indices in name_index.items()}
+
+    def _take(self, indices: np.ndarray or list[int]):
+        """
+        按索引取出元素，返回一个新的DOMResultHandler实例。
+        """
+        return self._new([self._result_list[index] for index in np.asarray(indices, dtype=np.int64)])
+
+    def _new(self, result_list: list[dict]):
+        """
+        使用当前实例的页面创建一个新的实例，子类可以重写以返回自身的类型。
+        """
+        return DOMResultHandler(result_list, page_index=self._page_index, browser=self._browser_launcher)
+
+    @staticmethod
+    def _reference_box(other) -> np.ndarray:
+        """
+        获取相对位置查询的参照元素坐标，支持DOMResultHandler(取第一个元素)、元素字典、(x1, y1, x2, y2)。
+        """
+        if isinstance(other, DOMResultHandler):
+            if not len(other):
+                raise ValueError('参照的DOMResultHandler中没有元素')
+            return other.boxes[0]
+        if isinstance(other, dict):
+            box = other.get('box')
+            return np.array([box.get('x1'), box.get('y1'), box.get('x2'), box.get('y2')], dtype=np.float64)
+        return np.asarray(other, dtype=np.float64)
+
+    def by_name(self, *names: str):
+        """
+        按元素名称筛选。
+
+        Args:
+            names (str): 一个或多个元素名称。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        indices = [self._name_index[name] for name in names if name in self._name_index]
+        return self._take(np.sort(np.concatenate(indices)) if indices else [])
+
+    def by_class(self, *class_ids: int):
+        """
+        按元素的类别索引筛选。
+
+        Args:
+            class_ids (int): 一个或多个类别索引。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        return self._take(np.flatnonzero(np.isin(self._class_ids, class_ids)))
+
+    def min_confidence(self, threshold: float):
+        """
+        筛选置信度不低于阈值的元素。
+
+        Args:
+            threshold (float): 置信度阈值。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        return self._take(np.flatnonzero(self._confidences >= threshold))
+
+    def inside(self, x1: float, y1: float, x2: float, y2: float, partial: bool = False):
+        """
+        筛选位于指定区域内的元素。
+
+        Args:
+            x1, y1, x2, y2 (float): 区域的左上角与右下角坐标。
+            partial (bool): 是否包含只有部分位于区域内的元素，默认False只保留完全位于区域内的元素。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        b = self._boxes
+        if partial:
+            mask = (b[:, 0] < x2) & (b[:, 2] > x1) & (b[:, 1] < y2) & (b[:, 3] > y1)
+        else:
+            mask = (b[:, 0] >= x1) & (b[:, 2] <= x2) & (b[:, 1] >= y1) & (b[:, 3] <= y2)
+        return self._take(np.flatnonzero(mask))
+
+    def nearest(self, x: float, y: float, k: int = 1):
+        """
+        筛选中心点距离指定坐标最近的k个元素，按距离由近到远排序。
+
+        Args:
+            x, y (float): 坐标。
+            k (int): 返回的元素数量，默认1。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        distances = np.hypot(self.centers[:, 0] - x, self.centers[:, 1] - y)
+        return self._take(np.argsort(distances, kind='stable')[:k])
+
+    def right_of(self, other, aligned: bool = True, tolerance: float = 5):
+        """
+        筛选位于参照元素右侧的元素，按与参照元素的水平距离由近到远排序。
+
+        Args:
+            other (DOMResultHandler | dict | tuple): 参照元素。
+            aligned (bool): 是否要求与参照元素在垂直方向上有重叠，默认True。
+            tolerance (float): 允许重叠的像素数，默认5。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        reference = self._reference_box(other)
+        return self._relative(self._boxes[:, 0] - reference[2], self._vertical_overlap(reference), aligned, tolerance)
+
+    def left_of(self, other, aligned: bool = True, tolerance: float = 5):
+        """
+        筛选位于参照元素左侧的元素，按与参照元素的水平距离由近到远排序，参数同right_of。
+        """
+        reference = self._reference_box(other)
+        return self._relative(reference[0] - self._boxes[:, 2], self._vertical_overlap(reference), aligned, tolerance)
+
+    def below(self, other, aligned: bool = True, tolerance: float = 5):
+        """
+        筛选位于参照元素下方的元素，按与参照元素的垂直距离由近到远排序。
+
+        Args:
+            other (DOMResultHandler | dict | tuple): 参照元素。
+            aligned (bool): 是否要求与参照元素在水平方向上有重叠，默认True。
+            tolerance (float): 允许重叠的像素数，默认5。
+
+        returns:
+            DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
+        """
+        reference = self._reference_box(other)
+        return self._relative(self._boxes[:, 1] - reference[3], self._horizontal_overlap(reference), aligned, tolerance)
+
+    def above(self, other, aligned: bool = True, tolerance: float = 5):
+        """
+        筛选位于参照元素上方的元素，按与参照元素的垂直距离由近到远排序，参数同below。
+        """
+        reference = self._reference_box(other)
+        return self._relative(reference[1] - self._boxes[:, 3], self._horizontal_overlap(reference), aligned, tolerance)
+
+    def _relative(self, gaps: np.ndarray, overlap: np.ndarray, aligned: bool, tolerance: float):
+        mask = gaps >= -tolerance
+        if aligned:
+            mask &= overlap
+        indices = np.flatnonzero(mask)
+        return self._take(indices[np.argsort(gaps[indices], kind='stable')])
+
+    def _vertical_overlap(self, reference: np.ndarray) -> np.ndarray:
+        return (self._boxes[:, 1] < reference[3]) & (self._boxes[:, 3] > reference[1])
+
+    def _horizontal_overlap(self, reference: np.ndarray) -> np.ndarray:
+        return (self._boxes[:, 0] < reference[2]) & (self._boxes[:, 2] > reference[0])
+
+    def __len__(self):
+        return len(self._result_list)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """
+        returns:
+            np.ndarray: 形状为 (元素数量, 4) 的元素坐标数组，每行为 (x1, y1, x2, y2)。
+        """
+        return self._boxes
+
+    @property
+    def centers(self) -> np.ndarray:
+        """
+        returns:
+            np.ndarray: 形状为 (元素数量, 2) 的元素中心坐标数组。
+        """
+        return (self._boxes[:, :2] + self._boxes[:, 2:]) / 2
+
+    @property
+    def confidences(self) -> np.ndarray:
+        return self._confidences
+
+    @property
+    def class_ids(self) -> np.ndarray:
+        return self._class_ids
+
+    def _resolve_texts(self, callback: typing.Callable = None):
+        """
+        在执行回调之前，批量识别回调需要读取text的懒加载元素，避免回调逐个触发OCR识别。
+
+        Args:
+            callback (Callable): 用于筛选DOM元素的回调函数，为None时不识别。
+        """
+        if not callback:
+            return
+        pending = [item for item in self._result_list if isinstance(item, LazyDOMItem) and not item.resolved]
+        resolve_texts([item for item in pending if self._needs_text(item, callback)])
+
+    @staticmethod
+    def _needs_text(item: dict, callback: typing.Callable) -> bool:
+        try:
+            callback(DetectionView(item))
+            return False
+        except TextRequired:
+            return True
+        except Exception:
+            return True
+
     def filter(self, callback: typing.Callable):
         """
          根据回调返回一个新的DOMResultHandler实例，包含经过筛选的元素。
@@ -76,8 +314,9 @@ class DOMResultHandler:
          returns:
              DOMResultHandler: 包含筛选元素的新DOMResultHandler实例。
          """
+        self._resolve_texts(callback)
         result = [item for item in self._result_list if callback(item)]
-        return DOMResultHandler(result, page_index=self._page_index)
+        return self._new(result)
 
     @property
     def get_texts(self):
@@ -87,6 +326,7 @@ class DOMResultHandler:
         returns:
             list[str]: 包含DOM元素文本内容的列表。
         """
+        resolve_texts(self._result_list)
         return [item.get('text') for item in self._result_list]
 
     def click(self, callback: typing.Callable = None, page_index: int = None, double: bool = False):
@@ -101,15 +341,17 @@ class DOMResultHandler:
         returns:
             None
         """
-        x, y = self._get_position(callback=callback)
+        with tracer.span('handler.locate', elements=len(self._result_list)):
+            x, y = self._get_position(callback=callback)
         if not x or not y:
             return None
         page_index = self._page_index if not page_index else page_index
         page: playwright.sync_api.Page = self._browser_launcher.pages[page_index]
-        if not double:
-            page.mouse.click(x=x, y=y)
-        elif double:
-            page.mouse.dblclick(x=x, y=y)
+        with tracer.span('handler.click', x=x, y=y, double=double):
+            if not double:
+                page.mouse.click(x=x, y=y)
+            elif double:
+                page.mouse.dblclick(x=x, y=y)
 
     def input(self, text: str, clear: bool = True, callback: typing.Callable = None, page_index: int = None):
         """
@@ -124,19 +366,21 @@ class DOMResultHandler:
         returns:
             None
         """
-        x, y = self._get_position(callback=callback)
+        with tracer.span('handler.locate', elements=len(self._result_list)):
+            x, y = self._get_position(callback=callback)
         if not x or not y:
             return None
         page_index = self._page_index if not page_index else page_index
         page: playwright.sync_api.Page = self._browser_launcher.pages[page_index]
-        page.mouse.click(x=x, y=y)
-        if clear:
-            page.keyboard.press('Control+A')
-            page.keyboard.press('Backspace')
-        page.keyboard.insert_text(text=text)
+        with tracer.span('handler.input', x=x, y=y, characters=len(text), clear=clear):
+            page.mouse.click(x=x, y=y)
+            if clear:
+                page.keyboard.press('Control+A')
+                page.keyboard.press('Backspace')
+            page.keyboard.insert_text(text=text)
 
     def scroll(self, callback: typing.Callable = None, page_index: int = None, scroll_x: float = 100.00,
-               scroll_y: float = 100.00):
+               scroll_y: float = 100.00, wait: float = DEFAULT_SCROLL_WAIT):
         """
         模拟在DOM元素上滚动。
 
@@ -145,17 +389,21 @@ class DOMResultHandler:
             page_index (int): 执行滚动操作的页面索引。
             scroll_x (float): 水平方向的滚动量。
             scroll_y (float): 垂直方向的滚动量。
+            wait (float): 移动鼠标后与滚动后的等待时间，单位毫秒，默认DEFAULT_SCROLL_WAIT。
+                传入0不等待，之后可以使用DOMInspector.wait_for等待滚动后出现的元素。
 
         returns:
             None
         """
-        x, y = self._get_position(callback=callback)
+        with tracer.span('handler.locate', elements=len(self._result_list)):
+            x, y = self._get_position(callback=callback)
         page_index = self._page_index if not page_index else page_index
         page: playwright.sync_api.Page = self._browser_launcher.pages[page_index]
-        page.mouse.move(x, y)
-        page.wait_for_timeout(500)
-        page.mouse.wheel(delta_x=scroll_x, delta_y=scroll_y)
-        page.wait_for_timeout(500)
+        with tracer.span('handler.scroll', x=x, y=y, scroll_x=scroll_x, scroll_y=scroll_y, wait=wait):
+            page.mouse.move(x, y)
+            if wait: page.wait_for_timeout(wait)
+            page.mouse.wheel(delta_x=scroll_x, delta_y=scroll_y)
+            if wait: page.wait_for_timeout(wait)
 
     @property
     def get(self) -> list:
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+from os import path
+
+import cv2
+import numpy as np
+
+DEFAULT_DISTANCE = 6
+LABEL_GRID = 0.05
+INDEX_NAME = 'duplicate_index.jsonl'
+
+
+class DuplicateIndex:
+    """
+    截图的近似重复索引，保存在索引文件中跨运行持久化，多个数据集共用同一个索引文件时跨数据集去重。
+
+    每个样本的指纹由两部分组成：
+        - 截图的差值哈希(dHash，64位)，比较汉明距离，容忍压缩、动画、轮播图等带来的细微差异；
+        - 标签签名，把YOLO标签按LABEL_GRID量化后排序取哈希，标签签名相同且dHash距离不超过max_distance时视为近似重复。
+
+    URL收集完毕(commit)后样本的指纹才写入索引文件，中断时未完成URL的样本会被重新收集，不会被当作重复丢弃。
+    """
+
+    def __init__(self, index_path: str, max_distance: int = DEFAULT_DISTANCE, keep: int = 0, dataset: str = None):
+        """
+        :param index_path: 索引文件路径，LabelGenerator默认使用数据集目录下的索引，不同数据集可以显式共用同一个索引。
+        :param max_distance: dHash的最大汉明距离(0~64)，距离不超过该值视为近似重复，默认6。
+        :param keep: 每个近似重复组最多额外保留的样本数量，默认0只保留第一个。
+        :param dataset: 当前数据集名称，记录在索引中。
+        """
+        if not 0 <= max_distance <= 64:
+            raise ValueError(f'max_distance需要在[0, 64]之间：{max_distance}')
+        self._index_path = index_path
+        self._max_distance = max_distance
+        self._keep = keep
+        self._dataset = dataset
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._pending = {}
+        self.checked = 0
+        self.dropped = 0
+        self.dropped_bytes = 0
+
+        if path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as rf:
+                for line in rf:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._buckets.setdefault(record['signature'], []).append(record['hash'])
+
+    def __len__(self):
+        return sum(len(hashes) for hashes in self._buckets.values())
+
+    @staticmethod
+    def image_hash(image: bytes or np.ndarray) -> int:
+        """
+        计算截图的dHash：缩放为9x8的灰度图，比较水平相邻像素的亮度得到64位哈希。
+
+        :param image: png等格式的截图，或BGR/灰度图数组。
+        :return: 64位整数。
+        """
+        if isinstance(image, (bytes, bytearray)):
+            # 按1/8尺寸解码，避免完整解码大尺寸截图
+            image = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        elif image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
+
+    @staticmethod
+    def label_signature(labels: str) -> str:
+        """
+        把YOLO标签按LABEL_GRID量化后排序取哈希，位置相近、类别一致的标签集合得到相同的签名。
+        """
+        rows = []
+        for line in labels.splitlines():
+            values = line.split()
+            if len(values) != 5:
+                continue
+            rows.append(' '.join([values[0]] + [str(round(float(value) / LABEL_GRID)) for value in values[1:]]))
+        return hashlib.md5('\n'.join(sorted(rows)).encode('utf-8')).hexdigest()[:16]
+
+    def is_duplicate(self, image: bytes, labels: str, url: str = None, name: str = None, visit: int = 0) -> bool:
+        """
+        判断样本是否与索引中的样本近似重复，不重复时把指纹加入索引(等待commit写入索引文件)。
+
+        :param image: png格式的截图。
+        :param labels: YOLO格式的标签文本。
+        :param url: 样本所属的URL，commit时按URL写入。
+        :param name: 样本文件名，记录在索引中。
+        :param visit: 同一个URL第几次出现，与DatasetWriter一致，commit时按 (url, visit) 写入。
+        :return: 近似重复且超过keep数量时返回True，调用方应丢弃该样本。
+        """
+        image_hash = self.image_hash(image)
+        signature = self.label_signature(labels)
+        with self._lock:
+            self.checked += 1
+            hashes = self._buckets.setdefault(signature, [])
+            matches = sum(1 for value in hashes if bin(value ^ image_hash).count('1') <= self._max_distance)
+            if matches > self._keep:
+                self.dropped += 1
+                self.dropped_bytes += len(image)
+                return True
+            hashes.append(image_hash)
+            self._pending.setdefault((url, visit), []).append(
+                {'hash': image_hash, 'signature': signature, 'dataset': self._dataset, 'name': name, 'url': url})
+            return False
+
+    def commit(self, url: str = None, visit: int = 0):
+        """
+        把URL一次访问的样本指纹追加到索引文件。
+        """
+        with self._lock:
+            records = self._pending.pop((url, visit), [])
+            if not records:
+                return
+            directory = path.dirname(self._index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self._index_path, 'a', encoding='utf-8') as fw:
+                fw.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+
+    def summary(self) -> str:
+        """
+        本次运行的去重统计。
+        """
+        ratio = self.dropped / self.checked if self.checked else 0
+        return (f'近似重复去重：检查 {self.checked} 个样本，丢弃 {self.dropped} 个({ratio:.1%})，'
+                f'节省 {self.dropped_bytes / 1024 / 1024:.2f} MB，索引共 {len(self)} 条')
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+
+
+class FrameDiff:
+    """
+    按图块对比前后两帧截图，找出发生变化的区域。
+
+    Args:
+        tile_size (int, optional): 图块的边长，单位像素。默认为DEFAULT_TILE_SIZE。
+        threshold (int, optional): 图块内任意像素的通道差值超过该值时认为图块发生变化。默认为DEFAULT_THRESHOLD。
+
+    Example:
+        frame_diff = FrameDiff()
+        regions = frame_diff.changed_regions(previous_frame, current_frame)
+    """
+
+    DEFAULT_TILE_SIZE = 64
+    DEFAULT_THRESHOLD = 16
+
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE, threshold: int = DEFAULT_THRESHOLD):
+        self._tile_size = tile_size
+        self._threshold = threshold
+
+    def changed_tiles(self, previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+        """
+        计算发生变化的图块。
+
+        Args:
+            previous (np.ndarray): 上一帧截图。
+            current (np.ndarray): 当前帧截图，尺寸需与上一帧一致。
+
+        Returns:
+            np.ndarray: 形状为 (行数, 列数) 的布尔数组，True表示该图块发生变化。
+        """
+        diff = cv2.absdiff(previous, current)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+        height, width = diff.shape
+        rows, cols = -(-height // self._tile_size), -(-width // self._tile_size)
+        padded = np.zeros((rows * self._tile_size, cols * self._tile_size), dtype=diff.dtype)
+        padded[:height, :width] = diff
+        tiles = padded.reshape(rows, self._tile_size, cols, self._tile_size).max(axis=(1, 3))
+        return tiles > self._threshold
+
+    def changed_regions(self, previous: np.ndarray, current: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """
+        把相互连通的变化图块合并为矩形区域。
+
+        Args:
+            previous (np.ndarray): 上一帧截图。
+            current (np.ndarray): 当前帧截图，尺寸需与上一帧一致。
+
+        Returns:
+            list[tuple[int, int, int, int]]: 变化区域 (x1, y1, x2, y2) 列表，没有变化时为空列表。
+        """
+        tiles = self.changed_tiles(previous, current)
+        if not tiles.any():
+            return []
+        height, width = current.shape[:2]
+        count, _, stats, _ = cv2.connectedComponentsWithStats(tiles.astype(np.uint8), connectivity=8)
+        regions = []
+        for x, y, w, h, _ in stats[1:count]:
+            regions.append((int(x * self._tile_size), int(y * self._tile_size),
+                            int(min((x + w) * self._tile_size, width)), int(min((y + h) * self._tile_size, height))))
+        return regions
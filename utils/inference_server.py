@@ -0,0 +1,471 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+import numpy as np
+from utils.dom_inspector import DOMInspector
+from utils.dom_query import DOMQuery
+from utils.model_registry import ModelRegistry
+
+
+class _InferenceRequestHandler(BaseHTTPRequestHandler):
+    """
+    推理服务的HTTP接口：
+        - POST /inspect：请求体为图像字节数据(PNG、JPEG等)，或是Content-Type为application/x-ndarray的BGR图像数组，
+          数组需通过请求头X-Image-Shape传入形状。
+          查询参数 lang、use_ocr、query(DOMQuery.to_dict的JSON)、detect_size、frame_size(宽,高)。
+        - GET /health：服务状态。
+        - GET /stats：请求数、批次大小与延迟统计。
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        route = urlparse(self.path).path
+        if route == '/health':
+            self._send_json(200, self.server.inference.health)
+        elif route == '/stats':
+            self._send_json(200, self.server.inference.stats)
+        else:
+            self._send_json(404, {'error': f'不存在的接口：{route}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if url.path != '/inspect':
+            self._send_json(404, {'error': f'不存在的接口：{url.path}'})
+            return
+        try:
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if self.headers.get('Content-Type') == InferenceClient.NDARRAY_CONTENT_TYPE:
+                shape = tuple(int(size) for size in self.headers.get('X-Image-Shape', '').split(','))
+                image = np.frombuffer(body, dtype=np.uint8).reshape(shape)
+            else:
+                image = body
+            query = json.loads(params['query']) if params.get('query') else None
+            detect_size = int(params['detect_size']) if params.get('detect_size') else None
+            frame_size = tuple(int(size) for size in params['frame_size'].split(',')) \
+                if params.get('frame_size') else None
+            future = self.server.inference.submit(image, lang=params.get('lang', DOMInspector.DEFAULT_LANG),
+                                                  use_ocr=params.get('use_ocr', '1') not in ('0', 'false'), query=query,
+                                                  detect_size=detect_size, frame_size=frame_size)
+            dom_list = future.result()
+        except (ValueError, TypeError, KeyError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': repr(e)})
+            return
+        self._send_json(200, dom_list)
+
+    def _send_json(self, status: int, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logging.getLogger('InferenceServer').debug('%s - %s', self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InferenceServer:
+    """
+    本地推理服务，独占YOLO与OCR模型，多个测试进程通过InferenceClient或客户端模式的DOMInspector共享同一份模型，
+    不再各自加载。
+
+    并发到达的请求在 batch_window 时间窗口内合并为一个批次，调用DOMInspector.inspect_batch批量推理，
+    返回与DOMInspector.inspect相同的元素字典列表。
+
+    Args:
+        yolo_model (str): YOLO模型的路径。
+        host (str, optional): 监听的地址。默认为'127.0.0.1'。
+        port (int, optional): 监听的端口。默认为DEFAULT_PORT。
+        unix_socket (str, optional): Unix套接字路径，传入时监听Unix套接字而不是TCP端口。默认为None。
+        max_batch_size (int, optional): 每个批次最多合并的请求数量。默认为DEFAULT_MAX_BATCH_SIZE。
+        batch_window (float, optional): 收到第一个请求后等待其他请求加入批次的时间，单位秒。默认为DEFAULT_BATCH_WINDOW。
+        **kwargs: 其余参数传给DOMInspector，例如 ocr、ocr_batch_size、num_processes、ocr_cache、detector_backend。
+
+    Notes:
+        - 同一批次内 lang、use_ocr、query、detect_size 相同的请求一起推理，不同的请求按条件分组后依次推理。
+        - 客户端传入函数形式的dom_search时无法发送给服务，由客户端在收到结果后筛选。
+
+    Example:
+        # 命令行启动
+        python -m utils.inference_server --model bilibili_best.pt --port 8765
+
+        # 测试进程内使用
+        dom_inspector = DOMInspector(server_url='http://127.0.0.1:8765')
+        result = dom_inspector(image=browser_launcher.capture_frame(), dom_search=DOMQuery(name='channel-link'))
+    """
+
+    DEFAULT_PORT = 8765
+    DEFAULT_MAX_BATCH_SIZE = 8
+    DEFAULT_BATCH_WINDOW = 0.01
+    LATENCY_WINDOW = 1024
+
+    def __init__(self, yolo_model: str, host: str = '127.0.0.1', port: int = DEFAULT_PORT, unix_socket: str = None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, batch_window: float = DEFAULT_BATCH_WINDOW, **kwargs):
+        self._yolo_model = yolo_model
+        self._inspector = DOMInspector(yolo_model, **kwargs)
+        self._max_batch_size = max(max_batch_size, 1)
+        self._batch_window = batch_window
+        self._unix_socket = unix_socket
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._counters = {'requests': 0, 'errors': 0, 'batches': 0, 'max_batch_size': 0}
+        self._latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self._queue_waits = deque(maxlen=self.LATENCY_WINDOW)
+        self._serve_thread = None
+
+        ModelRegistry().get_yolo(yolo_model, backend=kwargs.get('detector_backend', 'ultralytics'))
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            self._server = _UnixHTTPServer(unix_socket, _InferenceRequestHandler)
+        else:
+            self._server = ThreadingHTTPServer((host, port), _InferenceRequestHandler)
+            self._server.daemon_threads = True
+        self._server.inference = self
+        self._batch_thread = threading.Thread(target=self._batch_loop, name='InferenceServer-batch', daemon=True)
+        self._batch_thread.start()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def url(self) -> str:
+        """
+        returns:
+            str: 客户端连接服务使用的地址，Unix套接字为 unix://路径，TCP为 http://地址:端口。
+        """
+        if self._unix_socket:
+            return f'unix://{self._unix_socket}'
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def serve_forever(self):
+        """
+        在当前线程内处理请求，直到调用close()。
+        """
+        print(f'推理服务已启动：{self.url}')
+        self._server.serve_forever()
+
+    def start(self) -> 'InferenceServer':
+        """
+        在后台线程内处理请求。
+
+        returns:
+            InferenceServer: 当前实例。
+        """
+        if self._serve_thread is None:
+            self._serve_thread = threading.Thread(target=self._server.serve_forever, name='InferenceServer',
+                                                  daemon=True)
+            self._serve_thread.start()
+        return self
+
+    def close(self):
+        """
+        停止服务，关闭批处理线程与DOMInspector的OCR工作进程池。
+        """
+        if self._serve_thread is not None:
+            self._server.shutdown()
+            self._serve_thread.join()
+            self._serve_thread = None
+        self._server.server_close()
+        self._requests.put(None)
+        self._batch_thread.join()
+        self._inspector.close()
+        if self._unix_socket and os.path.exists(self._unix_socket):
+            os.remove(self._unix_socket)
+
+    def submit(self, image: bytes | np.ndarray, lang: str = DOMInspector.DEFAULT_LANG, use_ocr: bool = True,
+               query: dict = None, detect_size: int = None, frame_size: tuple[int, int] = None) -> Future:
+        """
+        提交一张截图，截图在提交时解码，推理由批处理线程执行。
+
+        Args:
+            image (bytes | np.ndarray): 图像字节数据，或是已解码的BGR图像数组。
+            lang (str, optional): OCR识别使用的语言。默认为'ch'。
+            use_ocr (bool, optional): 是否执行OCR识别。默认为True。
+            query (dict, optional): DOMQuery.to_dict返回的查询条件。默认为None。
+            detect_size (int, optional): YOLO的推理分辨率。默认为None使用模型的默认尺寸。
+            frame_size (tuple[int, int], optional): 截图是从该尺寸 (宽, 高) 的整帧截图中裁剪的区域时传入，
+                按整帧检测的缩放比例推理。默认为None。
+
+        returns:
+            Future: 结果为元素字典列表。
+        """
+        image_cv = self._inspector.decode(image)
+        query_key = json.dumps(query, sort_keys=True) if query else None
+        future = Future()
+        self._requests.put((future, image_cv, (lang, bool(use_ocr), query_key, detect_size, frame_size),
+                            time.perf_counter()))
+        return future
+
+    @property
+    def health(self) -> dict:
+        """
+        returns:
+            dict: 服务状态、模型路径、运行时长与排队的请求数量。
+        """
+        return {'status': 'ok', 'model': self._yolo_model, 'pid': os.getpid(),
+                'uptime_seconds': round(time.perf_counter() - self._started_at, 3),
+                'queue_depth': self._requests.qsize()}
+
+    @property
+    def stats(self) -> dict:
+        """
+        returns:
+            dict: 请求与批次的统计。
+                - requests / errors：处理的请求数量与失败数量。
+                - batches / mean_batch_size / max_batch_size：批次数量与批次大小。
+                - latency_ms：从提交到返回结果的延迟分位数(最近LATENCY_WINDOW个请求)。
+                - queue_wait_ms：请求在队列中等待进入批次的时间分位数。
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            latencies, queue_waits = list(self._latencies), list(self._queue_waits)
+        return {**counters,
+                'mean_batch_size': round(counters['requests'] / counters['batches'], 3) if counters['batches'] else 0.0,
+                'queue_depth': self._requests.qsize(),
+                'latency_ms': self._percentiles(latencies),
+                'queue_wait_ms': self._percentiles(queue_waits),
+                'uptime_seconds': round(time.perf_counter() - self._started_at, 3)}
+
+    @staticmethod
+    def _percentiles(values: list[float]) -> dict:
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+        return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3), 'p99': round(float(p99), 3),
+                'max': round(max(values) * 1000, 3)}
+
+    def _batch_loop(self):
+        """
+        批处理线程：取出第一个请求后在时间窗口内继续收集请求，凑满max_batch_size或超时后推理。
+        """
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            batch = [request]
+            deadline = time.perf_counter() + self._batch_window
+            stopped = False
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopped = True
+                    break
+                batch.append(request)
+            self._run_batch(batch)
+            if stopped:
+                break
+
+    def _run_batch(self, batch: list[tuple]):
+        started_at = time.perf_counter()
+        groups: dict[tuple, list[tuple]] = {}
+        for request in batch:
+            groups.setdefault(request[2], []).append(request)
+
+        errors = 0
+        for (lang, use_ocr, query_key, detect_size, frame_size), requests in groups.items():
+            try:
+                query = DOMQuery.from_dict(json.loads(query_key)) if query_key else None
+                dom_lists = self._inspector.inspect_batch([image_cv for _, image_cv, _, _ in requests], lang=lang,
+                                                          dom_search=query, use_ocr=use_ocr, detect_size=detect_size,
+                                                          frame_size=frame_size)
+                for (future, _, _, _), dom_list in zip(requests, dom_lists):
+                    future.set_result(dom_list)
+            except Exception as e:
+                errors += len(requests)
+                for future, _, _, _ in requests:
+                    future.set_exception(e)
+
+        finished_at = time.perf_counter()
+        with self._lock:
+            self._counters['requests'] += len(batch)
+            self._counters['errors'] += errors
+            self._counters['batches'] += 1
+            self._counters['max_batch_size'] = max(self._counters['max_batch_size'], len(batch))
+            for _, _, _, submitted_at in batch:
+                self._latencies.append(finished_at - submitted_at)
+                self._queue_waits.append(started_at - submitted_at)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path: str, timeout: float = None):
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class InferenceClient:
+    """
+    推理服务的客户端，每个线程持有一个长连接。一般不需要直接使用，通过 DOMInspector(server_url=...) 使用即可。
+
+    Args:
+        server_url (str): 推理服务地址，例如 http://127.0.0.1:8765 或 unix:///tmp/auto_flow_ai.sock。
+        timeout (float, optional): 请求超时时间，单位秒。默认为DEFAULT_TIMEOUT。
+
+    Example:
+        client = InferenceClient('http://127.0.0.1:8765')
+        dom_list = client.inspect(screenshot, query=DOMQuery(name='channel-link'))
+        print(client.stats())
+    """
+
+    DEFAULT_TIMEOUT = 120
+    NDARRAY_CONTENT_TYPE = 'application/x-ndarray'
+
+    def __init__(self, server_url: str, timeout: float = DEFAULT_TIMEOUT):
+        url = urlparse(server_url)
+        if url.scheme not in ('http', 'unix'):
+            raise ValueError(f'不支持的推理服务地址：{server_url}，请传入 http://地址:端口 或是 unix://套接字路径')
+        self._url = url
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def inspect(self, image: bytes | np.ndarray, lang: str = DOMInspector.DEFAULT_LANG, use_ocr: bool = True,
+                query: DOMQuery = None, detect_size: int = None, frame_size: tuple[int, int] = None) -> list[dict]:
+        """
+        请求推理服务识别一张截图。
+
+        Args:
+            image (bytes | np.ndarray): 图像字节数据，或是BGR格式的图像数组。
+            lang (str, optional): OCR识别使用的语言。默认为'ch'。
+            use_ocr (bool, optional): 是否执行OCR识别。默认为True。
+            query (DOMQuery, optional): 在服务端执行的查询条件，不能包含where函数。默认为None。
+            detect_size (int, optional): YOLO的推理分辨率。默认为None使用模型的默认尺寸。
+            frame_size (tuple[int, int], optional): 截图是从该尺寸 (宽, 高) 的整帧截图中裁剪的区域时传入，
+                服务端按整帧检测的缩放比例推理。默认为None。
+
+        returns:
+            list[dict]: 元素字典列表，与DOMInspector.inspect的返回值一致。
+        """
+        params = {'lang': lang, 'use_ocr': int(bool(use_ocr))}
+        if detect_size:
+            params['detect_size'] = int(detect_size)
+        if frame_size:
+            params['frame_size'] = ','.join(str(int(size)) for size in frame_size)
+        if query is not None:
+            params['query'] = json.dumps(query.to_dict(), ensure_ascii=False)
+        if isinstance(image, np.ndarray):
+            image = np.ascontiguousarray(image, dtype=np.uint8)
+            headers = {'Content-Type': self.NDARRAY_CONTENT_TYPE, 'X-Image-Shape': ','.join(map(str, image.shape))}
+            body = image.tobytes()
+        else:
+            headers = {'Content-Type': 'application/octet-stream'}
+            body = bytes(image)
+        return self._request('POST', f'/inspect?{urlencode(params)}', body=body, headers=headers)
+
+    def health(self) -> dict:
+        """
+        returns:
+            dict: 推理服务的状态。
+        """
+        return self._request('GET', '/health')
+
+    def stats(self) -> dict:
+        """
+        returns:
+            dict: 推理服务的请求、批次与延迟统计。
+        """
+        return self._request('GET', '/stats')
+
+    def close(self):
+        """
+        关闭当前线程的连接。
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if self._url.scheme == 'unix':
+                connection = _UnixHTTPConnection(self._url.path, timeout=self._timeout)
+            else:
+                connection = http.client.HTTPConnection(self._url.hostname, self._url.port, timeout=self._timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, route: str, body: bytes = None, headers: dict = None):
+        for retry in (True, False):
+            connection = self._connection()
+            try:
+                connection.request(method, route, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = json.loads(response.read().decode('utf-8'))
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                # 服务端关闭了空闲的长连接时重新连接一次
+                self.close()
+                if not retry:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f'推理服务返回错误({response.status})：{data.get("error")}')
+        return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AutoFlowAI本地推理服务')
+    parser.add_argument('--model', required=True, help='YOLO模型的路径')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=InferenceServer.DEFAULT_PORT)
+    parser.add_argument('--socket', default=None, help='Unix套接字路径，传入时不监听TCP端口')
+    parser.add_argument('--max-batch-size', type=int, default=InferenceServer.DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--batch-window', type=float, default=InferenceServer.DEFAULT_BATCH_WINDOW * 1000,
+                        help='批次等待时间，单位毫秒')
+    parser.add_argument('--ocr', default='paddleocr', choices=['paddleocr', 'easyocr'])
+    parser.add_argument('--num-processes', type=int, default=0, help='OCR工作进程数量，默认0在服务进程内识别')
+    parser.add_argument('--backend', default='ultralytics', choices=DOMInspector.DETECTOR_BACKENDS, help='YOLO的推理后端')
+    args = parser.parse_args()
+
+    server = InferenceServer(args.model, host=args.host, port=args.port, unix_socket=args.socket,
+                             max_batch_size=args.max_batch_size, batch_window=args.batch_window / 1000,
+                             ocr=args.ocr, num_processes=args.num_processes, detector_backend=args.backend)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,112 @@
 import math
 import os
-import random
+import time
 import typing
+import uuid
+from collections import Counter
 from datetime import datetime
 from os import path
-from playwright.sync_api import Locator, ElementHandle
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 import yaml
-from utils.browser_launcher import BrowserLauncher
+from utils.browser_launcher import Browser, BrowserLauncher
+from utils.browser_pool import BrowserPool
+from utils.dataset_writer import DatasetWriter
+from utils.duplicate_index import DEFAULT_DISTANCE, INDEX_NAME, DuplicateIndex
 from utils.project_path import ProjectPath
-import shutil
 
 REDIRECT_TIME = 10000
+DOM_STABLE_INTERVAL = 500
+
+# 一次page.evaluate取回所有元素的位置、可见性以及视口尺寸。
+# 初次调用传入selectors，匹配到的元素保存在window上，之后传入ids只刷新这些元素的位置，滚动时也按id定位元素。
+GEOMETRY_SCRIPT = """
+({selectors, ids}) => {
+    if (selectors) {
+        window.__labelGeneratorElements = [];
+        window.__labelGeneratorLabels = [];
+        selectors.forEach((selector, label) => {
+            let elements = [];
+            try {
+                elements = document.querySelectorAll(selector);
+            } catch (e) {}
+            for (const element of elements) {
+                window.__labelGeneratorElements.push(element);
+                window.__labelGeneratorLabels.push(label);
+            }
+        });
+        ids = window.__labelGeneratorElements.map((_, id) => id);
+    }
+    const store = window.__labelGeneratorElements || [];
+    const elements = [];
+    for (const id of ids) {
+        const element = store[id];
+        if (!element || !element.isConnected) continue;
+        const rect = element.getBoundingClientRect();
+        const style = window.getComputedStyle(element);
+        elements.push({
+            id: id,
+            label: window.__labelGeneratorLabels[id],
+            x: rect.x,
+            y: rect.y,
+            width: rect.width,
+            height: rect.height,
+            visible: rect.width > 0 && rect.height > 0 && style.visibility === 'visible'
+        });
+    }
+    return {
+        viewport: {width: window.innerWidth, height: window.innerHeight},
+        scroll: {x: window.scrollX, y: window.scrollY, height: document.documentElement.scrollHeight},
+        elements: elements
+    };
+}
+"""
+SCROLL_SCRIPT = """
+id => window.__labelGeneratorElements[id].scrollIntoView({block: 'center', inline: 'center'})
+"""
+SCROLL_TO_SCRIPT = """
+offset => window.scrollTo(window.scrollX, offset)
+"""
+
+SCROLL_STRATEGIES = ('plan', 'element')
+# 按计划滚动后页面布局可能发生变化(懒加载、吸顶元素等)，未被覆盖的元素最多重新规划的次数
+MAX_PLAN_ROUNDS = 3
+
+
+def plan_scroll_offsets(geometry: dict, element_ids: typing.Iterable[int] = None) -> list[int]:
+    """
+    计算能覆盖所有元素的最少滚动位置，每个滚动位置的视口都能完整容纳分配给它的元素。
+
+    元素完整处于视口内的滚动位置是区间 [top + height - viewport_height, top]，问题等价于用最少的点刺穿所有区间：
+    按区间右端点排序，贪心地取右端点作为滚动位置，并跳过所有被它刺穿的区间。
+    高度超过视口或横向处于视口外的元素无法完整截图，不参与规划。
+
+    :param geometry: LabelGenerator._element_geometry返回的结果。
+    :param element_ids: 只规划这些元素，默认规划所有可见元素。
+    :return: 从上到下排列的纵向滚动位置(像素)。
+    """
+    viewport_width = geometry['viewport']['width']
+    viewport_height = geometry['viewport']['height']
+    scroll_y = geometry['scroll']['y']
+    max_offset = max(geometry['scroll']['height'] - viewport_height, 0)
+    element_ids = None if element_ids is None else set(element_ids)
+
+    intervals = []
+    for element in geometry['elements']:
+        if not element['visible'] or (element_ids is not None and element['id'] not in element_ids):
+            continue
+        if element['x'] < 0 or element['x'] + element['width'] > viewport_width:
+            continue
+        top = element['y'] + scroll_y
+        start = max(math.ceil(top + element['height'] - viewport_height), 0)
+        end = min(math.floor(top), max_offset)
+        if start <= end:
+            intervals.append((start, end))
+
+    offsets = []
+    for start, end in sorted(intervals, key=lambda interval: interval[1]):
+        if not offsets or start > offsets[-1]:
+            offsets.append(end)
+    return offsets
 
 
 class LabelGenerator:
@@ -19,15 +115,33 @@ class LabelGenerator:
     """
 
     def __init__(self, url, before_start: typing.Callable = None, sources_dir_name: str or bool = None,
-                 datasets_classify: bool = True):
+                 datasets_classify: bool = True, num_workers: int = 1, headless: bool = True,
+                 scroll_strategy: str = 'plan', shard_size: int = 0, dedup_distance: int or None = DEFAULT_DISTANCE,
+                 dedup_keep: int = 0, dedup_index_path: str = None, config_path: str = None):
         """
         初始化LabelGenerator对象。
 
         :param url: 要访问的初始URL。
         :param before_start: 在开始之前要执行的回调函数，可选填。
         :param sources_dir_name: 数据存储目录的名称，仅传入文件夹名称，不是绝对路径！不是绝对路径！不是绝对路径！。可选填，默认当前的时间，例如：2023_08_20_04_44_33
-        :param datasets_classify: 是否自动分类训练集与验证集，默认开启。
+            目录中已有manifest.jsonl时，会跳过已经收集完毕的pages，从中断的位置继续收集。
+        :param datasets_classify: 是否自动分类训练集与验证集，默认开启。样本在截图时按文件名的哈希值直接写入所属的集合。
+        :param num_workers: 并行收集的浏览器数量，默认1在初始页面上逐个收集。大于1时使用BrowserPool把pages分配给多个浏览器上下文，
+            各个浏览器继承before_start执行后的登录状态(storage_state)。
+        :param headless: num_workers大于1时，工作浏览器是否以无头模式启动，默认True。
+        :param scroll_strategy: 滚动截图的策略，默认'plan'：根据所有元素的位置规划最少的滚动位置，每个位置截图一次；
+            'element'：逐个把视口外的元素滚动到视口内截图，截图数量多且相邻截图重复度高。
+        :param shard_size: 大于0时把截图与标签打包进tar分片，每个分片最多shard_size个样本，详见DatasetWriter。默认0不打包。
+        :param dedup_distance: 近似重复判断的dHash汉明距离，标签签名相同且距离不超过该值的截图在写入前被丢弃，详见DuplicateIndex。
+            默认6，传入None关闭去重。
+        :param dedup_keep: 每个近似重复组最多额外保留的样本数量，默认0只保留第一个。
+        :param dedup_index_path: 去重索引文件路径，默认保存在数据集目录下的duplicate_index.jsonl，只在本数据集内去重，中断后继续收集时沿用。
+            需要跨数据集去重时，让多个数据集传入同一个路径，例如datasets/duplicate_index.jsonl。
+        :param config_path: selectors与pages的配置文件路径，默认config/label_generator.yaml。
         """
+        if scroll_strategy not in SCROLL_STRATEGIES:
+            raise ValueError(f'不支持的滚动策略：{scroll_strategy}，可选值：{SCROLL_STRATEGIES}')
+        self._scroll_strategy = scroll_strategy
         browser_launcher = BrowserLauncher()
         self.__page = browser_launcher.page
         self.__page.goto(url)
@@ -40,155 +154,294 @@ class LabelGenerator:
         self._parent_path = path.join(ProjectPath.datasets_path,
                                       sources_dir_name if sources_dir_name else datetime.now().strftime(
                                           '%Y_%m_%d_%H_%M_%S'))
-        self._image_path = path.join(self._parent_path, "images")
-        self._label_path = path.join(self._parent_path, "labels")
         if not path.exists(ProjectPath.datasets_path): os.mkdir(ProjectPath.datasets_path)
         if not path.exists(self._parent_path): os.mkdir(self._parent_path)
-        if not path.exists(self._image_path): os.mkdir(self._image_path)
-        if not path.exists(self._label_path): os.mkdir(self._label_path)
-        if not path.exists(path.join(self._image_path, 'train')): os.mkdir(path.join(self._image_path, 'train'))
-        if not path.exists(path.join(self._label_path, 'train')): os.mkdir(path.join(self._label_path, 'train'))
-        if not path.exists(path.join(self._image_path, 'val')): os.mkdir(path.join(self._image_path, 'val'))
-        if not path.exists(path.join(self._label_path, 'val')): os.mkdir(path.join(self._label_path, 'val'))
 
-        config_path = path.join(ProjectPath.config_path, 'label_generator.yaml')
+        config_path = config_path or path.join(ProjectPath.config_path, 'label_generator.yaml')
 
         with open(config_path, 'r', encoding='utf-8') as f:
             config_data: dict = yaml.safe_load(f)
             f.close()
         self._selectors_list = config_data.get('selectors', None)
-        if not self._selectors_list: raise KeyError('label_generator.yaml 中没有找到selectors')
+        if not self._selectors_list: raise KeyError(f'{config_path} 中没有找到selectors')
         self._selectors = self._selectors_list if isinstance(self._selectors_list[0], str) else [item.get('class') for
                                                                                                  item in
                                                                                                  self._selectors_list]
         self._names = self._selectors_list if isinstance(self._selectors_list[0], str) else [item.get('name') for item
                                                                                              in self._selectors_list]
         urls = config_data.get('pages', None)
-        if not urls: raise KeyError('label_generator.yaml 中没有找到pages')
+        if not urls: raise KeyError(f'{config_path} 中没有找到pages')
 
         with open(path.join(self._parent_path, 'class.txt'), 'w', encoding='utf-8') as fw:
             fw.write('\n'.join(self._selectors))
             fw.close()
 
-        self._filelist = []
+        self._writer = DatasetWriter(self._parent_path, classify=datasets_classify, shard_size=shard_size)
+        self._dedup = None if dedup_distance is None else DuplicateIndex(
+            dedup_index_path or path.join(self._parent_path, INDEX_NAME), max_distance=dedup_distance,
+            keep=dedup_keep, dataset=path.basename(self._parent_path))
+        # 同一个URL可以出现多次，按出现的次序区分每一次访问
+        occurrences = Counter()
+        visits = []
+        for url in urls:
+            visits.append((url, occurrences[url]))
+            occurrences[url] += 1
+        completed_visits = self._writer.completed_visits
+        if completed_visits:
+            print(f'跳过已收集完毕的 {len([visit for visit in visits if visit in completed_visits])} 个页面')
+        visits = [visit for visit in visits if visit not in completed_visits]
 
         print('开始寻找DOM元素')
         print()
 
-        for url in urls:
-            self.__page.goto(url)
-            self.__page.wait_for_timeout(REDIRECT_TIME)
+        if num_workers > 1 and len(visits) > 1:
+            storage_state = browser_launcher.browser.storage_state()
+            with BrowserPool(size=min(num_workers, len(visits)), headless=headless,
+                             storage_state=storage_state) as pool:
+                futures = [(url, pool.submit(self._crawl_flow, url, visit)) for url, visit in visits]
+                for url, future in futures:
+                    if future.exception():
+                        print(url, '搜寻失败：', repr(future.exception()))
+                        print()
+        else:
+            for url, visit in visits:
+                self._crawl_page(self.__page, url, visit)
+
+        self._writer.close()
+        if self._dedup:
+            print(self._dedup.summary())
+            print()
+
+        dataset_yaml = {
+            "path": self._parent_path,
+            "train": "images/train",
+            "val": "images/val",
+            "nc": len(self._selectors),
+            "names": self._names
+        }
+        if shard_size:
+            # 样本打包在tar分片中，训练前需要把分片解包到 images/<划分>、labels/<划分>
+            dataset_yaml["shards"] = self._writer.shards
+        with open(path.join(ProjectPath.yamls_path, f'{sources_dir_name}.yaml'), 'w') as yw:
+            yaml.dump(dataset_yaml, yw)
+            yw.close()
 
-            visible, hidden = self._element_visibility_classify(selector_strs=self._selectors)
+    def _crawl_flow(self, browser: Browser, url: str, visit: int = 0):
+        """
+        BrowserPool的流程函数，在工作浏览器的页面上收集一个URL。
+        """
+        self._crawl_page(browser.page, url, visit)
+
+    def _crawl_page(self, page: Page, url: str, visit: int = 0):
+        """
+        打开URL，等待页面加载完成后收集元素，并把截图与标签写入数据集。
+
+        :param page: 执行收集的页面。
+        :param url: 需要收集的URL。
+        :param visit: 该URL在pages中第几次出现，默认0。
+        """
+        page.goto(url)
+        self._wait_for_page_ready(page)
+
+        if self._scroll_strategy == 'plan':
+            self._capture_by_plan(page, url, visit)
+        else:
+            self._capture_by_element(page, url, visit)
+        self._writer.finish_url(url, visit)
+        if self._dedup:
+            self._dedup.commit(url, visit)
+
+        print(url, '搜寻完毕')
+        print()
 
-            # 首先搜一遍初始的位置，然后把hidden(当前处于可视窗口外)中还没有进行捕获的元素逐一地进行滚动到可视窗口内进行捕获，然后更新hidden直到hidden为空。
-            while True:
-                data_name = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}__{int(random.random() * 10000000)}"
-                yolo_datas = [f'{index} {self._element_position_for_yolo(selector)}' for index, selector in visible]
-                # 爬B站首页时出现空yolo_datas陷入死循环的情况，优化这类场景
-                if not yolo_datas:
-                    print(url, '搜寻完毕')
-                    print()
-                    break
+    def _capture_by_plan(self, page: Page, url: str = None, visit: int = 0) -> int:
+        """
+        根据plan_scroll_offsets规划的滚动位置逐个截图，每张截图标注所有完整处于视口内的元素。
 
-                with open(path.join(self._label_path, f'{data_name}.txt'), 'w') as fw:
-                    yolo_datas = '\n'.join(yolo_datas)
-                    self.__page.screenshot(path=path.join(self._image_path, f'{data_name}.png'))
-                    self._filelist.append(data_name)
-                    fw.write(yolo_datas)
-                    fw.close()
+        :param page: 执行收集的页面。
+        :param url: 样本所属的URL。
+        :param visit: 该URL在pages中第几次出现。
+        :return: 保存的截图数量。
+        """
+        geometry = self._element_geometry(page, selector_strs=self._selectors)
+        all_ids = [element['id'] for element in geometry['elements']]
+        pending = set(all_ids)
+        saved = 0
+
+        for _ in range(MAX_PLAN_ROUNDS):
+            offsets = plan_scroll_offsets(geometry, element_ids=pending)
+            if not offsets:
+                break
+            for offset in offsets:
+                page.evaluate(SCROLL_TO_SCRIPT, offset)
+                geometry = self._element_geometry(page, element_ids=all_ids)
+                visible, _ = self._element_visibility_classify(geometry)
+                saved += self._write_frame(page, visible, geometry, url, visit)
+                pending -= {element['id'] for _, element in visible}
+            if not pending:
+                break
+        return saved
+
+    def _capture_by_element(self, page: Page, url: str = None, visit: int = 0) -> int:
+        """
+        逐个把视口外的元素滚动到视口内截图，每次滚动后重新分类剩余的视口外元素。
 
-                print(data_name, '已写入')
-                print()
+        :param page: 执行收集的页面。
+        :param url: 样本所属的URL。
+        :param visit: 该URL在pages中第几次出现。
+        :return: 保存的截图数量。
+        """
+        geometry = self._element_geometry(page, selector_strs=self._selectors)
+        visible, hidden = self._element_visibility_classify(geometry)
+        saved = 0
+
+        # 首先搜一遍初始的位置，然后把hidden(当前处于可视窗口外)中还没有进行捕获的元素逐一地进行滚动到可视窗口内进行捕获，然后更新hidden直到hidden为空。
+        while True:
+            # 爬B站首页时出现空yolo_datas陷入死循环的情况，优化这类场景
+            if not self._write_frame(page, visible, geometry, url, visit):
+                break
+            saved += 1
+            if not hidden:
+                break
+            page.evaluate(SCROLL_SCRIPT, hidden[0][1]['id'])
+
+            geometry = self._element_geometry(page, element_ids=[element['id'] for _, element in hidden])
+            visible, hidden = self._element_visibility_classify(geometry)
+        return saved
+
+    def _write_frame(self, page: Page, visible: list[tuple[int, dict]], geometry: dict, url: str = None,
+                     visit: int = 0) -> bool:
+        """
+        截图并把视口内元素的YOLO标签写入数据集。
+
+        :param page: 执行收集的页面。
+        :param visible: _element_visibility_classify返回的视口内元素。
+        :param geometry: _element_geometry的返回值，使用其中的视口尺寸与滚动位置。
+        :param url: 样本所属的URL。
+        :param visit: 该URL在pages中第几次出现。
+        :return: 没有视口内元素时不写入，返回False。与已有样本近似重复而被丢弃时仍返回True。
+        """
+        viewport = geometry['viewport']
+        yolo_datas = [f'{index} {self._element_position_for_yolo(element, viewport)}' for index, element in visible]
+        if not yolo_datas:
+            return False
+
+        data_name = self._data_name()
+        image, labels = page.screenshot(), '\n'.join(yolo_datas)
+        if self._dedup and self._dedup.is_duplicate(image, labels, url, data_name, visit):
+            print(data_name, '近似重复，已丢弃')
+            print()
+            return True
+        # 文件名包含随机的uuid，按URL与滚动位置划分，重复收集同一页面的同一位置时划分一致
+        split_key = f'{url}@{round(geometry["scroll"]["x"])},{round(geometry["scroll"]["y"])}'
+        self._writer.write(data_name, image, labels, url, split_key=split_key, visit=visit)
+
+        print(data_name, '已写入')
+        print()
+        return True
 
-                if not hidden:
-                    print(url, '搜寻完毕')
-                    print()
-                    break
-                hidden[0][1].scroll_into_view_if_needed()
+    @staticmethod
+    def _data_name() -> str:
+        """
+        生成截图与标签的文件名，时间前缀便于排序，uuid保证多个浏览器同时写入时不会重名。
+        """
+        return f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}__{uuid.uuid4().hex}"
 
-                visible, hidden = self._element_visibility_classify(selector_strs=hidden)
+    @staticmethod
+    def _wait_for_page_ready(page: Page, timeout: float = REDIRECT_TIME):
+        """
+        依次等待页面的load事件、网络空闲与DOM稳定(元素数量在两次检查之间不再变化)，
+        页面就绪后立即返回，REDIRECT_TIME只作为等待时间的上限。
 
-        if datasets_classify: self._datasets_classify()
+        :param page: 需要等待的页面。
+        :param timeout: 等待时间的上限，单位毫秒，默认REDIRECT_TIME。
+        """
+        deadline = time.perf_counter() + timeout / 1000
+
+        def remaining() -> float:
+            return max((deadline - time.perf_counter()) * 1000, 0)
+
+        for state in ('load', 'networkidle'):
+            # playwright中timeout为0表示不限时，剩余时间为0时直接返回
+            if not remaining():
+                return
+            try:
+                page.wait_for_load_state(state, timeout=remaining())
+            except PlaywrightTimeoutError:
+                return
+
+        previous = None
+        while remaining():
+            count = page.evaluate('document.getElementsByTagName("*").length')
+            if count == previous:
+                return
+            previous = count
+            page.wait_for_timeout(min(DOM_STABLE_INTERVAL, remaining()))
+
+    def _element_geometry(self, page: Page, selector_strs: list[str] = None, element_ids: list[int] = None) -> dict:
+        """
+        通过一次page.evaluate获取元素的位置、可见性与视口尺寸，避免逐个元素调用bounding_box、is_visible产生大量通信。
 
-        with open(path.join(ProjectPath.yamls_path, f'{sources_dir_name}.yaml'), 'w') as yw:
-            yaml.dump({
-                "path": self._parent_path,
-                "train": "images/train",
-                "val": "images/val",
-                "nc": len(self._selectors),
-                "names": self._names
-            }, yw)
-            yw.close()
+        :param page: 元素所在的页面。
+        :param selector_strs: 配置中的选择器列表，初次调用时传入，匹配到的元素会按顺序分配id。
+        :param element_ids: 之前匹配到的元素id，只刷新这些元素的位置，通常是滚动后的hidden元素。
+        :return: {"viewport": {"width", "height"}, "elements": [{"id", "label", "x", "y", "width", "height", "visible"}]}
+        """
+        selectors = [self._convert_selector(selector_str) for selector_str in selector_strs] if selector_strs else None
+        return page.evaluate(GEOMETRY_SCRIPT, {'selectors': selectors, 'ids': element_ids or []})
 
-    def _visible_check(self, element: Locator or ElementHandle) -> bool:
+    @staticmethod
+    def _visible_check(element: dict, viewport: dict) -> bool:
         """
         检查给定的DOM元素是否在视口内可见，避免截图时目标Dom处于窗口外，但是却处于已加载的Dom树内。
 
-        :param element: 要检查的DOM元素。
+        :param element: _element_geometry返回的元素位置。
+        :param viewport: 视口尺寸。
         :return: 如果元素在视口内可见，则为True，否则为False。
         """
-        rect = element.bounding_box()
-        viewport_width = self.__page.viewport_size['width']
-        viewport_height = self.__page.viewport_size['height']
-        return (0 <= rect['x'] < viewport_width and
-                0 <= rect['y'] < viewport_height and
-                0 <= rect['x'] + rect['width'] <= viewport_width and
-                0 <= rect['y'] + rect['height'] <= viewport_height and
-                element.is_visible())
-
-    def _element_visibility_classify(self, selector_strs: list[str or Locator or ElementHandle]) -> tuple[
-        list[Locator or ElementHandle], list[Locator or ElementHandle]]:
+        viewport_width = viewport['width']
+        viewport_height = viewport['height']
+        return (0 <= element['x'] < viewport_width and
+                0 <= element['y'] < viewport_height and
+                0 <= element['x'] + element['width'] <= viewport_width and
+                0 <= element['y'] + element['height'] <= viewport_height)
+
+    def _element_visibility_classify(self, geometry: dict) -> tuple[list[tuple[int, dict]], list[tuple[int, dict]]]:
         """
-        根据元素在窗口内的可见性，将DOM元素分类为窗口内可见、窗口内不可见或隐藏。
+        根据元素在窗口内的可见性，将DOM元素分类为窗口内可见与窗口外，不可见(尺寸为0或visibility为hidden)的元素无法截图，直接跳过。
 
-        :param selector_strs: 要分类的选择器列表。
-        :return: 包含可见和隐藏元素的元组。
+        :param geometry: _element_geometry返回的结果。
+        :return: 包含可见和窗口外元素的元组，元素格式为 (label索引, 元素位置)。
         """
         visible = []
         hidden = []
-
-        for index, selector_str in enumerate(selector_strs):
-            # 判断是否是初次调用，初次调用时selector_str的是字符串。
-            if isinstance(selector_str, str):
-                selector_str = self._convert_selector(selector_str)
-                selectors = self.__page.query_selector_all(selector_str)
-                # 优化处理，确保selectors是可迭代对象
-                selectors = [] if not selectors else selectors
+        for element in geometry['elements']:
+            if not element['visible']:
+                continue
+            result = (element['label'], element)
+            if self._visible_check(element, geometry['viewport']):
+                visible.append(result)
             else:
-                # 优化处理，当不是初次调用时传入的格式时 (label索引, 元素对象)。如果不用数组包裹后续遍历会遍历元组导致_, selector = result分解失败
-                selectors = [selector_str]
-
-            for selector in selectors:
-                # 如果是初次调用，把label索引和元素对象用元组绑定
-                result = selector if not isinstance(selector_str, str) else (index, selector)
-                _, selector = result
-                try:
-                    if self._visible_check(selector):
-                        visible.append(result)
-                    elif not self._visible_check(selector):
-                        hidden.append(result)
-                except TypeError:
-                    pass
-
+                hidden.append(result)
         return visible, hidden
 
-    def _element_position_for_yolo(self, element: Locator or ElementHandle) -> str:
+    @staticmethod
+    def _element_position_for_yolo(element: dict, viewport: dict) -> str:
         """
-        将DOM元素的位置和尺寸转换为YOLO格式的标签，当元素处于窗口外时，滚动事件在这里被触发。
+        将DOM元素的位置和尺寸转换为YOLO格式的标签。
 
-        :param element: 要转换的DOM元素。
+        :param element: _element_geometry返回的元素位置。
+        :param viewport: 视口尺寸。
         :return: YOLO格式的标签字符串。
         """
-        rect = element.bounding_box()
-        viewport_width = self.__page.viewport_size['width']
-        viewport_height = self.__page.viewport_size['height']
+        viewport_width = viewport['width']
+        viewport_height = viewport['height']
 
-        center_x = (rect['x'] + rect['width'] / 2) / viewport_width
-        center_y = (rect['y'] + rect['height'] / 2) / viewport_height
+        center_x = (element['x'] + element['width'] / 2) / viewport_width
+        center_y = (element['y'] + element['height'] / 2) / viewport_height
 
-        width = rect['width'] / viewport_width
-        height = rect['height'] / viewport_height
+        width = element['width'] / viewport_width
+        height = element['height'] / viewport_height
 
         return f"{center_x:.6f} {center_y:.6f} {width:.6f} {height:.6f}"
 
@@ -203,26 +456,6 @@ class LabelGenerator:
         selector_str = f'.{selector_str}' if '.' not in selector_str and '#' not in selector_str else selector_str
         return selector_str
 
-    def _datasets_classify(self):
-        val_count = math.floor(len(self._filelist) / 15)
-        val_list = random.choices(self._filelist, k=val_count)
-        train_list = [filename for filename in self._filelist if filename not in val_list]
-        for filename in val_list:
-            image_path = path.join(self._image_path, f'{filename}.png')
-            new_path = path.join(self._image_path, f'val/{filename}.png')
-            shutil.move(image_path, new_path)
-            label_path = path.join(self._label_path, f'{filename}.txt')
-            new_path = path.join(self._label_path, f'val/{filename}.txt')
-            shutil.move(label_path, new_path)
-
-        for filename in train_list:
-            image_path = path.join(self._image_path, f'{filename}.png')
-            new_path = path.join(self._image_path, f'train/{filename}.png')
-            shutil.move(image_path, new_path)
-            label_path = path.join(self._label_path, f'{filename}.txt')
-            new_path = path.join(self._label_path, f'train/{filename}.txt')
-            shutil.move(label_path, new_path)
-
 
 if __name__ == '__main__':
     # with open(path.join(ProjectPath.config_path, 'bilibili_info.yaml'), 'r') as rf:
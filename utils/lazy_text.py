@@ -0,0 +1,114 @@
+import threading
+import typing
+import numpy as np
+
+
+class LazyTextResolver:
+    """
+    持有一次检测的截图，在元素的text第一次被读取时才执行OCR识别，识别结果缓存在元素上。
+
+    Args:
+        image_cv (np.ndarray): 解码后的BGR截图。
+        recognize (Callable): 识别函数，接收 (截图, 元素坐标列表)，返回与坐标一一对应的文本列表。
+
+    Notes:
+        - 同一个解析器下的元素全部识别完成后，解析器会释放截图。
+    """
+
+    def __init__(self, image_cv: np.ndarray, recognize: typing.Callable[[np.ndarray, list[dict]], list[list[str]]]):
+        self._image_cv = image_cv
+        self._recognize = recognize
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def item(self, dom_detail: dict) -> 'LazyDOMItem':
+        """
+        创建一个文本待识别的元素。
+
+        Args:
+            dom_detail (dict): YOLO返回的元素字典，已经包含text时直接使用。
+
+        returns:
+            LazyDOMItem: 文本懒加载的元素。
+        """
+        item = LazyDOMItem({key: dom_detail.get(key) for key in ('box', 'name', 'class', 'confidence')}, self)
+        if dom_detail.get('text') is not None:
+            dict.__setitem__(item, 'text', dom_detail.get('text'))
+        else:
+            self._pending += 1
+        return item
+
+    def resolve(self, items: list['LazyDOMItem']):
+        """
+        批量识别一组元素的文本，已识别过的元素会被跳过。
+
+        Args:
+            items (list[LazyDOMItem]): 需要识别文本的元素。
+        """
+        with self._lock:
+            items = [item for item in items if not item.resolved]
+            if not items:
+                return
+            texts = self._recognize(self._image_cv, [dict.get(item, 'box') for item in items])
+            for item, text in zip(items, texts):
+                dict.__setitem__(item, 'text', text)
+            self._pending -= len(items)
+            if self._pending <= 0:
+                self._image_cv = None
+
+
+class LazyDOMItem(dict):
+    """
+    text懒加载的DOM元素字典，第一次通过 item['text'] 或 item.get('text') 读取时触发OCR识别。
+
+    Notes:
+        - 遍历字典(keys、items、values)不会触发识别，未识别前字典中没有text键。
+    """
+
+    def __init__(self, dom_detail: dict, resolver: LazyTextResolver):
+        super().__init__(dom_detail)
+        self._resolver = resolver
+
+    def __getitem__(self, key):
+        if key == 'text':
+            self._load_text()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == 'text':
+            self._load_text()
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key == 'text' or super().__contains__(key)
+
+    @property
+    def resolved(self) -> bool:
+        """
+        returns:
+            bool: 文本是否已经识别。
+        """
+        return super().__contains__('text')
+
+    @property
+    def resolver(self) -> LazyTextResolver:
+        return self._resolver
+
+    def _load_text(self):
+        if not self.resolved:
+            self._resolver.resolve([self])
+
+
+def resolve_texts(items: list):
+    """
+    按所属的解析器分组，批量识别一组元素中尚未识别的文本，非懒加载的元素会被忽略。
+
+    Args:
+        items (list): DOM元素列表。
+    """
+    groups: dict[int, tuple[LazyTextResolver, list[LazyDOMItem]]] = {}
+    for item in items:
+        if isinstance(item, LazyDOMItem) and not item.resolved:
+            groups.setdefault(id(item.resolver), (item.resolver, []))[1].append(item)
+    for resolver, group in groups.values():
+        resolver.resolve(group)
@@ -0,0 +1,262 @@
+import threading
+from collections import OrderedDict
+from os import path
+import numpy as np
+from utils.project_path import ProjectPath
+from utils.tracing import tracer
+
+
+class ModelRegistry:
+    """
+    进程级的模型注册表，同一进程内的所有DOMInspector共享已加载的YOLO与OCR模型，只在首次使用时付出加载成本。
+
+    - YOLO模型以模型路径作为键，OCR模型以 (实际加载的OCR引擎, 语言) 作为键。
+    - PaddleOCR加载失败时回退到EasyOCR，并记住回退关系，之后请求PaddleOCR时直接返回EasyOCR，不再重复尝试。
+    - 模型加载完成后会执行一次预热推理，避免首次识别时的额外耗时落在业务步骤上。
+    - YOLO模型受内存预算约束，同时使用多个 .pt 文件超出预算时，按最近最少使用(LRU)的顺序淘汰。
+    - 内存预算只在首次创建时生效，之后通过 configure() 修改，再次传入不同的 memory_budget 会抛出ValueError。
+    - 通过 stats 获取加载、命中、未命中、淘汰次数。
+    - 模型在线程间共享，但ultralytics与OCR模型都不是线程安全的，推理时需要持有 lock(键) 返回的锁。
+    - 全局锁只用于查找与写入注册表，加载模型时只持有该模型的加载锁，加载一个模型不会阻塞其他线程获取已加载的模型。
+
+    Example:
+        registry = ModelRegistry()
+        model = registry.get_yolo(path.join(ProjectPath.root_path, 'bilibili_best.pt'))
+        ocr_type, ocr_model = registry.get_ocr('paddleocr', 'ch')
+        print(registry.stats)
+    """
+
+    DEFAULT_MEMORY_BUDGET = 2 * 1024 ** 3
+    WARMUP_IMAGE_SIZE = 640
+    # 按OCR类型索引的引擎名称：0为EasyOCR，1为PaddleOCR
+    OCR_ENGINES = ('easyocr', 'paddleocr')
+    _instance = None
+
+    def __new__(cls, memory_budget: int = None):
+        if cls._instance:
+            if memory_budget is not None and memory_budget != cls._instance._memory_budget:
+                raise ValueError(f'ModelRegistry已使用内存预算 {cls._instance._memory_budget} 创建，'
+                                 f'不能再修改为 {memory_budget}，请使用 ModelRegistry().configure(memory_budget) 修改')
+            return cls._instance
+        cls._instance = super().__new__(cls)
+        cls._instance._memory_budget = memory_budget or cls.DEFAULT_MEMORY_BUDGET
+        cls._instance._yolo_models = OrderedDict()
+        cls._instance._ocr_models = {}
+        cls._instance._ocr_fallbacks = {}
+        cls._instance._lock = threading.RLock()
+        cls._instance._model_locks = {}
+        cls._instance._loading_locks = {}
+        cls._instance._stats = {'loads': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+        return cls._instance
+
+    def configure(self, memory_budget: int = None) -> 'ModelRegistry':
+        """
+        修改内存预算，新的预算小于已占用的内存时立即按LRU顺序淘汰。
+
+        Args:
+            memory_budget (int, optional): YOLO模型的内存预算(字节)，默认None恢复为 DEFAULT_MEMORY_BUDGET。
+
+        Returns:
+            ModelRegistry: 注册表本身。
+        """
+        with self._lock:
+            self._memory_budget = memory_budget or self.DEFAULT_MEMORY_BUDGET
+            self._evict()
+        return self
+
+    def get_yolo(self, yolo_model: str, backend: str = 'ultralytics'):
+        """
+        获取YOLO模型，未加载时加载并预热，已加载时直接返回。
+
+        Args:
+            yolo_model (str): YOLO模型的路径。
+            backend (str, optional): 推理后端，可选 "ultralytics"、"onnxruntime"、"openvino"。默认为'ultralytics'。
+                使用 onnxruntime 或 openvino 时传入 .pt 模型会自动导出为ONNX。
+
+        Returns:
+            YOLO | ONNXDetector: 已加载的YOLO模型。
+        """
+        key = path.abspath(yolo_model) if path.exists(yolo_model) else yolo_model
+        key = key if backend == 'ultralytics' else (key, backend)
+        model = self._cached_yolo(key)
+        if model is not None:
+            return model
+        # 同一个模型只加载一次，加载期间其他线程获取已加载的模型不需要等待
+        with self._loading_lock(('yolo', key)):
+            model = self._cached_yolo(key, count_miss=True)
+            if model is not None:
+                return model
+            model = self._load_yolo(yolo_model, backend)
+            size = self._model_size(model, yolo_model)
+            with self._lock:
+                self._yolo_models[key] = (model, size)
+                self._evict()
+            return model
+
+    def get_ocr(self, ocr: str, lang: str) -> tuple[int, object]:
+        """
+        获取OCR模型，未加载时加载并预热，已加载时直接返回。
+
+        Args:
+            ocr (str): OCR引擎，可选 "paddleocr" 或是 "easyocr"。
+            lang (str): OCR识别使用的语言。
+
+        Returns:
+            tuple[int, object]: (OCR类型, OCR模型)，OCR类型为1时是PaddleOCR，为0时是EasyOCR，
+                回退时OCR类型与请求的引擎不同，可以通过 OCR_ENGINES[OCR类型] 获取实际使用的引擎。
+        """
+        if not ocr:
+            raise ValueError(f'不支持传入的ocr参数：{ocr}')
+        if ocr not in ['paddleocr', 'easyocr']:
+            raise ValueError(f'仅支持两种ocr模型，请传入 "paddleocr" 或是 "easyocr" ')
+
+        model = self._cached_ocr(ocr, lang)
+        if model is not None:
+            return model
+        with self._loading_lock(('ocr', ocr, lang)):
+            model = self._cached_ocr(ocr, lang, count_miss=True)
+            if model is not None:
+                return model
+            if ocr == 'paddleocr':
+                try:
+                    model = self._load_ocr(ocr, lang)
+                except Exception:
+                    print('PP飞桨OCR使用失败，将使用EasyOCR')
+                    with self._lock:
+                        self._ocr_fallbacks[(ocr, lang)] = ('easyocr', lang)
+                    return self.get_ocr('easyocr', lang)
+            else:
+                model = self._load_ocr(ocr, lang)
+            with self._lock:
+                self._ocr_models[(ocr, lang)] = model
+            return model
+
+    def lock(self, key: str or tuple) -> threading.Lock:
+        """
+        获取模型的推理锁，同一个模型在多个线程中推理时按顺序执行。
+
+        Args:
+            key (str or tuple): YOLO模型的路径，或是 (OCR引擎, 语言)。
+
+        Returns:
+            threading.Lock: 模型的推理锁。
+        """
+        if isinstance(key, str):
+            key = path.abspath(key) if path.exists(key) else key
+        with self._lock:
+            return self._model_locks.setdefault(key, threading.Lock())
+
+    def evict(self, yolo_model: str = None):
+        """
+        手动释放模型。
+
+        Args:
+            yolo_model (str, optional): 需要释放的YOLO模型路径，默认None释放全部模型。
+        """
+        with self._lock:
+            if yolo_model is None:
+                self._stats['evictions'] += len(self._yolo_models) + len(self._ocr_models)
+                self._yolo_models.clear()
+                self._ocr_models.clear()
+                return
+            key = path.abspath(yolo_model) if path.exists(yolo_model) else yolo_model
+            for model_key in [model_key for model_key in self._yolo_models
+                              if model_key == key or (isinstance(model_key, tuple) and model_key[0] == key)]:
+                self._yolo_models.pop(model_key)
+                self._stats['evictions'] += 1
+
+    @property
+    def stats(self) -> dict:
+        """
+        returns:
+            dict: 加载、命中、未命中、淘汰次数，以及YOLO模型占用的估算内存(字节)。
+        """
+        with self._lock:
+            return {**self._stats, 'memory_used': sum(size for _, size in self._yolo_models.values()),
+                    'memory_budget': self._memory_budget, 'yolo_models': list(self._yolo_models.keys()),
+                    'ocr_models': list(self._ocr_models.keys())}
+
+    def _cached_yolo(self, key: str or tuple, count_miss: bool = False):
+        """
+        返回已加载的YOLO模型，未加载时返回None，count_miss为True时计入未命中次数。
+        """
+        with self._lock:
+            if key in self._yolo_models:
+                self._stats['hits'] += 1
+                self._yolo_models.move_to_end(key)
+                return self._yolo_models[key][0]
+            if count_miss:
+                self._stats['misses'] += 1
+            return None
+
+    def _cached_ocr(self, ocr: str, lang: str, count_miss: bool = False) -> tuple[int, object] or None:
+        """
+        返回已加载的OCR模型(PaddleOCR回退时返回EasyOCR)，未加载时返回None，count_miss为True时计入未命中次数。
+        """
+        with self._lock:
+            key = self._ocr_fallbacks.get((ocr, lang), (ocr, lang))
+            if key in self._ocr_models:
+                self._stats['hits'] += 1
+                return self._ocr_models[key]
+            if count_miss:
+                self._stats['misses'] += 1
+            return None
+
+    def _loading_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._loading_locks.setdefault(key, threading.Lock())
+
+    def _evict(self):
+        """
+        超出内存预算时按LRU顺序淘汰YOLO模型，最近加载的模型始终保留。
+        """
+        while len(self._yolo_models) > 1 and \
+                sum(size for _, size in self._yolo_models.values()) > self._memory_budget:
+            self._yolo_models.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    @tracer.traced('model.load_yolo')
+    def _load_yolo(self, yolo_model: str, backend: str = 'ultralytics'):
+        warmup_image = np.zeros((self.WARMUP_IMAGE_SIZE, self.WARMUP_IMAGE_SIZE, 3), dtype=np.uint8)
+        if backend == 'ultralytics':
+            from ultralytics import YOLO
+            model = YOLO(yolo_model)
+            model(warmup_image, verbose=False)
+        else:
+            from utils.onnx_detector import ONNXDetector, export_onnx
+            model = ONNXDetector(export_onnx(yolo_model) if yolo_model.endswith('.pt') else yolo_model, backend=backend)
+            model(warmup_image)
+        # 加载失败时不计入加载次数
+        with self._lock:
+            self._stats['loads'] += 1
+        return model
+
+    @tracer.traced('model.load_ocr')
+    def _load_ocr(self, ocr: str, lang: str) -> tuple[int, object]:
+        model_path = path.join(ProjectPath.public_path, 'easyocr_model')
+        blank = np.full((48, 160, 3), 255, dtype=np.uint8)
+        if ocr == 'paddleocr':
+            from paddleocr import PaddleOCR
+            ocr_model = PaddleOCR(use_angle_cls=True, lang=lang, show_log=False)
+            ocr_model.ocr(blank, cls=False, det=False)
+            with self._lock:
+                self._stats['loads'] += 1
+            return 1, ocr_model
+        # 只在使用EasyOCR时导入，选择PaddleOCR时不需要付出easyocr(以及torch)的导入成本
+        from easyocr import Reader
+        ocr_model = Reader(['ch_sim', 'en'], model_storage_directory=model_path, download_enabled=False)
+        ocr_model.readtext(blank, detail=0)
+        with self._lock:
+            self._stats['loads'] += 1
+        return 0, ocr_model
+
+    @staticmethod
+    def _model_size(model, yolo_model: str) -> int:
+        """
+        估算YOLO模型占用的内存，优先统计参数与缓冲区的字节数，无法统计时使用模型文件大小。
+        """
+        try:
+            module = model.model
+            return sum(t.numel() * t.element_size() for t in list(module.parameters()) + list(module.buffers()))
+        except (AttributeError, TypeError):
+            return path.getsize(yolo_model) if path.exists(yolo_model) else 0
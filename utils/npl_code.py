@@ -1,19 +1,242 @@
-from transformers import AutoTokenizer, AutoModel
+import threading
+import typing
+from collections import OrderedDict
+
+DEFAULT_MODEL = 'THUDM/codegeex2-6b'
+DEFAULT_CACHE_SIZE = 128
+# 示例中使用greedy decoding，检查输出结果是否对齐。
+# 使用max_new_tokens而不是max_length：batch()左侧填充后，max_length会被填充占用，短提示词能生成的token变少
+DEFAULT_GENERATE_KWARGS = {'max_new_tokens': 256, 'top_k': 1}
+QUANTIZE_BITS = {'int8': 8, 'int4': 4}
 
 
 class NLP2Code:
+    """
+    基于CodeGeeX2把自然语言描述转换为代码。
+
+    - 模型在首次生成时才加载(也可以调用 load() 提前加载)，构造对象以及 import 本模块都不会导入 transformers、torch；
+    - 没有GPU时使用CPU推理，可以通过 quantize 使用int8/int4权重量化降低内存占用与延迟；
+    - stream() 以迭代器的方式逐段返回生成的代码，调用方不需要等待生成结束；
+    - 生成结果按 (提示词, 语言, 生效的生成参数) 缓存，重复的提示词直接返回缓存；
+    - batch() 把多个提示词合并到一次 generate 调用中，结果与逐个生成一致。
+
+    Args:
+        device (str, optional): 推理设备，默认None在有GPU时使用cuda，否则使用cpu。
+        model_path (str, optional): 模型名称或本地模型目录，只能以关键字传入，默认 THUDM/codegeex2-6b，测试时可以传入本地的小模型。
+        quantize (str, optional): 权重量化，可选 "int8"、"int4"，默认None不量化。
+            CPU下int8使用torch的动态量化(Linear层)，其余情况使用模型自带的quantize方法(CodeGeeX2/ChatGLM2提供)。
+        cache_size (int, optional): 缓存的生成结果数量，默认128，传入0关闭缓存。
+        **generate_kwargs: 默认的生成参数，会覆盖 DEFAULT_GENERATE_KWARGS。
+
+    Example:
+        nlp2code = NLP2Code(device='cpu', quantize='int8')
+        for text in nlp2code.stream('封装一个函数，读取yaml文件'):
+            print(text, end='', flush=True)
+    """
+
+    def __init__(self, device: str = None, *, model_path: str = DEFAULT_MODEL, quantize: str = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE, **generate_kwargs):
+        if quantize is not None and quantize not in QUANTIZE_BITS:
+            raise ValueError(f'不支持的量化方式：{quantize}，可选值：{tuple(QUANTIZE_BITS)}')
+        self._model_path = model_path
+        self._device = device
+        self._quantize = quantize
+        self._cache_size = cache_size
+        self._generate_kwargs = self._merge_kwargs(DEFAULT_GENERATE_KWARGS, generate_kwargs)
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+        # 模型推理不是线程安全的，多个线程同时生成时排队执行
+        self._generate_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __call__(self, message: str, language: str = 'Python', *args, **kwargs) -> str:
+        """
+        生成代码，返回提示词与生成的代码。
+
+        Args:
+            message (str): 自然语言描述。
+            language (str, optional): 代码语言，默认 Python。
+            **kwargs: 本次调用的生成参数，例如 max_new_tokens。
+
+        Returns:
+            str: 提示词与生成的代码。
+        """
+        return self.batch([message], language=language, **kwargs)[0]
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @staticmethod
+    def prompt(message: str, language: str = 'Python') -> str:
+        return f"# language: {language}\n# {message}\n"
+
+    def load(self) -> 'NLP2Code':
+        """
+        加载分词器与模型，已加载时直接返回。
+        """
+        if self._model is not None:
+            return self
+        with self._load_lock:
+            if self._model is not None:
+                return self
+            import torch
+            from transformers import AutoTokenizer, AutoModelForCausalLM
+
+            device = self._device or ('cuda' if torch.cuda.is_available() else 'cpu')
+            tokenizer = AutoTokenizer.from_pretrained(self._model_path, trust_remote_code=True)
+            # batch()需要左侧填充，生成的内容才能紧跟在各自的提示词之后
+            tokenizer.padding_side = 'left'
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            # CPU上大部分算子不支持float16，使用float32
+            model = AutoModelForCausalLM.from_pretrained(
+                self._model_path, trust_remote_code=True,
+                torch_dtype=torch.float32 if device == 'cpu' else torch.float16)
+            model = self._quantize_model(model, device) if self._quantize else model.to(device)
+            self._device = device
+            self._tokenizer = tokenizer
+            self._model = model.eval()
+        return self
+
+    def stream(self, message: str, language: str = 'Python', **kwargs) -> typing.Iterator[str]:
+        """
+        以迭代器的方式逐段返回生成的代码(不含提示词)，命中缓存时一次性返回缓存的结果。
+
+        Args:
+            message (str): 自然语言描述。
+            language (str, optional): 代码语言，默认 Python。
+            **kwargs: 本次调用的生成参数。
 
-    def __init__(self, device: str = 'cuda'):
-        self._tokenizer = AutoTokenizer.from_pretrained("THUDM/codegeex2-6b", trust_remote_code=True)
-        self._model = AutoModel.from_pretrained("THUDM/codegeex2-6b", trust_remote_code=True,
-                                                device=device)
-        self._model = self._model.eval()
+        Returns:
+            Iterator[str]: 生成的代码片段。
+        """
+        generate_kwargs = self._merge_kwargs(self._generate_kwargs, kwargs)
+        key = self._cache_key(message, language, generate_kwargs)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
 
-    def __call__(self, message: str, language: str = 'Python', *args, **kwargs):
-        prompt = f"# language: {language}\n# {message}\n"
-        inputs = self._tokenizer.encode(prompt, return_tensors="pt").to(self._model.device)
-        outputs = self._model.generate(inputs, max_length=256, top_k=1)  # 示例中使用greedy decoding，检查输出结果是否对齐
-        return self._tokenizer.decode(outputs[0])
+        from transformers import TextIteratorStreamer
+        self.load()
+        inputs = self._tokenizer([self.prompt(message, language)], return_tensors='pt').to(self._device)
+        streamer = TextIteratorStreamer(self._tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def generate():
+            try:
+                with self._generate_lock:
+                    self._model.generate(**inputs, streamer=streamer, **generate_kwargs)
+            except Exception as e:
+                errors.append(e)
+                # generate出错时streamer不会结束，手动结束迭代
+                streamer.end()
+
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        pieces = []
+        for text in streamer:
+            pieces.append(text)
+            yield text
+        thread.join()
+        if errors:
+            raise errors[0]
+        self._cache_set(key, ''.join(pieces))
+
+    def batch(self, messages: list[str], language: str = 'Python', **kwargs) -> list[str]:
+        """
+        把多个提示词合并到一次 generate 调用中，已缓存的提示词不参与生成。
+        生成参数中包含 max_length 时按提示词的token数量分组生成，避免左侧填充占用短提示词的生成长度。
+
+        Args:
+            messages (list[str]): 自然语言描述列表。
+            language (str, optional): 代码语言，默认 Python。
+            **kwargs: 本次调用的生成参数。
+
+        Returns:
+            list[str]: 与 messages 顺序一致的提示词与生成的代码。
+        """
+        generate_kwargs = self._merge_kwargs(self._generate_kwargs, kwargs)
+        keys = [self._cache_key(message, language, generate_kwargs) for message in messages]
+        completions = [self._cache_get(key) for key in keys]
+        # 同一批中重复的提示词只生成一次
+        missing = list(OrderedDict.fromkeys(message for message, completion in zip(messages, completions)
+                                             if completion is None))
+        if missing:
+            self.load()
+            groups = [missing]
+            if 'max_length' in generate_kwargs:
+                lengths = OrderedDict()
+                for message in missing:
+                    length = len(self._tokenizer(self.prompt(message, language))['input_ids'])
+                    lengths.setdefault(length, []).append(message)
+                groups = list(lengths.values())
+            results = {}
+            for group in groups:
+                results.update(zip(group, self._generate(group, language, generate_kwargs)))
+            for index, (message, key) in enumerate(zip(messages, keys)):
+                if completions[index] is None:
+                    completions[index] = results[message]
+                    self._cache_set(key, results[message])
+        return [self.prompt(message, language) + completion for message, completion in zip(messages, completions)]
+
+    def _generate(self, messages: list[str], language: str, generate_kwargs: dict) -> list[str]:
+        """
+        左侧填充后一次生成一组提示词，返回与 messages 顺序一致的生成代码(不含提示词)。
+        """
+        inputs = self._tokenizer([self.prompt(message, language) for message in messages], return_tensors='pt',
+                                 padding=True).to(self._device)
+        with self._generate_lock:
+            outputs = self._model.generate(**inputs, pad_token_id=self._tokenizer.pad_token_id, **generate_kwargs)
+        # 左侧填充后所有提示词的长度一致，截掉提示词部分即为生成的代码
+        return self._tokenizer.batch_decode(outputs[:, inputs['input_ids'].shape[1]:], skip_special_tokens=True)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _quantize_model(self, model, device: str):
+        import torch
+        bits = QUANTIZE_BITS[self._quantize]
+        if device == 'cpu' and bits == 8:
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if not hasattr(model, 'quantize'):
+            raise ValueError(f'{self._model_path} 没有提供quantize方法，{device}上不支持{self._quantize}量化')
+        # CodeGeeX2/ChatGLM2的quantize会把权重量化后放到对应的设备上
+        return model.quantize(bits).to(device)
+
+    @staticmethod
+    def _merge_kwargs(defaults: dict, kwargs: dict) -> dict:
+        """
+        合并生成参数，显式传入 max_length 时去掉默认的 max_new_tokens，否则 max_new_tokens 优先、max_length 不生效。
+        """
+        merged = {**defaults, **kwargs}
+        if 'max_length' in kwargs and 'max_new_tokens' not in kwargs:
+            merged.pop('max_new_tokens', None)
+        return merged
+
+    @staticmethod
+    def _cache_key(message: str, language: str, generate_kwargs: dict) -> tuple:
+        return message, language, tuple(sorted((key, repr(value)) for key, value in generate_kwargs.items()))
+
+    def _cache_get(self, key: tuple) -> str or None:
+        with self._cache_lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    def _cache_set(self, key: tuple, completion: str):
+        if not self._cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = completion
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
 
 # TODO: 目前的自然语言生成代码已实现，但是无法识别整个项目中一些特定的词汇，达不到想要的效果。例如：进入首页、点击登录按钮。
 # TODO: 有2个思路：
@@ -27,4 +250,3 @@ if __name__ == '__main__':
     result = nc('封装一个函数，用于检测文件是否有被修改，函数接收两个参数：上次最后修改时间、文件路径。返回一个元组 (是否修改的bool值, '
                 '新的最后修改时间)。如果传入的文件路径不存在直接抛出文件不存在的错误，注意错误提示要中文')
     print(result)
-
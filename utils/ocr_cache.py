@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from os import path
+import numpy as np
+from utils.project_path import ProjectPath
+
+
+class OCRCache:
+    """
+    以裁剪图片内容为键的OCR结果缓存，相同的导航栏、频道链接、搜索框只需要识别一次。
+
+    缓存键由裁剪图片像素的哈希值、OCR引擎与语言组成。缓存分为两级：
+    - 内存级：按最近最少使用(LRU)的顺序淘汰，最多保存 max_items 条。
+    - 磁盘级：可选，使用sqlite保存，跨进程、跨运行复用识别结果。
+
+    Args:
+        max_items (int, optional): 内存级缓存的最大条数。默认为DEFAULT_MAX_ITEMS。
+        disk_path (str | bool, optional): 磁盘级缓存的文件路径，传入True时使用 public/ocr_cache.sqlite3，默认None不使用磁盘缓存。
+
+    Example:
+        dom_inspector = DOMInspector(yolo_model=model_path, ocr_cache=OCRCache(disk_path=True))
+        result = dom_inspector(image=screenshot)
+        print(dom_inspector.ocr_cache.stats)
+    """
+
+    DEFAULT_MAX_ITEMS = 4096
+    DEFAULT_DISK_NAME = 'ocr_cache.sqlite3'
+
+    def __init__(self, max_items: int = DEFAULT_MAX_ITEMS, disk_path: str | bool = None):
+        self._max_items = max_items
+        self._memory: OrderedDict[str, list[str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._connection = None
+        if disk_path:
+            disk_path = path.join(ProjectPath.public_path, self.DEFAULT_DISK_NAME) if disk_path is True else disk_path
+            if not path.exists(path.dirname(disk_path)): os.makedirs(path.dirname(disk_path))
+            self._connection = sqlite3.connect(disk_path, check_same_thread=False)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS ocr_cache (key TEXT PRIMARY KEY, text TEXT NOT NULL)')
+            self._connection.commit()
+
+    @staticmethod
+    def key(crop: np.ndarray, ocr: str, lang: str) -> str:
+        """
+        计算裁剪图片的缓存键。
+
+        Args:
+            crop (np.ndarray): 裁剪图片。
+            ocr (str): 实际加载的OCR引擎，PaddleOCR回退到EasyOCR时传入easyocr。
+            lang (str): OCR识别使用的语言。
+
+        Returns:
+            str: 缓存键。
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f'{ocr}|{lang}|{crop.shape}|{crop.dtype.str}'.encode())
+        digest.update(np.ascontiguousarray(crop).data)
+        return digest.hexdigest()
+
+    def get_many(self, keys: list[str]) -> list[list[str] or None]:
+        """
+        批量读取缓存，依次查找内存级与磁盘级缓存，磁盘级命中的结果会写回内存级。
+
+        Args:
+            keys (list[str]): 缓存键列表。
+
+        Returns:
+            list[list[str] or None]: 与keys一一对应的识别结果，未命中为None。
+        """
+        results = []
+        with self._lock:
+            for key in keys:
+                text = self._memory.get(key)
+                if text is not None:
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                elif self._connection and (text := self._disk_get(key)) is not None:
+                    self._stats['disk_hits'] += 1
+                    self._memory_set(key, text)
+                else:
+                    self._stats['misses'] += 1
+                results.append(text)
+        return results
+
+    def set_many(self, items: dict[str, list[str]]):
+        """
+        批量写入缓存，磁盘级缓存在一次事务内提交。
+
+        Args:
+            items (dict[str, list[str]]): 缓存键与识别结果。
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, text in items.items():
+                self._memory_set(key, text)
+            if self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO ocr_cache (key, text) VALUES (?, ?)',
+                                             [(key, json.dumps(text, ensure_ascii=False)) for key, text in items.items()])
+                self._connection.commit()
+
+    def clear(self, disk: bool = False):
+        """
+        清空缓存。
+
+        Args:
+            disk (bool, optional): 是否同时清空磁盘级缓存。默认False。
+        """
+        with self._lock:
+            self._memory.clear()
+            if disk and self._connection:
+                self._connection.execute('DELETE FROM ocr_cache')
+                self._connection.commit()
+
+    def close(self):
+        """
+        关闭磁盘级缓存的连接。
+        """
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+    @property
+    def stats(self) -> dict:
+        """
+        returns:
+            dict: 内存级命中、磁盘级命中、未命中次数、命中率以及内存级缓存条数。
+        """
+        with self._lock:
+            total = self._stats['hits'] + self._stats['disk_hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] + self._stats['disk_hits']) / total if total else 0.0
+            return {**self._stats, 'hit_rate': round(hit_rate, 4), 'size': len(self._memory)}
+
+    def _memory_set(self, key: str, text: list[str]):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> list[str] or None:
+        row = self._connection.execute('SELECT text FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
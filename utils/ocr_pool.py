@@ -0,0 +1,187 @@
+import math
+import multiprocessing
+import queue
+import threading
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+from utils.ocr_recognizer import OCRRecognizer
+
+
+def _ocr_worker(ocr: str, lang: str, batch_size: int, task_queue, result_queue):
+    """
+    OCR工作进程，进程启动后加载一次OCR模型并常驻，之后只接收截图所在的共享内存名称与元素坐标。
+    启动完成时返回实际加载的OCR引擎(PaddleOCR加载失败时为easyocr)。
+    """
+    from utils.model_registry import ModelRegistry
+    try:
+        ocr_type, ocr_model = ModelRegistry().get_ocr(ocr, lang)
+        recognizer = OCRRecognizer(ocr_type, ocr_model, batch_size=batch_size)
+    except Exception as e:
+        result_queue.put(('error', None, repr(e)))
+        return
+    result_queue.put(('ready', None, ModelRegistry.OCR_ENGINES[ocr_type]))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, shm_name, shape, dtype, boxes = task
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            image = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            texts = recognizer.recognize_batch([image[y1: y2, x1: x2] for _, x1, y1, x2, y2 in boxes])
+            del image
+            shm.close()
+            result_queue.put(('result', task_id, [(box[0], text) for box, text in zip(boxes, texts)]))
+        except Exception as e:
+            result_queue.put(('error', task_id, repr(e)))
+
+
+def _shutdown(workers: list, tasks, results):
+    """
+    通知所有工作进程退出，超时未退出的进程将被强制结束。不引用OCRWorkerPool，可以在对象被回收时执行。
+    """
+    for worker in workers:
+        if worker.is_alive():
+            tasks.put(None)
+    for worker in workers:
+        worker.join(timeout=5)
+        if worker.is_alive():
+            worker.terminate()
+    tasks.close()
+    results.close()
+
+
+class OCRWorkerPool:
+    """
+    多进程OCR识别池，每个工作进程各自持有一个已加载的OCR模型。
+
+    每次识别时解码后的截图只写入一次共享内存(multiprocessing.shared_memory)，工作进程只接收元素坐标，
+    在共享内存上直接裁剪，不需要序列化裁剪后的图片。识别结果按传入的坐标顺序返回。
+
+    Args:
+        ocr (str, optional): OCR引擎，可选 "paddleocr" 或是 "easyocr"。默认为'paddleocr'。
+        lang (str, optional): OCR识别使用的语言。默认为'ch'。
+        num_processes (int, optional): 工作进程数量。默认为CPU核心数的一半。
+        batch_size (int, optional): 工作进程内批量识别的图片数量。默认为None，与OCRRecognizer的默认值一致。
+        timeout (float, optional): 等待工作进程启动与返回结果的超时时间，单位秒。默认为120。
+
+    Example:
+        with OCRWorkerPool(ocr='paddleocr', lang='ch', num_processes=4) as pool:
+            texts = pool.recognize(image_cv, [(0, 0, 100, 30), (120, 0, 260, 30)])
+    """
+
+    def __init__(self, ocr: str = 'paddleocr', lang: str = 'ch', num_processes: int = None,
+                 batch_size: int = None, timeout: float = 120):
+        context = multiprocessing.get_context('spawn')
+        self._num_processes = num_processes or max(multiprocessing.cpu_count() // 2, 1)
+        self._timeout = timeout
+        self._task_id = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._engine = None
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(target=_ocr_worker, args=(ocr, lang, batch_size, self._tasks, self._results), daemon=True)
+            for _ in range(self._num_processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+        # 对象被回收或解释器退出时关闭工作进程，finalize不持有对象本身，不会阻止回收
+        self._finalizer = weakref.finalize(self, _shutdown, self._workers, self._tasks, self._results)
+
+        for _ in self._workers:
+            status, _, message = self._get_result()
+            if status == 'error':
+                self.close()
+                raise RuntimeError(f'OCR工作进程启动失败：{message}')
+            self._engine = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def recognize(self, image: np.ndarray, boxes: list[tuple[int, int, int, int]]) -> list[list[str]]:
+        """
+        识别截图中指定坐标区域的文本。
+
+        Args:
+            image (np.ndarray): 解码后的BGR截图。
+            boxes (list[tuple[int, int, int, int]]): 元素坐标 (x1, y1, x2, y2) 列表。
+
+        Returns:
+            list[list[str]]: 与boxes一一对应的文本列表。
+        """
+        if self._closed:
+            raise RuntimeError('OCR工作进程池已关闭')
+        if not boxes:
+            return []
+
+        with self._lock:
+            shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+            try:
+                shared_image = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+                shared_image[:] = image
+                del shared_image
+
+                indexed_boxes = [(index, *box) for index, box in enumerate(boxes)]
+                chunk_size = -(-len(indexed_boxes) // self._num_processes)
+                task_ids = set()
+                for start in range(0, len(indexed_boxes), chunk_size):
+                    self._task_id += 1
+                    task_ids.add(self._task_id)
+                    self._tasks.put((self._task_id, shm.name, image.shape, image.dtype.str,
+                                     indexed_boxes[start: start + chunk_size]))
+
+                results = [[] for _ in boxes]
+                while task_ids:
+                    status, task_id, payload = self._get_result()
+                    if task_id is not None and task_id not in task_ids:
+                        # 之前超时或出错的调用迟到的结果，不属于本次识别
+                        continue
+                    if status == 'error':
+                        raise RuntimeError(f'OCR工作进程识别失败：{payload}')
+                    task_ids.discard(task_id)
+                    for index, text in payload:
+                        results[index] = text
+                return results
+            finally:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        """
+        通知所有工作进程退出，超时未退出的进程将被强制结束。
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer()
+
+    @property
+    def num_processes(self) -> int:
+        return self._num_processes
+
+    @property
+    def engine(self) -> str:
+        """
+        returns:
+            str: 工作进程实际加载的OCR引擎，PaddleOCR加载失败时为easyocr。
+        """
+        return self._engine
+
+    def _get_result(self) -> tuple:
+        """
+        等待工作进程返回结果，工作进程意外退出或等待超时时返回错误。
+        """
+        for _ in range(math.ceil(self._timeout)):
+            try:
+                return self._results.get(timeout=1)
+            except queue.Empty:
+                if any(worker.exitcode is not None for worker in self._workers):
+                    return 'error', None, 'OCR工作进程意外退出'
+        return 'error', None, f'等待超过 {self._timeout} 秒没有返回结果'
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+import cv2
+
+
+class OCRRecognizer:
+    """
+    对一组裁剪后的DOM元素图片执行文本识别，支持逐个识别与批量识别两种方式。
+
+    批量识别会把所有裁剪图片归一化到识别模型的输入高度，再按 batch_size 分批送入识别模型，
+    PaddleOCR使用其文本识别器(text_recognizer)，EasyOCR使用其识别网络(recognize所使用的get_text)，
+    识别结果按传入顺序返回，与裁剪图片一一对应。
+
+    Args:
+        ocr_type (int): OCR类型，为1时是PaddleOCR，为0时是EasyOCR。
+        ocr_model (object): 已加载的OCR模型。
+        batch_size (int, optional): 每批识别的图片数量，传入0时逐个识别。
+            默认None时PaddleOCR使用DEFAULT_BATCH_SIZE批量识别，EasyOCR逐个识别(批量识别需要显式传入batch_size开启)。
+
+    Notes:
+        - PaddleOCR的识别器把同一批图片填充到其中最大的宽高比，批量识别的结果可能与逐个识别(det=False)略有差异。
+        - PaddleOCR批量识别时临时修改识别器的rec_batch_num，识别结束后恢复，不影响共享同一模型的其他调用方。
+        - EasyOCR的逐个识别(readtext)会在裁剪图片内再做一次文本检测，批量识别把整张裁剪图片作为一行文本识别，
+          对单行文本的元素结果一致，多行文本的元素会合并为一个结果，因此EasyOCR默认逐个识别，保持与readtext一致的结果。
+
+    Example:
+        ocr_type, ocr_model = ModelRegistry().get_ocr('paddleocr', 'ch')
+        recognizer = OCRRecognizer(ocr_type, ocr_model, batch_size=32)
+        texts = recognizer.recognize_batch([crop1, crop2, crop3])
+    """
+
+    DEFAULT_BATCH_SIZE = 16
+    EASYOCR_INPUT_HEIGHT = 64
+
+    def __init__(self, ocr_type: int, ocr_model, batch_size: int = None):
+        self._ocr_type = ocr_type
+        self._ocr_model = ocr_model
+        self._batch_size = (self.DEFAULT_BATCH_SIZE if ocr_type else 0) if batch_size is None else batch_size
+
+    def recognize(self, crop: np.ndarray) -> list[str]:
+        """
+        逐个识别单张裁剪图片。
+
+        Args:
+            crop (np.ndarray): BGR格式的裁剪图片。
+
+        Returns:
+            list[str]: 识别得到的文本列表。
+        """
+        if not self._is_valid(crop):
+            return []
+        if self._ocr_type:
+            text_result = self._ocr_model.ocr(crop, cls=False, det=False)
+            return [item[0][0] for item in text_result]
+        return self._ocr_model.readtext(crop, detail=0)
+
+    def recognize_batch(self, crops: list[np.ndarray]) -> list[list[str]]:
+        """
+        批量识别一组裁剪图片。
+
+        Args:
+            crops (list[np.ndarray]): BGR格式的裁剪图片列表。
+
+        Returns:
+            list[list[str]]: 与crops一一对应的文本列表。
+        """
+        if not self._batch_size:
+            return [self.recognize(crop) for crop in crops]
+
+        results = [[] for _ in crops]
+        valid = [(index, crop) for index, crop in enumerate(crops) if self._is_valid(crop)]
+        for start in range(0, len(valid), self._batch_size):
+            chunk = valid[start: start + self._batch_size]
+            batch = self._paddle_batch if self._ocr_type else self._easyocr_batch
+            for (index, _), text in zip(chunk, batch([crop for _, crop in chunk])):
+                results[index] = text
+        return results
+
+    @property
+    def input_height(self) -> int:
+        """
+        returns:
+            int: 识别模型的输入高度。
+        """
+        if self._ocr_type:
+            return int(self._ocr_model.text_recognizer.rec_image_shape[1])
+        return self.EASYOCR_INPUT_HEIGHT
+
+    @staticmethod
+    def normalize(crop: np.ndarray, height: int) -> np.ndarray:
+        """
+        按比例把裁剪图片缩放到指定高度，宽度的取整方式与PaddleOCR识别器内部一致，避免二次缩放带来的误差。
+
+        Args:
+            crop (np.ndarray): 裁剪图片。
+            height (int): 目标高度。
+
+        Returns:
+            np.ndarray: 缩放后的图片。
+        """
+        h, w = crop.shape[:2]
+        if h == height:
+            return crop
+        return cv2.resize(crop, (max(1, math.ceil(height * w / h)), height))
+
+    def _paddle_batch(self, crops: list[np.ndarray]) -> list[list[str]]:
+        text_recognizer = self._ocr_model.text_recognizer
+        # 模型由ModelRegistry在调用方之间共享，识别结束后恢复原来的rec_batch_num
+        rec_batch_num = text_recognizer.rec_batch_num
+        text_recognizer.rec_batch_num = len(crops)
+        try:
+            rec_res, _ = text_recognizer([self.normalize(crop, self.input_height) for crop in crops])
+        finally:
+            text_recognizer.rec_batch_num = rec_batch_num
+        return [[text] for text, _ in rec_res]
+
+    def _easyocr_batch(self, crops: list[np.ndarray]) -> list[list[str]]:
+        from easyocr.recognition import get_text
+        from easyocr.utils import compute_ratio_and_resize
+        reader = self._ocr_model
+        image_list, max_ratio = [], 1
+        for crop in crops:
+            grey = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+            h, w = grey.shape[:2]
+            grey, ratio = compute_ratio_and_resize(grey, w, h, self.input_height)
+            image_list.append(([[0, 0], [w, 0], [w, h], [0, h]], grey))
+            max_ratio = max(max_ratio, ratio)
+
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        result = get_text(reader.character, self.input_height, int(math.ceil(max_ratio) * self.input_height),
+                          reader.recognizer, reader.converter, image_list, ignore_char, 'greedy', 5, len(image_list),
+                          0.1, 0.5, 0.003, 0, reader.device)
+        return [[text] if text else [] for _, text, _ in result]
+
+    @staticmethod
+    def _is_valid(crop: np.ndarray) -> bool:
+        return crop is not None and crop.ndim >= 2 and crop.shape[0] > 0 and crop.shape[1] > 0
@@ -0,0 +1,292 @@
+import ast
+import glob
+import os
+import random
+from os import path
+import cv2
+import numpy as np
+from utils.project_path import ProjectPath
+
+
+class ONNXDetector:
+    """
+    使用ONNX Runtime或OpenVINO在CPU上运行导出为ONNX的YOLOv8检测模型，前处理、后处理与NMS使用NumPy实现，
+    不依赖torch与ultralytics。返回的元素字典与ultralytics Results.tojson() 的格式一致。
+
+    Args:
+        model_path (str): ONNX模型的路径，可以使用 export_onnx 从 .pt 模型导出。
+        backend (str, optional): 推理后端，可选 "onnxruntime" 或是 "openvino"。默认为'onnxruntime'。
+        conf (float, optional): 置信度阈值。默认为DEFAULT_CONF，与ultralytics一致。
+        iou (float, optional): NMS的IoU阈值。默认为DEFAULT_IOU，与ultralytics一致。
+        max_det (int, optional): 每张截图最多返回的元素数量。默认为DEFAULT_MAX_DET。
+        num_threads (int, optional): 推理线程数，默认0由后端决定。
+
+    Example:
+        detector = ONNXDetector(export_onnx(path.join(ProjectPath.root_path, 'bilibili_best.pt')))
+        detections = detector([image_cv])[0]
+    """
+
+    BACKENDS = ('onnxruntime', 'openvino')
+    DEFAULT_CONF = 0.25
+    DEFAULT_IOU = 0.7
+    DEFAULT_MAX_DET = 300
+    DEFAULT_IMAGE_SIZE = 640
+    PAD_VALUE = 114
+    MAX_WH = 7680
+
+    def __init__(self, model_path: str, backend: str = 'onnxruntime', conf: float = DEFAULT_CONF,
+                 iou: float = DEFAULT_IOU, max_det: int = DEFAULT_MAX_DET, num_threads: int = 0):
+        if backend not in self.BACKENDS:
+            raise ValueError(f'不支持的推理后端：{backend}，请传入 "onnxruntime" 或是 "openvino"')
+        if not path.exists(model_path):
+            raise FileNotFoundError(f'ONNX模型不存在：{model_path}')
+        self._model_path = model_path
+        self._backend = backend
+        self._conf = conf
+        self._iou = iou
+        self._max_det = max_det
+
+        metadata = self._read_metadata(model_path)
+        self._names: dict[int, str] = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        if backend == 'onnxruntime':
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            if num_threads: options.intra_op_num_threads = num_threads
+            self._session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+            model_input = self._session.get_inputs()[0]
+            self._input_name, input_shape = model_input.name, model_input.shape
+            self._run = lambda tensor: self._session.run(None, {self._input_name: tensor})[0]
+        else:
+            import openvino
+            core = openvino.Core()
+            config = {'INFERENCE_NUM_THREADS': num_threads} if num_threads else {}
+            model = core.read_model(model_path)
+            input_shape = [dim.get_length() if dim.is_static else None for dim in model.inputs[0].get_partial_shape()]
+            self._compiled = core.compile_model(model, 'CPU', config)
+            self._run = lambda tensor: self._compiled(tensor)[0]
+
+        self._dynamic_batch = not isinstance(input_shape[0], int)
+        self._dynamic_size = not (isinstance(input_shape[2], int) and isinstance(input_shape[3], int))
+        if not self._dynamic_size:
+            self._image_size = (input_shape[2], input_shape[3])
+        elif 'imgsz' in metadata:
+            self._image_size = tuple(ast.literal_eval(metadata['imgsz']))
+        else:
+            self._image_size = (self.DEFAULT_IMAGE_SIZE, self.DEFAULT_IMAGE_SIZE)
+
+    def __call__(self, images: np.ndarray | list[np.ndarray], image_size: int = None) -> list[list[dict]]:
+        """
+        检测一张或多张截图中的DOM元素。
+
+        Args:
+            images (np.ndarray | list[np.ndarray]): BGR格式的图像数组，或是图像数组列表。
+            image_size (int, optional): 推理分辨率，只有导出时开启了动态尺寸(dynamic=True)的模型可以使用。
+                默认为None使用模型的输入尺寸。
+
+        Returns:
+            list[list[dict]]: 与images一一对应的元素字典列表。
+        """
+        images = [images] if isinstance(images, np.ndarray) else list(images)
+        if not images:
+            return []
+        size = self._image_size
+        if image_size and (image_size, image_size) != size:
+            if not self._dynamic_size:
+                raise ValueError(f'ONNX模型的输入尺寸固定为{size}，无法使用其他推理分辨率，'
+                                 f'请使用 export_onnx(dynamic=True) 导出动态尺寸的模型')
+            size = (image_size, image_size)
+        tensors = [self._preprocess(image, size) for image in images]
+        if self._dynamic_batch:
+            outputs = list(self._run(np.concatenate(tensors)))
+        else:
+            outputs = [self._run(tensor)[0] for tensor in tensors]
+        return [self._postprocess(output, image.shape[:2], size) for output, image in zip(outputs, images)]
+
+    @property
+    def names(self) -> dict[int, str]:
+        return self._names
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def image_size(self) -> tuple[int, int]:
+        return self._image_size
+
+    @property
+    def dynamic_size(self) -> bool:
+        return self._dynamic_size
+
+    def _preprocess(self, image: np.ndarray, size: tuple[int, int] = None) -> np.ndarray:
+        """
+        按ultralytics的LetterBox等比缩放并填充到模型输入尺寸，转换为 (1, 3, 高, 宽) 的RGB float32张量。
+        """
+        height, width = image.shape[:2]
+        new_height, new_width = size or self._image_size
+        ratio = min(new_height / height, new_width / width)
+        unpad_width, unpad_height = int(round(width * ratio)), int(round(height * ratio))
+        dw, dh = (new_width - unpad_width) / 2, (new_height - unpad_height) / 2
+        if (width, height) != (unpad_width, unpad_height):
+            image = cv2.resize(image, (unpad_width, unpad_height), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT,
+                                   value=(self.PAD_VALUE, self.PAD_VALUE, self.PAD_VALUE))
+        return cv2.dnn.blobFromImage(image, scalefactor=1 / 255, swapRB=True)
+
+    def _postprocess(self, output: np.ndarray, shape: tuple[int, int], size: tuple[int, int] = None) -> list[dict]:
+        """
+        解析 (4 + 类别数, 候选框数) 的模型输出：置信度过滤、按类别NMS，再把坐标还原到原图。
+        """
+        predictions = output.T
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences > self._conf
+        predictions, class_ids, confidences = predictions[keep], class_ids[keep], confidences[keep]
+        if not len(predictions):
+            return []
+
+        xy, wh = predictions[:, :2], predictions[:, 2:4]
+        boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1)
+        keep = self._nms(boxes + class_ids[:, None] * self.MAX_WH, confidences, self._iou)[:self._max_det]
+        boxes, class_ids, confidences = boxes[keep], class_ids[keep], confidences[keep]
+
+        height, width = shape
+        size = size or self._image_size
+        gain = min(size[0] / height, size[1] / width)
+        # _preprocess把宽高分别取整后缩放，按取整后的尺寸计算各自的缩放比例
+        unpad_width, unpad_height = int(round(width * gain)), int(round(height * gain))
+        pad_x = round((size[1] - unpad_width) / 2 - 0.1)
+        pad_y = round((size[0] - unpad_height) / 2 - 0.1)
+        scale = [unpad_width / width, unpad_height / height] * 2
+        boxes = (boxes - [pad_x, pad_y, pad_x, pad_y]) / scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+
+        return [{'name': self._names.get(int(class_id), str(int(class_id))), 'class': int(class_id),
+                 'confidence': float(confidence),
+                 'box': {'x1': float(x1), 'y1': float(y1), 'x2': float(x2), 'y2': float(y2)}}
+                for (x1, y1, x2, y2), class_id, confidence in zip(boxes, class_ids, confidences)]
+
+    @staticmethod
+    def _nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+        """
+        贪心NMS，返回保留的候选框索引，按置信度从高到低排序。
+        """
+        x1, y1, x2, y2 = boxes.T
+        areas = (x2 - x1) * (y2 - y1)
+        order = scores.argsort()[::-1]
+        keep = []
+        while order.size:
+            index = order[0]
+            keep.append(index)
+            rest = order[1:]
+            inter_w = np.clip(np.minimum(x2[index], x2[rest]) - np.maximum(x1[index], x1[rest]), 0, None)
+            inter_h = np.clip(np.minimum(y2[index], y2[rest]) - np.maximum(y1[index], y1[rest]), 0, None)
+            inter = inter_w * inter_h
+            iou = inter / (areas[index] + areas[rest] - inter + 1e-7)
+            order = rest[iou <= iou_threshold]
+        return np.array(keep, dtype=np.int64)
+
+    @staticmethod
+    def _read_metadata(model_path: str) -> dict[str, str]:
+        """
+        读取ultralytics导出时写入ONNX的元数据(names、imgsz等)。
+        """
+        import onnx
+        model = onnx.load(model_path, load_external_data=False)
+        return {prop.key: prop.value for prop in model.metadata_props}
+
+
+class _CalibrationReader:
+    """
+    INT8静态量化的校准数据，按ONNXDetector的前处理读取校准截图。
+    """
+
+    def __init__(self, detector: ONNXDetector, images: list[str]):
+        self._detector = detector
+        self._images = iter(images)
+
+    def get_next(self) -> dict or None:
+        for image_path in self._images:
+            image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+            if image is not None:
+                return {self._detector._input_name: self._detector._preprocess(image)}
+        return None
+
+
+def _head_nodes(onnx_path: str) -> list[str]:
+    """
+    检测头中除卷积以外的节点(DFL、坐标解码、拼接)，量化这些节点会明显降低坐标精度，保持FP32。
+    """
+    import onnx
+    nodes = onnx.load(onnx_path, load_external_data=False).graph.node
+    indexes = [int(node.name.split('/')[1].split('.')[1]) for node in nodes if node.name.startswith('/model.')]
+    if not indexes:
+        return []
+    prefix = f'/model.{max(indexes)}/'
+    return [node.name for node in nodes if node.name.startswith(prefix) and node.op_type != 'Conv']
+
+
+def calibration_images(dataset_dir: str = None, size: int = 100, seed: int = 0) -> list[str]:
+    """
+    从LabelGenerator生成的数据集中抽取校准截图。
+
+    Args:
+        dataset_dir (str, optional): 数据集目录，默认使用 datasets 下的全部数据集。
+        size (int, optional): 最多抽取的截图数量。默认为100。
+        seed (int, optional): 随机种子，保证多次导出使用相同的校准截图。默认为0。
+
+    Returns:
+        list[str]: 截图路径列表。
+    """
+    dataset_dir = dataset_dir or ProjectPath.datasets_path
+    images = sorted(image for pattern in ('*.png', '*.jpg', '*.jpeg')
+                    for image in glob.glob(path.join(dataset_dir, '**', pattern), recursive=True))
+    random.Random(seed).shuffle(images)
+    return images[:size]
+
+
+def export_onnx(yolo_model: str, image_size: int = ONNXDetector.DEFAULT_IMAGE_SIZE, int8: bool = False,
+                dataset_dir: str = None, calibration_size: int = 100, force: bool = False,
+                dynamic: bool = False) -> str:
+    """
+    把 .pt 模型导出为ONNX，可选使用LabelGenerator数据集中的截图做INT8静态量化。已导出的模型比 .pt 新时直接复用。
+
+    Args:
+        yolo_model (str): YOLO .pt 模型的路径。
+        image_size (int, optional): 模型输入尺寸。默认为640。
+        int8 (bool, optional): 是否导出INT8量化模型，量化模型保存为 <模型名>.int8.onnx。默认为False。
+        dataset_dir (str, optional): 校准数据集目录，默认使用 datasets 下的全部数据集。
+        calibration_size (int, optional): 校准截图数量。默认为100。
+        force (bool, optional): 是否忽略已导出的模型重新导出。默认为False。
+        dynamic (bool, optional): 是否导出动态尺寸的模型，保存为 <模型名>.dynamic.onnx，
+            可以通过DOMInspector的detect_size使用更低的推理分辨率。默认为False。
+
+    Returns:
+        str: ONNX模型的路径。
+    """
+    onnx_path = path.splitext(yolo_model)[0] + ('.dynamic.onnx' if dynamic else '.onnx')
+    if force or not path.exists(onnx_path) or \
+            (path.exists(yolo_model) and path.getmtime(onnx_path) < path.getmtime(yolo_model)):
+        from ultralytics import YOLO
+        os.replace(YOLO(yolo_model).export(format='onnx', imgsz=image_size, dynamic=dynamic), onnx_path)
+    if not int8:
+        return onnx_path
+
+    int8_path = path.splitext(onnx_path)[0] + '.int8.onnx'
+    if not force and path.exists(int8_path) and path.getmtime(int8_path) >= path.getmtime(onnx_path):
+        return int8_path
+    images = calibration_images(dataset_dir, size=calibration_size)
+    if not images:
+        raise FileNotFoundError(f'没有找到INT8量化的校准截图，请先使用LabelGenerator生成数据集：'
+                                f'{dataset_dir or ProjectPath.datasets_path}')
+
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType
+    reader = _CalibrationReader(ONNXDetector(onnx_path), images)
+    quantize_static(onnx_path, int8_path, reader, quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    nodes_to_exclude=_head_nodes(onnx_path))
+    return int8_path
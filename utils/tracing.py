@@ -0,0 +1,222 @@
+import functools
+import json
+import os
+import threading
+import time
+import typing
+from collections import deque
+
+TRACE_ENV = 'AUTOFLOW_TRACE'
+DEFAULT_MAX_SPANS = 100000
+
+
+class Span:
+    """
+    一个阶段的耗时记录，作为上下文管理器使用，退出时记录到Tracer。
+
+    Attributes:
+        name (str): 阶段名称，例如 "inspector.detect"。
+        attributes (dict): 阶段的属性，例如元素数量、裁剪尺寸、缓存命中数。
+    """
+
+    __slots__ = ('name', 'attributes', 'start', 'duration', 'thread_id', '_tracer')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: dict):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start = 0
+        self.duration = 0
+        self.thread_id = 0
+
+    def set(self, **attributes) -> 'Span':
+        """
+        补充阶段的属性，例如执行结束后才知道的元素数量。
+        """
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self) -> 'Span':
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter_ns() - self.start
+        if exc_type is not None:
+            self.attributes['error'] = repr(exc_val)
+        self._tracer._record(self)
+
+
+class _NoopSpan:
+    """
+    关闭追踪时返回的空Span，所有操作都不做任何事情。
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> '_NoopSpan':
+        return self
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    按阶段记录耗时，可以导出为Chrome trace-event JSON(在 chrome://tracing 或 Perfetto 中查看)，或是汇总每个阶段的p50/p95。
+
+    默认关闭，关闭时 span() 直接返回共享的空Span，不计时也不分配对象。
+    设置环境变量 AUTOFLOW_TRACE=1 或调用 enable() 开启。
+
+    Args:
+        enabled (bool, optional): 是否开启，默认None读取环境变量 AUTOFLOW_TRACE。
+        max_spans (int, optional): 最多保留的Span数量，超出后丢弃最早的记录，默认100000。
+
+    Example:
+        from utils.tracing import tracer
+        tracer.enable()
+        dom_inspector(frame).click()
+        print(tracer.format_summary())
+        tracer.export_chrome_trace('trace.json')
+    """
+
+    def __init__(self, enabled: bool = None, max_spans: int = DEFAULT_MAX_SPANS):
+        self._enabled = os.environ.get(TRACE_ENV, '') not in ('', '0') if enabled is None else enabled
+        self._spans = deque(maxlen=max_spans)
+        self._origin = time.perf_counter_ns()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self) -> 'Tracer':
+        self._enabled = True
+        return self
+
+    def disable(self) -> 'Tracer':
+        self._enabled = False
+        return self
+
+    def span(self, name: str, **attributes) -> Span | _NoopSpan:
+        """
+        创建一个阶段的Span，需要在with语句中使用。
+
+        Args:
+            name (str): 阶段名称，使用 "模块.阶段" 的格式，例如 "browser.capture"。
+            **attributes: 阶段的属性。计算成本较高的属性应在 tracer.enabled 为True时再通过 Span.set 补充。
+
+        Returns:
+            Span | _NoopSpan: 关闭追踪时返回空Span。
+        """
+        if not self._enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def traced(self, name: str = None) -> typing.Callable:
+        """
+        装饰器，把函数的每次调用记录为一个Span，默认使用函数的限定名作为阶段名称。
+        """
+
+        def decorator(func: typing.Callable) -> typing.Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self._enabled:
+                    return func(*args, **kwargs)
+                with Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @property
+    def spans(self) -> list[Span]:
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+    def summary(self) -> dict[str, dict]:
+        """
+        按阶段汇总耗时。
+
+        Returns:
+            dict[str, dict]: 阶段名称 -> {count, total_ms, mean_ms, p50_ms, p95_ms, max_ms}，按总耗时从高到低排列。
+        """
+        durations: dict[str, list[float]] = {}
+        for span in list(self._spans):
+            durations.setdefault(span.name, []).append(span.duration / 1e6)
+        result = {}
+        for name, values in durations.items():
+            values.sort()
+            total = sum(values)
+            result[name] = {'count': len(values), 'total_ms': round(total, 3),
+                            'mean_ms': round(total / len(values), 3),
+                            'p50_ms': round(self._percentile(values, 50), 3),
+                            'p95_ms': round(self._percentile(values, 95), 3), 'max_ms': round(values[-1], 3)}
+        return dict(sorted(result.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def format_summary(self) -> str:
+        """
+        以Markdown表格格式输出 summary()。
+        """
+        lines = ['| 阶段 | 次数 | 总耗时(ms) | 平均(ms) | p50(ms) | p95(ms) | 最大(ms) |',
+                 '| --- | --- | --- | --- | --- | --- | --- |']
+        for name, stats in self.summary().items():
+            lines.append(f'| {name} | {stats["count"]} | {stats["total_ms"]} | {stats["mean_ms"]} | '
+                         f'{stats["p50_ms"]} | {stats["p95_ms"]} | {stats["max_ms"]} |')
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, file_path: str) -> str:
+        """
+        导出为Chrome trace-event JSON，每个Span是一个完整事件("ph": "X")，同一线程中的Span按时间嵌套显示。
+
+        Args:
+            file_path (str): 保存路径。
+
+        Returns:
+            str: 保存路径。
+        """
+        pid = os.getpid()
+        events = [{'name': span.name, 'cat': span.name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': span.thread_id,
+                   'ts': (span.start - self._origin) / 1000, 'dur': span.duration / 1000,
+                   'args': {key: self._jsonable(value) for key, value in span.attributes.items()}}
+                  for span in list(self._spans)]
+        with open(file_path, 'w', encoding='utf-8') as fw:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fw, ensure_ascii=False)
+        return file_path
+
+    def _record(self, span: Span):
+        # deque.append是原子操作，多线程记录不需要加锁
+        self._spans.append(span)
+
+    @staticmethod
+    def _percentile(sorted_values: list[float], percent: float) -> float:
+        """
+        线性插值的百分位数，sorted_values需要已排序。
+        """
+        position = (len(sorted_values) - 1) * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, len(sorted_values) - 1)
+        return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+    @staticmethod
+    def _jsonable(value):
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        if isinstance(value, (list, tuple)):
+            return [Tracer._jsonable(item) for item in value]
+        if isinstance(value, dict):
+            return {str(key): Tracer._jsonable(item) for key, item in value.items()}
+        return str(value)
+
+
+# 进程级的全局Tracer，Browser、DOMInspector、DOMResultHandler等模块都记录到这里
+tracer = Tracer()